@@ -1,12 +1,22 @@
+import argparse
+import glob
+import os
+from dataclasses import asdict
+
 import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
 
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.firefox import GeckoDriverManager
+from framework import browser_factory
+from framework.browser_factory import create_driver
+from framework.browser_pool import BrowserPool
+from framework import artifacts, browser_health, browser_profile, driver_cache, impact, journeys, network_policy, page_timing, prewarm, waits
+from framework.browser_context import BrowserContext
+from framework.parallel import NOT_RUN, DurationHistory, run_parallel, write_report
+from framework.profiling import NO_TEST, CommandProfiler
+from framework.seeding import seed_state
+from pages import locators
+from pages.cart_page import CartPage
+from pages.login_page import LoginPage
+from pages.products_page import ProductsPage
 
 # 'pytest_addoption' is a specially named Pytest hook function. Pytest requires
 # this exact function name in a conftest.py file to allow the addition of custom
@@ -33,140 +43,951 @@ def pytest_addoption(parser):
         help="Browser to run tests against"
     )
 
-# Define a pytest fixture. This is a function that is ran before tests that request it. 
-# scope="function" causes this fixture instance to be created once per test function
-# The 'request' parameter is a special built in Pytest fixture that gives this 'driver'
-# fixture information about the current test run, such as user-specified
-# command-line options (in this case, which browser).
-@pytest.fixture(scope="function")
-def driver(request):
-
-    # Get the value the user specified on the command line for which browser to use.
-    browser = request.config.getoption("--browser")
-
-    # If the browser to be used is Chrome, configure and initialize the Chrome WebDriver.
-    if browser == "chrome":
-
-        # Create an instance of ChromeOptions to customize Chrome's behavior.
-        # Add an argument to run Chrome in headless mode (no visible UI window).
-        # Add an argument to disable the GPU hardware acceleration.
-        # This is often necessary when running in headless mode or in CI environments.
-        # Add an argument to set the initial browser window size.
-        # This is needed for testing responsive designs to ensure elements are rendered as expected.
-        opts = ChromeOptions()
-        opts.add_argument("--headless=new")
-        opts.add_argument("--disable-gpu")
-        opts.add_argument("--window-size=1920,1080")
-        
-        # turn off the leak‑detection feature
-        opts.add_argument("--disable-features=PasswordLeakDetection")
+    # '--backend fake' replaces the browser with an in-memory fake driver that shows the stand-in site
+    # (see fake_driver.py and standin/fake_site.py). It checks page-object logic in milliseconds per test,
+    # without a browser, a driver binary or the network. '--browser' is ignored then.
+    parser.addoption(
+        "--backend",
+        action="store",
+        default="selenium",
+        choices=["selenium", "fake"],
+        help="Run the tests in real browsers (selenium) or against an in-memory fake driver (fake)"
+    )
 
-        # Disables Chrome’s new UI flag that triggers password leak detection UI changes.
-        # Useful for suppressing popups related to breached passwords that may still appear
-        # even if PasswordLeakDetection is disabled.
-        opts.add_argument("--disable-features=PasswordLeakToggleMove")
+    # By default, browsers are pooled: a browser is launched once and reused (after being reset)
+    # by the following tests. '--fresh-browser' switches back to launching a brand new browser
+    # process for every test and quitting it afterwards.
+    parser.addoption(
+        "--fresh-browser",
+        action="store_true",
+        default=False,
+        help="Launch a new browser for every test instead of reusing pooled browsers"
+    )
 
-        # opts.add_argument("--disable-blink-features=CredentialLeakDetection")
-        # opts.add_argument("--disable-infobars")
-        # opts.add_argument("--password-store=basic")
+    # '--base-url' chooses the site the tests run against. "local" starts the bundled Swag Labs
+    # stand-in (see the 'standin' package) on a free port, which needs no network and is fast and
+    # deterministic. Any other value is used as the site's URL (the default is the real site).
+    parser.addoption(
+        "--base-url",
+        action="store",
+        default=LoginPage.URL,
+        help="URL of the site under test, or 'local' to start the bundled stand-in site"
+    )
 
-        # runs in guest mode, which appears to skip the dialog
-        # opts.add_argument("--guest")
+    # Driver binaries (chromedriver, geckodriver) are cached on disk between runs (see driver_cache.py).
+    # '--driver-cache-dir' changes where, and '--offline-drivers' forbids downloading a driver that
+    # is not cached yet: the run then fails straight away with a message explaining how to seed the cache.
+    parser.addoption(
+        "--driver-cache-dir",
+        action="store",
+        default=driver_cache.DEFAULT_CACHE_DIR,
+        help="Folder where WebDriver binaries are cached"
+    )
+    parser.addoption(
+        "--offline-drivers",
+        action="store_true",
+        default=False,
+        help="Never download WebDriver binaries, only use the driver cache"
+    )
 
+    # '--workers N' runs the tests in N separate pytest processes, each with its own browser ("auto" uses
+    # one worker per CPU core). Tests are handed out longest first, based on the durations of previous runs
+    # stored in '--durations-db', which every run updates. The results are merged into this run's report.
+    parser.addoption(
+        "--workers",
+        action="store",
+        default="0",
+        type=_workers_option,
+        help="Number of worker processes to run the tests in, or 'auto' for one per CPU core"
+    )
+    parser.addoption(
+        "--durations-db",
+        action="store",
+        default=None,
+        help="SQLite file with the test durations of previous runs (default: .test_durations.sqlite)"
+    )
 
-        # Disable Chrome's built-in password manager and "Save password?" prompts.
-        # This is important in automation to prevent these pop-ups from interfering with
-        # test execution. Also, disable third party cookies.
-        prefs = {
-            "credentials_enable_service": False,
-            "profile.password_manager_enabled": False,
+    # Internal options passed by the parallel runner to its worker processes (see parallel.py).
+    parser.addoption("--worker-id", action="store", default=None, help=argparse.SUPPRESS)
+    parser.addoption("--worker-tests", action="store", default=None, help=argparse.SUPPRESS)
+    parser.addoption("--worker-results", action="store", default=None, help=argparse.SUPPRESS)
 
-            # Block third-party cookies but still allow first-party cookies,
-            # minimizing cookie-consent dialogs and preventing external trackers from affecting tests.
-            "profile.block_third_party_cookies": True,
+    # '--profile-webdriver PATH' times every WebDriver command and attributes it to the page-object method
+    # and the test that sent it. A JSON report is written to PATH, a flamegraph-compatible "folded stacks"
+    # file next to it, and the slowest page-object methods are listed at the end of the run.
+    parser.addoption(
+        "--profile-webdriver",
+        action="store",
+        default=None,
+        metavar="PATH",
+        help="Profile WebDriver commands per page-object method and write a JSON report to PATH"
+    )
 
-            # Disables compromised password detection
-             "profile.password_manager_leak_detection_enabled": False
+    # '--network-policy' blocks requests the tests don't need, which makes page loads faster and less
+    # noisy: images and fonts, third-party hosts, or both. The blocked requests are counted per test.
+    parser.addoption(
+        "--network-policy",
+        action="store",
+        default="allow-all",
+        choices=sorted(network_policy.PRESETS),
+        help="Which requests the test browsers may make"
+    )
 
-        }
+    # '--browser-contexts' (Chrome only) runs every test in a new isolated browser context (like an
+    # incognito window) inside one long-lived browser, instead of resetting the browser between tests.
+    # Firefox has no such contexts over WebDriver, so it falls back to a new browser (and profile) per test.
+    parser.addoption(
+        "--browser-contexts",
+        action="store_true",
+        default=False,
+        help="Chrome: isolate each test in its own browser context of a shared browser"
+    )
 
-        # Apply the above dictionary of Chrome preferences to the browser options.
-        opts.add_experimental_option("prefs", prefs)
+    # '--page-timing' measures every page the tests arrive on (Navigation and Paint Timing, Largest
+    # Contentful Paint and, in Chrome, DevTools Performance.getMetrics), fails tests whose pages go over
+    # the BUDGET declared on their page class, and shows how the timings changed over the last runs,
+    # which are kept in '--page-timing-db'.
+    parser.addoption(
+        "--page-timing",
+        action="store_true",
+        default=False,
+        help="Measure page load performance, enforce the page objects' budgets and report the trend"
+    )
+    parser.addoption(
+        "--page-timing-db",
+        action="store",
+        default=None,
+        help="SQLite file with the page timings of previous runs (default: .page_timing.sqlite)"
+    )
 
-        print("Initializing ChromeDriver using webdriver-manager...")
+    # Browsers take seconds to start. '--prewarm-browsers N' starts launching N browsers in the background
+    # as soon as the tests are collected, if a selected test uses a browser, so the launch overlaps setting
+    # up the session fixtures, and the first test finds a browser ready. 0 turns it off. A run with the browser pool needs
+    # one browser per test process; with '--fresh-browser', each prewarmed browser saves one test its launch.
+    parser.addoption(
+        "--prewarm-browsers",
+        action="store",
+        type=int,
+        default=1,
+        help="Number of browsers to launch in the background while the tests are collected (0 to disable)"
+    )
 
-        # Attempt to initialize the ChromeDriver. This block includes error handling to catch any exceptions that may occur.
-        try:
+    # Every browser gets its own copy of a profile template: a profile built once per test process, with
+    # the browser settings applied and the browser's first run done (see browser_profile.py). Copying it is
+    # cheaper than letting each browser create a new profile. The copies are kept in the temp folder, or in
+    # '--profile-dir', or with '--profile-tmpfs' on the /dev/shm tmpfs if it has room, and are deleted when
+    # the browser quits. /dev/shm is not the default: Chrome needs it for its shared memory, and it is small
+    # in containers.
+    parser.addoption(
+        "--no-profile-template",
+        action="store_true",
+        default=False,
+        help="Let every browser create a new profile instead of copying a prepared profile template"
+    )
+    parser.addoption(
+        "--profile-dir",
+        action="store",
+        default=None,
+        help="Folder for the profile template and its copies (default: the temp folder)"
+    )
+    parser.addoption(
+        "--profile-tmpfs",
+        action="store_true",
+        default=False,
+        help="Keep the profile template and its copies on the /dev/shm tmpfs if it has at least 1 GB free"
+    )
 
-            # Create a ChromeService instance, which is responsible for managing the ChromeDriver executable.
-            # The ChromeDriverManager().install() method downloads and installs the ChromeDriver executable if it's not already present.
-            service = ChromeService(ChromeDriverManager().install())
+    # Pooled browsers slowly leak memory and get slower over hundreds of tests. These options set limits
+    # a pooled browser is recycled at (quit after a test and replaced by a new one, see browser_health.py):
+    # the RSS of its process tree, its open handles (file descriptors), the rolling average latency of its
+    # WebDriver commands, and the number of tests it ran. Each recycle is listed at the end of the run.
+    parser.addoption(
+        "--max-browser-rss",
+        action="store",
+        type=float,
+        default=None,
+        help="Recycle a pooled browser once its process tree uses more than this many MB of memory"
+    )
+    parser.addoption(
+        "--max-browser-handles",
+        action="store",
+        type=int,
+        default=None,
+        help="Recycle a pooled browser once its process tree has more than this many open handles"
+    )
+    parser.addoption(
+        "--max-command-latency",
+        action="store",
+        type=float,
+        default=None,
+        help="Recycle a pooled browser once its average WebDriver command latency exceeds this many ms"
+    )
+    parser.addoption(
+        "--recycle-after-tests",
+        action="store",
+        type=int,
+        default=None,
+        help="Recycle a pooled browser after it has run this many tests"
+    )
 
-            # Initialize the Chrome WebDriver instance, passing in the ChromeService instance and the ChromeOptions instance.
-            driver = webdriver.Chrome(service=service, options=opts)
-            print("ChromeDriver initialized successfully.")
+    # Test impact selection. '--impact-record' runs the suite while recording which functions of the page
+    # objects and the framework each test calls, and saves that map ('--impact-map'). '--impact BASE' then
+    # only runs the tests affected by the changes between the git revision BASE and the working tree (see
+    # impact.py), or the full suite if conftest.py changed or the map doesn't match BASE anymore.
+    parser.addoption(
+        "--impact-record",
+        action="store_true",
+        default=False,
+        help="Record which page-object and framework functions each test calls, for --impact"
+    )
+    parser.addoption(
+        "--impact",
+        action="store",
+        default=None,
+        metavar="BASE",
+        help="Only run the tests affected by the changes since the git revision BASE (e.g. origin/main)"
+    )
+    parser.addoption(
+        "--impact-map",
+        action="store",
+        default=None,
+        help="Path of the impact map (default: .test_impact.json in the project root)"
+    )
 
-        # Catch any exceptions that occur during ChromeDriver initialization and handle them accordingly.
-        except Exception as e:
+    # When a test fails, the screenshot, page source, console log (Chrome) and last WebDriver commands of
+    # its browser are saved to a folder per test in '--failure-artifacts' (see artifacts.py), which the
+    # failure report links to. They are compressed and written in the background, identical screenshots
+    # are stored once, and at most '--failure-artifacts-max-mb' are written per test process.
+    parser.addoption(
+        "--failure-artifacts",
+        action="store",
+        default=None,
+        metavar="DIR",
+        help="Folder for the screenshots and logs of failed tests (default: failure_artifacts in the project root)"
+    )
+    parser.addoption(
+        "--failure-artifacts-max-mb",
+        action="store",
+        type=float,
+        default=200,
+        help="Stop saving failure artifacts once a test process has written this many MB"
+    )
+    parser.addoption(
+        "--no-failure-artifacts",
+        action="store_true",
+        default=False,
+        help="Don't save screenshots and logs of failed tests"
+    )
 
-            # Log an error message with the exception details.
-            # Fail the test setup using pytest.fail, passing in an error message with the exception details.
-            print(f"Error initializing ChromeDriver: {e}")
-            pytest.fail(f"Failed to initialize ChromeDriver: {e}")
+    # Tests marked with '@pytest.mark.journey(steps=...)' share the steps that bring them to where they start
+    # (e.g. logging in through the login page): the steps run once per test process, and the other tests
+    # of the journey get a snapshot of the browser state restored instead (see journeys.py).
+    # '--no-journey-sharing' runs the steps for every test.
+    parser.addoption(
+        "--no-journey-sharing",
+        action="store_true",
+        default=False,
+        help="Run the journey steps of every test instead of restoring a snapshot of them"
+    )
 
-    # Else if the Firefox browser is used.
-    elif browser == "firefox":
+    # '--wait-report' prints a summary of the explicit waits performed by the page objects at the end
+    # of the run: the total time spent waiting per test and the slowest individual waits, and the hits
+    # and misses of the page objects' element caches (see locators.py).
+    parser.addoption(
+        "--wait-report",
+        action="store_true",
+        default=False,
+        help="Print how long the page objects spent waiting, per test and per wait"
+    )
 
-        
-        # Initialize FirefoxOptions, set it to run headlessly, and define a specific window size
-        # for consistent test execution.
-        opts = FirefoxOptions()
-        opts.add_argument("--headless")
-        opts.add_argument("--width=1920")
-        opts.add_argument("--height=1080")
-        
-        # disable the "Remember password" prompt.
-        opts.set_preference("signon.rememberSignons", False)
+# Set by pytest_configure: the run's config, and the results file when running as a parallel worker.
+_config = None
+_worker_results = None
+
+# The WebDriver command profiler, when '--profile-webdriver' is used.
+_profiler = None
+
+# The tracer recording the functions each test calls, with '--impact-record' (in the processes that run tests).
+_impact_tracer = None
+
+# Returns where the profile report of this process goes. A parallel worker writes its own file next to
+# the requested one, and the main process merges them (see pytest_terminal_summary).
+def _profile_path(config) -> str:
+    path = config.getoption("--profile-webdriver")
+    worker_id = config.getoption("--worker-id")
+    return f"{os.path.splitext(path)[0]}.worker{worker_id}.json" if worker_id is not None else path
+
+# Pytest hook that wraps running each test (setup, call and teardown). While the test runs, the
+# profiler attributes the WebDriver commands it records to this test.
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item):
+    if _profiler:
+        _profiler.current_test = item.nodeid
+    if _impact_tracer:
+        _impact_tracer.start_test()
+    yield
+    if _profiler:
+        _profiler.current_test = NO_TEST
+
+# Pytest hook that runs once, after the command line options have been parsed.
+def pytest_configure(config):
+
+    # Tell the driver cache where to look and whether it may download drivers.
+    driver_cache.configure(config.getoption("--driver-cache-dir"), config.getoption("--offline-drivers"))
+
+    # Remember the config and, in a worker process, the file its test reports must be written to.
+    global _config, _worker_results
+    _config = config
+    _worker_results = config.getoption("--worker-results")
+
+    # Choose between real browsers and the fake driver.
+    browser_factory.backend = config.getoption("--backend")
+
+    # Set the network policy used when launching browsers.
+    network_policy.active = network_policy.NetworkPolicy(config.getoption("--network-policy"))
+
+    # Watch the health of the pooled browsers if a limit was set.
+    limits = browser_health.HealthLimits(
+        config.getoption("--max-browser-rss"),
+        config.getoption("--max-browser-handles"),
+        config.getoption("--max-command-latency"),
+        config.getoption("--recycle-after-tests"),
+    )
+    if limits.enabled:
+        browser_health.supervisor = browser_health.HealthSupervisor(limits)
+        browser_health.supervisor.start()
+
+    # Record the waits of the page objects for the wait report if it was asked for.
+    waits.recording = config.getoption("--wait-report")
+
+    # Measure the pages the tests arrive on if it was asked for.
+    if config.getoption("--page-timing"):
+        page_timing.monitor = page_timing.PageTimingMonitor()
+
+    # Start the WebDriver command profiler if it was asked for.
+    global _profiler
+    if config.getoption("--profile-webdriver"):
+        _profiler = CommandProfiler()
+        _profiler.start()
+
+    # Prepare the profile templates the browsers will be launched with.
+    if _launches_browsers(config) and not config.getoption("--no-profile-template"):
+        browser_profile.templates = browser_profile.ProfileTemplates(config.getoption("--profile-dir"), config.getoption("--profile-tmpfs"))
+
+    # Record the functions each test calls if it was asked for.
+    global _impact_tracer
+    if config.getoption("--impact-record"):
+        if config.getoption("--impact"):
+            raise pytest.UsageError("--impact-record records the whole suite, it can't be used with --impact")
+        if _runs_tests(config):
+            _impact_tracer = impact.ImpactTracer(str(config.rootpath))
+            _impact_tracer.start()
+
+    # Register the 'journey' marker, and share journeys between tests unless turned off.
+    config.addinivalue_line("markers", "journey(steps=function): the test starts where the function 'steps' leaves the browser")
+    if not config.getoption("--no-journey-sharing"):
+        journeys.cache = journeys.JourneyCache()
+
+    # Save the screenshots and logs of failed tests, unless turned off. The artifacts of the previous run
+    # are deleted first, by the process that starts the run (not by each parallel worker).
+    if not config.getoption("--no-failure-artifacts") and not _shows_only(config):
+        directory = _failure_artifacts_dir(config)
+        if config.getoption("--worker-id") is None:
+            artifacts.clear(directory)
+        if _runs_tests(config):
+            history = artifacts.CommandHistory()
+            history.start()
+            max_bytes = int(config.getoption("--failure-artifacts-max-mb") * 1024 * 1024)
+            artifacts.active = artifacts.FailureArtifacts(directory, max_bytes, history)
+
+# Returns whether this run only shows something ('--help', '--collect-only', '--fixtures', '--markers').
+def _shows_only(config) -> bool:
+    options = config.option
+    return bool(options.help or options.collectonly or options.showfixtures or options.show_fixtures_per_test or options.markers)
+
+# Returns whether this process runs tests. Runs that only show something don't, and neither does the
+# main process of a parallel run (its workers do).
+def _runs_tests(config) -> bool:
+    if _shows_only(config):
+        return False
+    return not (_worker_count(config) > 1 and config.getoption("--worker-id") is None)
+
+# Returns the folder the failure artifacts are saved in.
+def _failure_artifacts_dir(config) -> str:
+    return config.getoption("--failure-artifacts") or str(config.rootpath / "failure_artifacts")
+
+# Returns whether this process may launch browsers: it runs tests, and not with the fake driver.
+def _launches_browsers(config) -> bool:
+    return _runs_tests(config) and browser_factory.backend != "fake"
+
+# Returns how many browsers to prewarm in this process: no more than the tests that will use a browser.
+def _prewarm_count(config, items) -> int:
+    if not _launches_browsers(config):
+        return 0
+    return min(max(config.getoption("--prewarm-browsers"), 0), sum(1 for item in items if _uses_browser(item)))
+
+# Returns whether a test uses a browser: it uses the 'driver' fixture, or gets it through a journey marker.
+def _uses_browser(item) -> bool:
+    return "driver" in item.fixturenames or journeys.marked_journey(item) is not None
+
+# Pytest hook that runs once the tests to run are known. Starts launching browsers in the background if
+# some of them use one (see prewarm.py).
+def pytest_collection_finish(session):
+    count = _prewarm_count(session.config, session.items)
+    if count:
+        prewarm.active = prewarm.BrowserPrewarmer(session.config.getoption("--browser"), count, _prewarm_site_url(session.config))
+        prewarm.active.start()
+
+# Returns the site under test for the network policy of the prewarmed browsers. The stand-in's address is
+# only known once the 'base_url' fixture has started it, but it is always on 127.0.0.1.
+def _prewarm_site_url(config) -> str:
+    url = config.getoption("--base-url")
+    return "http://127.0.0.1/" if url == "local" else url
+
+# Pytest hook that runs once, right before the test process exits. Quits the prewarmed browsers no test
+# took, then deletes the profile templates and any copy of them that is left.
+def pytest_unconfigure(config):
+    if prewarm.active is not None:
+        prewarm.active.close()
+        prewarm.active = None
+    if browser_profile.templates is not None:
+        browser_profile.templates.close()
+        browser_profile.templates = None
+
+# Returns the number of worker processes requested with '--workers' (0 or 1 means run in this process).
+def _worker_count(config) -> int:
+    value = config.getoption("--workers")
+    return (os.cpu_count() or 1) if value == "auto" else value
+
+# Checks the value of '--workers' when the command line is parsed: "auto", or a number of workers.
+def _workers_option(value: str):
+    if value == "auto":
+        return value
+    try:
+        workers = int(value)
+    except ValueError:
+        workers = -1
+    if workers < 0:
+        raise argparse.ArgumentTypeError(f"expected a number of workers or 'auto', got {value!r}")
+    return workers
+
+# Returns the path of the test durations database.
+def _durations_db(config) -> str:
+    return config.getoption("--durations-db") or str(config.rootpath / ".test_durations.sqlite")
+
+# The impact selection of this run, with '--impact', shown at the end of the run.
+_impact_selection = None
+
+# Returns the path of the impact map.
+def _impact_map_path(config) -> str:
+    return config.getoption("--impact-map") or str(config.rootpath / ".test_impact.json")
+
+# Deselects the tests the changes since '--impact BASE' can't affect (see impact.py).
+def _select_impacted(config, items):
+    global _impact_selection
+    impact_map = impact.ImpactMap.load(_impact_map_path(config))
+    _impact_selection = impact.select(str(config.rootpath), impact_map, config.getoption("--impact"), [item.nodeid for item in items])
+    if _impact_selection.nodeids is None:
+        return
+    deselected = [item for item in items if item.nodeid not in _impact_selection.nodeids]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = [item for item in items if item.nodeid in _impact_selection.nodeids]
+
+# Pytest hook that runs after collection. In a worker process, it keeps only the tests the parallel
+# runner gave to this worker, in the order it gave them. Otherwise, with '--impact', it keeps only the
+# tests affected by the changes.
+def pytest_collection_modifyitems(config, items):
+    tests_file = config.getoption("--worker-tests")
+    if not tests_file:
+        if config.getoption("--impact"):
+            _select_impacted(config, items)
+        return
+
+    with open(tests_file) as file:
+        order = {nodeid: index for index, nodeid in enumerate(file.read().splitlines())}
+    selected = sorted((item for item in items if item.nodeid in order), key=lambda item: order[item.nodeid])
+    deselected = [item for item in items if item.nodeid not in order]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
+
+# Pytest hook that runs the collected tests. With '--workers', the tests are run by worker processes
+# instead (see parallel.py). Returning True tells pytest the tests have been run.
+# Returning None lets pytest run them in this process as usual.
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    config = session.config
+    workers = _worker_count(config)
+    if workers <= 1 or config.option.collectonly or not session.items or session.testsfailed:
+        return None
+
+    nodeids = [item.nodeid for item in session.items]
+    history = DurationHistory(_durations_db(config))
+    durations = history.get(nodeids)
+    history.close()
+
+    # The tests of a journey are kept together, so the worker that builds it restores it for the others.
+    run_parallel(session, workers, durations, journeys.schedule_units(session.items, workers))
+    return True
+
+# Durations ({nodeid: seconds}, setup + call + teardown) measured in this run, saved when the session ends.
+_measured_durations = {}
+
+# Pytest hook that receives every test report (in the main process, this includes the reports replayed
+# from the workers). Workers send their reports to the main process; the main process records durations.
+def pytest_runtest_logreport(report):
+    if _worker_results:
+        write_report(_config, _worker_results, report)
+    elif (NOT_RUN, True) not in report.user_properties:
+        _measured_durations[report.nodeid] = _measured_durations.get(report.nodeid, 0.0) + report.duration
+
+        # The page timings and the called functions of a test are in its teardown report (see
+        # pytest_runtest_makereport).
+        if report.when == "teardown":
+            for name, value in report.user_properties:
+                if name == "page_timing":
+                    _page_timings.extend(value)
+                elif name == "browser_recycled":
+                    _recycled_browsers.append(value)
+                elif name == "impact":
+                    _impact_tests[report.nodeid] = value
+                elif name == "impact_shared":
+                    _impact_shared.update(tuple(function) for function in value)
+                elif name == "failure_artifacts":
+                    _failure_artifacts[report.nodeid] = value
+                elif name == "journey":
+                    _journey_counts[value] += 1
+
+# Page timings ({"test", "page", "url", metric: value}) of this run, with '--page-timing'.
+_page_timings = []
+
+# Browsers recycled in this run (browser_health.RecycleEvent as a dict), with the browser health options.
+_recycled_browsers = []
+
+# How many tests built their journey ("built") and how many got it restored ("restored").
+_journey_counts = {"built": 0, "restored": 0}
+
+# {nodeid: folder} of the failed tests whose failure artifacts were saved.
+_failure_artifacts = {}
+
+# Errors of the failure artifacts that could not be written by this process.
+_artifact_errors = []
+
+# The browser each running test got from the 'driver' fixture, by nodeid, for the failure artifacts.
+_test_drivers = {}
+
+# With '--impact-record': {nodeid: {path: [function names]}} of the tests run, and the (path, function name)
+# pairs called by shared fixtures. Reported by the processes that ran the tests.
+_impact_tests = {}
+_impact_shared = set()
+_impact_shared_reported = set()
+
+# Pytest hook that creates the report of each test phase. With '--page-timing', the page timings taken
+# during the test are attached to it (so they also reach the main process from parallel workers), and a
+# test that passed is failed if one of its pages went over its performance budget. A failed test's
+# browser is captured for the failure artifacts.
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+
+    # With '--impact-record', attach the functions the test called to its teardown report, before it is
+    # created. Functions shared fixtures called are sent along with the first test that reports them.
+    if _impact_tracer and call.when == "teardown":
+        item.user_properties.append(("impact", impact.by_path(_impact_tracer.stop_test())))
+        new_shared = _impact_tracer.shared - _impact_shared_reported
+        _impact_shared_reported.update(new_shared)
+        item.user_properties.append(("impact_shared", sorted(new_shared)))
+
+    outcome = yield
+    report = outcome.get_result()
+    # The timings are taken at every phase, so none are left over for the next test (e.g. from a setup that
+    # failed). Only the pages the test itself arrived on count; those of its setup and teardown are dropped.
+    if page_timing.monitor is not None:
+        timings, violations = page_timing.monitor.take()
+    if page_timing.monitor is not None and call.when == "call":
+        item.user_properties.append(("page_timing", [asdict(timing) for timing in timings]))
+        if violations and report.passed:
+            report.outcome = "failed"
+            report.longrepr = "Performance budget exceeded:\n" + "\n".join(f"  {violation}" for violation in violations)
+
+    # A test that failed (or whose setup failed after its browser was ready) gets its failure artifacts
+    # saved, and a link to them in its report. Passing tests skip all of it.
+    driver = _test_drivers.pop(item.nodeid, None) if call.when == "teardown" else _test_drivers.get(item.nodeid)
+    if artifacts.active is not None and report.failed and driver is not None and call.when != "teardown":
+        folder, files = artifacts.active.capture(driver, item.nodeid)
+        report.sections.append(("failure artifacts", f"{folder}{os.sep}: {', '.join(files)}"))
+        item.user_properties.append(("failure_artifacts", folder))
+
+# Writes the impact map of this run (see impact.py).
+def _save_impact_map(config):
+    impact_map = impact.build_map(str(config.rootpath), _impact_tests, _impact_shared)
+    if impact_map is not None:
+        impact_map.save(_impact_map_path(config))
+
+# Returns the path of the page timings database.
+def _page_timing_db(config) -> str:
+    return config.getoption("--page-timing-db") or str(config.rootpath / ".page_timing.sqlite")
+
+# Pytest hook that runs around setting up a fixture. What a session, package or module scoped fixture
+# calls while it is set up serves every test that uses it, so '--impact-record' records it as shared.
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef):
+    shared = _impact_tracer is not None and fixturedef.scope != "function"
+    if shared:
+        _impact_tracer.shared_depth += 1
+    yield
+    if shared:
+        _impact_tracer.shared_depth -= 1
+
+# Pytest hook that runs once at the end of the run. Saves this run's test durations for the scheduler,
+# its page timings for the trend report, and with '--impact-record' the impact map. Waits for the failure
+# artifacts to be written first.
+def pytest_sessionfinish(session):
+    if _impact_tracer:
+        _impact_tracer.stop()
+
+    # Wait for the failure artifacts still being written. Errors are shown in the summary.
+    if artifacts.active is not None:
+        _artifact_errors.extend(artifacts.active.close())
+    if _worker_results:
+        return
+
+    if _impact_tests:
+        _save_impact_map(session.config)
+
+    # Add this run's page timings to the history the trend report is made from.
+    if _page_timings:
+        history = page_timing.TimingHistory(_page_timing_db(session.config))
+        history.add_run(_page_timings)
+        history.close()
+
+    if not _measured_durations:
+        return
+    history = DurationHistory(_durations_db(session.config))
+    history.update(_measured_durations)
+    history.close()
+
+# Session scoped fixture that provides the URL of the site under test (see '--base-url').
+# It also points LoginPage.URL at that site, since that is where every test starts.
+@pytest.fixture(scope="session")
+def base_url(request):
+    url = request.config.getoption("--base-url")
+
+    # With "local", start the stand-in site in its own process for the whole session.
+    # The fake driver has the stand-in built in, so it needs no server and keeps the default URL.
+    process = None
+    if url == "local" and browser_factory.backend == "fake":
+        url = LoginPage.URL
+    elif url == "local":
+        from standin.server import start_server_process
+        process, url = start_server_process()
+        print(f"Started the Swag Labs stand-in at {url}")
+
+    # Make sure the URL ends with "/" so page paths can be appended to it.
+    if not url.endswith("/"):
+        url += "/"
+
+    original_url = LoginPage.URL
+    LoginPage.URL = url
+    yield url
+    LoginPage.URL = original_url
+
+    if process is not None:
+        process.terminate()
+        process.wait()
+
+# Define a session scoped fixture. scope="session" causes this fixture to be created only once
+# for the whole test run (once per worker process), so the browsers in the pool outlive single tests.
+@pytest.fixture(scope="session")
+def browser_pool(request):
+    pool = BrowserPool(request.config.getoption("--browser"))
+    yield pool
+
+    # Once every test has finished, quit all pooled browsers.
+    prewarmed = f" ({prewarm.active.taken} of them prewarmed)" if prewarm.active is not None else ""
+    print(f"Browser pool: {pool.launched} launched{prewarmed}, {pool.reused} reused, {pool.discarded} discarded.")
+    pool.close()
 
-        # Block third-party cookies but still allow first-party cookies,
-        # minimizing cookie-consent dialogs and preventing external trackers from affecting tests.
-        opts.set_preference("network.cookie.cookieBehavior", 1)
+# Define a pytest fixture. This is a function that is ran before tests that request it. 
+# scope="function" causes this fixture instance to be created once per test function
+# The 'request' parameter is a special built in Pytest fixture that gives this 'driver'
+# fixture information about the current test run, such as user-specified
+# command-line options (in this case, which browser). 'base_url' is requested so the site
+# under test (and LoginPage.URL) is set up before any browser is used.
+@pytest.fixture(scope="function")
+def driver(request, base_url):
 
-        print("Initializing GeckoDriver using webdriver-manager...")
+    # Get the value the user specified on the command line for which browser to use.
+    browser = request.config.getoption("--browser")
 
-        # Attempt to initialize the GeckoDriver. This block includes error handling to catch any exceptions that may occur.
+    # Browser contexts are only available in Chrome. Firefox gets a new browser with its own profile instead.
+    use_contexts = request.config.getoption("--browser-contexts")
+    fresh_browser = request.config.getoption("--fresh-browser")
+    if browser_factory.backend == "fake":
+        browser = "fake"
+    if use_contexts and browser != "chrome":
+        if not fresh_browser:
+            print(f"Browser contexts are not supported for {browser}, launching a new browser per test instead.")
+        use_contexts, fresh_browser = False, True
+
+    # With '--fresh-browser', launch a new browser for this test only (the old behavior). The first
+    # tests get the browsers launched in the background since the run started (see prewarm.py).
+    if fresh_browser:
+        driver = prewarm.take(browser) or create_driver(browser)
+        _test_drivers[request.node.nodeid] = driver
+
+        # Pauses the driver fixture and allows the test function to use the driver. Code prior to this
+        # is the setup phase of the driver. Code after this, is the teardown phase of the driver.
+        yield driver
+        _record_network_stats(request.node, driver)
+
+        # Once the test function has completed, this closes all browser windows opened by this
+        # WebDriver instance and releases associated system resources.
+        driver.quit()
+        return
+
+    # Otherwise borrow a browser from the session's pool. The pool hands out a browser that has
+    # been reset (no cookies, no storage, one tab, on the login page), and gets it back afterwards.
+    # 'getfixturevalue' is used so that the pool is only created when pooling is actually used.
+    pool = request.getfixturevalue("browser_pool")
+
+    # With '--browser-contexts', the test runs in a new browser context of the pooled browser (see
+    # browser_context.py), which starts out empty, so the browser itself does not need to be reset.
+    if use_contexts:
+        driver = pool.acquire(reset=False)
         try:
-
-            # Create a FirefoxService instance, which is responsible for managing the GeckoDriver executable.
-            # The GeckoDriverManager().install() method downloads and installs the GeckoDriver executable if it's not already present.
-            service = FirefoxService(GeckoDriverManager().install())
-
-            # Initialize the Firefox WebDriver instance, passing in the FirefoxService instance and the FirefoxOptions instance.
-            driver = webdriver.Firefox(service=service, options=opts)
-            print("GeckoDriver initialized successfully.")
-
-        # Catch any exceptions that occur during GeckoDriver initialization and handle them accordingly.
+            context = BrowserContext(driver, LoginPage.URL)
         except Exception as e:
+            pool.discard(driver)
+            pytest.fail(f"Failed to create a browser context: {e}")
+
+        # The network policy's DevTools settings belong to a tab, so apply them to the context's tab too.
+        network_policy.active.apply_chrome_driver(driver)
+        network_policy.active.collect(driver)
+        _test_drivers[request.node.nodeid] = driver
+        yield driver
+        _record_network_stats(request.node, driver)
+
+        # Dispose of the context and everything the test stored in it. If that fails, the browser
+        # can't be trusted to be clean anymore, so it is replaced.
+        try:
+            context.close()
+        except Exception as e:
+            print(f"Failed to close the browser context, replacing the browser: {e}")
+            pool.discard(driver)
+        else:
+            _release_browser(request.node, pool, driver)
+        return
 
-            # Log an error message with the exception details.
-            # Fail the test setup using pytest.fail, passing in an error message with the exception details.
-            print(f"Error initializing GeckoDriver: {e}")
-            pytest.fail(f"Failed to initialize GeckoDriver: {e}")
-
-    else:
-        # Handle unsupported browser choice
-        error_message = f"Unsupported browser '{browser}' specified. Choose 'chrome' or 'firefox'."
-        print(error_message)
-        pytest.fail(error_message)
-
-    # Set an implicit wait time of 10 seconds. This instructs WebDriver to wait
-    # for up to 10 seconds when trying to find an element on the page. This gives the page time to load.
-    driver.implicitly_wait(10)
+    driver = pool.acquire()
 
-    # Pauses the driver fixture and allows the test function to use the driver. Code prior to this
-    # is the setup phase of the driver. Code after this, is the teardown phase of the driver.
+    # Throw away the network activity of the pool's reset, so only this test's requests are counted.
+    network_policy.active.collect(driver)
+    _test_drivers[request.node.nodeid] = driver
     yield driver
+    _record_network_stats(request.node, driver)
+    _release_browser(request.node, pool, driver)
+
+# Gives a pooled browser back to the pool after a test. If the browser went over one of the browser health
+# limits, it is quit instead (the next test gets a new one), and the recycle is added to the test's report,
+# so it also reaches the main process from parallel workers.
+def _release_browser(item, pool, driver):
+    event = browser_health.supervisor.check(driver, item.nodeid) if browser_health.supervisor else None
+    if event is None:
+        pool.release(driver)
+        return
+    print(f"Recycling the browser after {event.tests} tests: {event.reason}")
+    item.user_properties.append(("browser_recycled", asdict(event)))
+    pool.discard(driver)
+
+# {nodeid: NetworkStats} of the tests run with a network policy that blocks something.
+_network_stats = {}
+
+# Records the requests blocked by the network policy during a test, and adds them to the test's report.
+def _record_network_stats(item, driver):
+    if not network_policy.active.enabled:
+        return
+    stats = network_policy.active.collect(driver)
+    _network_stats[item.nodeid] = stats
+    item.user_properties.append(("blocked_requests", stats.blocked_requests))
+    item.user_properties.append(("transferred_bytes", stats.transferred_bytes))
+
+# Fixture that logs in as "standard_user" without going through the login page (see seeding.py)
+# and returns the products page with an empty cart.
+@pytest.fixture
+def logged_in_products(driver):
+    seed_state(driver, "standard_user")
+    return ProductsPage(driver)
+
+# Fixture that returns a function. Calling it, e.g. cart_with("sauce-labs-backpack", "sauce-labs-bike-light"),
+# logs in and fills the cart with those products without going through the UI, then returns the cart page.
+# 'username' can be used to log in as another user.
+@pytest.fixture
+def cart_with(driver):
+    def _cart_with(*product_ids: str, username: str = "standard_user") -> CartPage:
+        seed_state(driver, username, product_ids, page="cart.html")
+        return CartPage(driver)
+
+    return _cart_with
+
+# Fixture used by every test that brings the browser of a test marked with '@pytest.mark.journey(steps=...)'
+# to the start of the test (see journeys.py): the first test of a journey runs 'steps(driver)', the others
+# get a snapshot of the state it left restored. The browser was reset (or is new), so the test sees no
+# state of another test. Tests without the marker are left alone.
+@pytest.fixture(autouse=True)
+def journey(request):
+    build = journeys.marked_journey(request.node)
+    if build is None:
+        return
+    driver = request.getfixturevalue("driver")
+    if journeys.cache is None:
+        build(driver)
+        return
+    built = journeys.cache.enter(driver, build)
+    request.node.user_properties.append(("journey", "built" if built else "restored"))
+
+# Pytest hook that runs before each test. Tells waits.py which test is running, so that every
+# wait recorded in waits.WAIT_LOG can be attributed to the test that performed it (and the same for
+# the page timings).
+def pytest_runtest_setup(item):
+    waits.current_test = item.nodeid
+    if page_timing.monitor is not None:
+        page_timing.monitor.current_test = item.nodeid
+
+# Pytest hook that adds sections to the summary printed at the end of the run.
+def pytest_terminal_summary(terminalreporter, config):
+    _profile_summary(terminalreporter, config)
+    _network_summary(terminalreporter, config)
+    _wait_summary(terminalreporter, config)
+    _page_timing_summary(terminalreporter, config)
+    _health_summary(terminalreporter, config)
+    _impact_summary(terminalreporter, config)
+    _artifacts_summary(terminalreporter, config)
+    _journey_summary(terminalreporter, config)
+
+# With '--profile-webdriver', writes the profile report and shows the slowest page-object methods.
+def _profile_summary(terminalreporter, config):
+    if not _profiler:
+        return
+    _profiler.stop()
+    path = _profile_path(config)
+
+    # After a parallel run, the commands were recorded by the workers. Merge their reports into this one.
+    if not _worker_results:
+        for worker_path in glob.glob(f"{os.path.splitext(path)[0]}.worker*.json"):
+            _profiler.load(worker_path)
+            os.remove(worker_path)
+            folded = os.path.splitext(worker_path)[0] + ".folded"
+            if os.path.exists(folded):
+                os.remove(folded)
+
+    folded_path = _profiler.write(path)
+    terminalreporter.section("webdriver profile")
+    _profiler.summary(terminalreporter)
+    terminalreporter.write_line(f"Profile written to {path} (flamegraph stacks: {folded_path})")
+
+# With a '--network-policy' that blocks something, shows the requests blocked in each test.
+# 'n/a' means the browser could not report the number (see network_policy.py).
+def _network_summary(terminalreporter, config):
+    network_policy.active.close()
+    if not _network_stats:
+        return
+
+    def show(value):
+        return "n/a" if value is None else str(value)
+
+    terminalreporter.section(f"network policy: {network_policy.active.preset}")
+    for nodeid, stats in _network_stats.items():
+        terminalreporter.write_line(
+            f"  {show(stats.blocked_requests):>5} blocked  {show(stats.transferred_bytes):>10} bytes downloaded  {nodeid}"
+        )
+
+# With '--wait-report', shows the tests that spent the most time waiting and the slowest waits.
+def _wait_summary(terminalreporter, config):
+    if not config.getoption("--wait-report") or not waits.WAIT_LOG:
+        return
+
+    terminalreporter.section("explicit waits")
+
+    # Add up the wait time of each test.
+    per_test = {}
+    for record in waits.WAIT_LOG:
+        per_test[record.test] = per_test.get(record.test, 0.0) + record.duration
+
+    terminalreporter.write_line("Total wait time per test:")
+    for test, total in sorted(per_test.items(), key=lambda entry: entry[1], reverse=True):
+        terminalreporter.write_line(f"  {total:8.3f}s  {test}")
+
+    terminalreporter.write_line("Slowest waits:")
+    for record in sorted(waits.WAIT_LOG, key=lambda r: r.duration, reverse=True)[:10]:
+        outcome = "ok" if record.succeeded else "TIMEOUT"
+        terminalreporter.write_line(f"  {record.duration:8.3f}s  {outcome:7}  {record.description}  ({record.test})")
+
+    # Every cache miss is one of the waits above. Hits are lookups the element caches saved.
+    stats = locators.CACHE_STATS
+    terminalreporter.write_line(
+        f"Element cache: {stats.hits} hits, {stats.misses} misses, {stats.stale} stale elements found again"
+    )
 
-    # Once the test function (or all tests within the fixture's scope) has completed, this closes 
-    # all browser windows opened by this WebDriver instance and releases associated system resources.
-    driver.quit()
+# With '--page-timing', shows the median of every page metric over the last runs (this one last).
+def _page_timing_summary(terminalreporter, config):
+    if page_timing.monitor is None or _worker_results or not _page_timings:
+        return
+    history = page_timing.TimingHistory(_page_timing_db(config))
+    lines = page_timing.trend_lines(history.trend())
+    history.close()
+
+    terminalreporter.section("page timing")
+    terminalreporter.write_line("Median per run, oldest first, and the change of this run against the runs before:")
+    for line in lines:
+        terminalreporter.write_line(line)
+
+# With the browser health options, lists the browsers that were recycled and why.
+def _health_summary(terminalreporter, config):
+    if browser_health.supervisor is None or _worker_results:
+        return
+    browser_health.supervisor.stop()
+    terminalreporter.section("browser health")
+    if not _recycled_browsers:
+        terminalreporter.write_line("No browser was recycled.")
+        return
+    terminalreporter.write_line(f"{len(_recycled_browsers)} browsers recycled:")
+    for event in _recycled_browsers:
+        terminalreporter.write_line(f"  after {event['test']} ({event['tests']} tests): {event['reason']}")
+
+# With '--impact' or '--impact-record', says which tests were selected and why, or where the map went.
+def _impact_summary(terminalreporter, config):
+    if _worker_results:
+        return
+    if _impact_selection is not None:
+        terminalreporter.section("test impact")
+        if _impact_selection.nodeids is None:
+            terminalreporter.write_line(f"Ran the full suite: {_impact_selection.reason}.")
+        else:
+            terminalreporter.write_line(f"Ran {_impact_selection.reason}.")
+    elif _impact_tests:
+        terminalreporter.section("test impact")
+        terminalreporter.write_line(f"Impact map of {len(_impact_tests)} tests written to {_impact_map_path(config)}")
+
+# Lists where the failure artifacts of the failed tests were saved, and the ones that couldn't be. A parallel
+# worker shows its errors in its own log.
+def _artifacts_summary(terminalreporter, config):
+    if not _failure_artifacts and not _artifact_errors:
+        return
+    terminalreporter.section("failure artifacts")
+    for error in _artifact_errors:
+        terminalreporter.write_line(f"Could not save failure artifacts: {error}", red=True)
+    for nodeid, folder in _failure_artifacts.items():
+        terminalreporter.write_line(f"  {folder}  {nodeid}")
+    skipped = artifacts.active.skipped if artifacts.active is not None else 0
+    if skipped:
+        terminalreporter.write_line(f"{skipped} files were not saved, the size limit (--failure-artifacts-max-mb) was reached.")
+
+# Shows how many tests built their journey and how many got it restored from a snapshot.
+def _journey_summary(terminalreporter, config):
+    if _worker_results or not _journey_counts["restored"]:
+        return
+    terminalreporter.section("journeys")
+    terminalreporter.write_line(
+        f"Journeys built: {_journey_counts['built']}, restored from a snapshot: {_journey_counts['restored']}."
+    )
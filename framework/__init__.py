@@ -0,0 +1 @@
+# Initializes the 'framework' package.
\ No newline at end of file
@@ -0,0 +1,249 @@
+import base64
+import collections
+import concurrent.futures
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from framework import instrumentation
+
+# Number of WebDriver commands kept per browser, the last of which are saved with a failure.
+COMMAND_HISTORY = 20
+
+# Page sources larger than this are cut off before they are compressed (a page that big is a bug itself).
+MAX_PAGE_SOURCE = 5 * 1024 * 1024
+
+# Parameters of a saved command longer than this are cut off (e.g. the scripts of execute_script).
+MAX_PARAM_LENGTH = 200
+
+# File that marks a folder as made by this module (a test's folder, or the screenshots). Only such folders
+# are deleted at the start of a run, so the artifacts folder can hold other files, or be any folder.
+MARKER = ".failure_artifacts"
+
+# Folder (inside the artifacts folder) of the screenshots, stored once per distinct image.
+SCREENSHOTS = "screenshots"
+
+
+# The WebDriver commands recently sent by each browser, so a failure can show what the test did last.
+# Enabled together with the failure artifacts (see conftest.py). Recording a command only appends the
+# event to a bounded deque; the commands are only formatted when a test fails.
+class CommandHistory:
+
+    def __init__(self, size: int = COMMAND_HISTORY):
+        self.size = size
+
+        # {driver: deque of CommandEvent}. Weak keys, so quit browsers are forgotten by themselves.
+        self.commands = weakref.WeakKeyDictionary()
+
+    def start(self) -> None:
+        instrumentation.add_listener(self.on_command)
+
+    def stop(self) -> None:
+        instrumentation.remove_listener(self.on_command)
+
+    # Listener called by instrumentation.py after every command.
+    def on_command(self, event) -> None:
+        history = self.commands.get(event.driver)
+        if history is None:
+            history = self.commands[event.driver] = collections.deque(maxlen=self.size)
+        history.append(event)
+
+    # Returns the last commands of a browser, oldest first.
+    def last(self, driver) -> list:
+        return list(self.commands.get(driver, ()))
+
+
+# What was grabbed from the browser when a test failed, before anything is encoded or written. Whatever
+# the browser couldn't give is None (e.g. the console log outside Chrome, anything from a dead browser).
+@dataclass
+class Capture:
+    test: str
+    url: Optional[str] = None
+    screenshot: Optional[str] = None
+    page_source: Optional[str] = None
+    console: Optional[list] = None
+    commands: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+
+
+# Saves the screenshot, page source, console log and last WebDriver commands of failed tests. Grabbing
+# them from the browser has to happen while the test's browser is still on the failed page, but decoding,
+# compressing and writing the files happen on a small thread pool, so a failure costs the test only the
+# WebDriver round trips. Passing tests cost nothing but the command history. Every failed test gets its
+# own folder: screenshot.png, page.html.gz and log.json.gz (the URL, console log and last commands).
+# Identical screenshots (e.g. the same error page in many tests) are stored once, in 'screenshots', and
+# linked from the tests' folders. Once 'max_bytes' have been written, further artifacts are skipped.
+class FailureArtifacts:
+
+    def __init__(self, directory: str, max_bytes: int, history: CommandHistory, workers: int = 2):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.history = history
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="failure-artifacts")
+        self.futures = []
+
+        # Bytes written by this process, and the files skipped because of the size limit. Updated by the pool.
+        self.lock = threading.Lock()
+        self.written = 0
+        self.skipped = 0
+
+    # Grabs what is needed from the browser of a failed test and queues the writing. Returns the test's
+    # artifact folder and the names of the files that will be in it, for the report.
+    def capture(self, driver, test: str) -> tuple:
+        capture = Capture(test, commands=self.history.last(driver))
+        capture.url = self._grab(capture, "url", lambda: driver.current_url)
+
+        # The screenshot is taken as WebDriver sends it (base64), and decoded by the pool.
+        capture.screenshot = self._grab(capture, "screenshot", lambda: driver.get_screenshot_as_base64())
+        capture.page_source = self._grab(capture, "page source", lambda: driver.page_source)
+
+        # Only Chrome has a console log over WebDriver. Other drivers fail, or don't have the method.
+        capture.console = self._grab(capture, "console log", lambda: driver.get_log("browser"))
+
+        folder = os.path.join(self.directory, _folder_name(test))
+        files = ["log.json.gz"]
+        if capture.screenshot is not None:
+            files.insert(0, "screenshot.png")
+        if capture.page_source is not None:
+            files.insert(-1, "page.html.gz")
+        self.futures.append(self.pool.submit(self._write, capture, folder))
+        return folder, files
+
+    # Returns what 'read' returns, or None if the driver can't give it (a dead browser, or a driver without
+    # the command, such as the fake driver without screenshots). The test already failed, so this must not.
+    @staticmethod
+    def _grab(capture: Capture, what: str, read):
+        try:
+            return read()
+        except (WebDriverException, OSError, AttributeError) as e:
+            capture.errors.append(f"could not get the {what}: {_first_line(e)}")
+            return None
+
+    # Runs on the pool: encodes, compresses and writes the artifacts of one failure.
+    def _write(self, capture: Capture, folder: str) -> None:
+        if os.path.isdir(folder):
+            shutil.rmtree(folder, ignore_errors=True)
+        os.makedirs(folder)
+        _mark(folder)
+
+        if capture.screenshot is not None:
+            self._write_screenshot(base64.b64decode(capture.screenshot), os.path.join(folder, "screenshot.png"))
+        if capture.page_source is not None:
+            source = capture.page_source[:MAX_PAGE_SOURCE].encode("utf-8", "replace")
+            self._write_file(os.path.join(folder, "page.html.gz"), gzip.compress(source, compresslevel=5))
+
+        log = {
+            "test": capture.test,
+            "url": capture.url,
+            "console": capture.console,
+            "commands": [_command(event) for event in capture.commands],
+            "errors": capture.errors,
+        }
+        self._write_file(os.path.join(folder, "log.json.gz"), gzip.compress(json.dumps(log, indent=1).encode(), compresslevel=5))
+
+    # Stores a screenshot once per distinct image, and links it into the test's folder.
+    def _write_screenshot(self, png: bytes, target: str) -> None:
+        digest = hashlib.sha256(png).hexdigest()[:20]
+        stored = os.path.join(self.directory, SCREENSHOTS, f"{digest}.png")
+
+        # Files only appear once they are complete (see _write_file()). Two threads or parallel workers
+        # storing the same new image at the same time both write it, and one replaces the other.
+        if not os.path.exists(stored):
+            os.makedirs(os.path.dirname(stored), exist_ok=True)
+            _mark(os.path.dirname(stored))
+            if not self._write_file(stored, png):
+                return
+        try:
+            os.link(stored, target)
+        except OSError:
+            try:
+                os.symlink(os.path.relpath(stored, os.path.dirname(target)), target)
+            except OSError:
+                pass
+
+    # Writes a file, unless this process went over its size limit. The file is written under a temporary
+    # name and renamed, so it is never seen half written. Returns whether it was written.
+    def _write_file(self, path: str, data: bytes) -> bool:
+        with self.lock:
+            if self.written + len(data) > self.max_bytes:
+                self.skipped += 1
+                return False
+            self.written += len(data)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".writing-")
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)
+        return True
+
+    # Waits for the queued writes to finish. Called once at the end of the run. Returns the errors of
+    # the writes that failed.
+    def close(self) -> list:
+        errors = []
+        for future in self.futures:
+            error = future.exception()
+            if error is not None:
+                errors.append(error)
+        self.pool.shutdown()
+        self.history.stop()
+        return errors
+
+
+# Deletes the artifacts of a previous run: the folders in 'directory' this module made. Anything else in
+# it is left alone, and so is the folder itself.
+def clear(directory: str) -> None:
+    try:
+        entries = os.listdir(directory)
+    except OSError:
+        return
+    for name in entries:
+        path = os.path.join(directory, name)
+        if not os.path.islink(path) and os.path.isfile(os.path.join(path, MARKER)):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# Marks a folder as made by this module (see clear()).
+def _mark(folder: str) -> None:
+    marker = os.path.join(folder, MARKER)
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+
+
+# Returns a folder name for a test id, e.g. "tests/test_shopping_flow.py::test_cart[a-b]" becomes
+# "test_shopping_flow.py--test_cart-a-b-" plus a short hash, so different ids never share a folder.
+def _folder_name(test: str) -> str:
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "-", test.split("/")[-1].replace("::", "--"))[:100]
+    return f"{name}-{hashlib.sha1(test.encode()).hexdigest()[:8]}"
+
+
+# A command of the history as saved in log.json.gz. Typed text is left out, it may be a password.
+def _command(event) -> dict:
+    params = {}
+    for name, value in event.params.items():
+        if name in ("text", "value") and event.command == "sendKeysToElement":
+            value = f"<{len(value)} characters>"
+        value = value if isinstance(value, (int, float, bool, type(None))) else str(value)
+        params[name] = value[:MAX_PARAM_LENGTH] if isinstance(value, str) else value
+    command = {"command": event.command, "params": params, "ms": round(event.duration * 1000, 1)}
+    if event.error is not None:
+        command["error"] = _first_line(event.error)
+    return command
+
+
+# Returns the first line of an error's message (Selenium's messages go on with a stack trace).
+def _first_line(error: Exception) -> str:
+    text = str(error).strip()
+    return text.splitlines()[0] if text else type(error).__name__
+
+
+# The failure artifacts of this test process, unless '--no-failure-artifacts' is used. Set by conftest.py.
+active: Optional[FailureArtifacts] = None
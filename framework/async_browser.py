@@ -0,0 +1,138 @@
+import asyncio
+import os
+import shutil
+import tempfile
+
+from framework import driver_cache
+from framework.browser_profile import SETTINGS
+from framework.cdp import CDPConnection, CDPSession
+
+# Command line arguments Chrome is started with. They come from the settings create_driver() gives
+# Chrome through ChromeDriver (see browser_profile.py), so pages look and behave the same in both APIs.
+CHROME_ARGUMENTS = [
+    *SETTINGS.chrome_arguments(),
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--password-store=basic",
+]
+
+# How long to wait for Chrome to start its DevTools server.
+LAUNCH_TIMEOUT = 30
+
+
+# A headless Chrome driven directly over its DevTools websocket, without ChromeDriver or WebDriver.
+# One browser and one websocket connection serve many sessions: every session is a tab in its own
+# browser context (like an incognito window), so sessions share nothing, and the commands of all
+# sessions are in flight at the same time on the connection. With the async page objects (pages/aio),
+# one process can drive dozens of sessions concurrently:
+#   async with await AsyncBrowser.launch() as browser:
+#       sessions = [await browser.new_session() for _ in range(20)]
+#       await asyncio.gather(*(journey(session) for session in sessions))
+class AsyncBrowser:
+
+    def __init__(self, process, connection: CDPConnection, user_data_dir: str):
+        self.process = process
+        self.connection = connection
+        self.user_data_dir = user_data_dir
+
+    # Starts Chrome with its DevTools server on a free port and connects to it.
+    @classmethod
+    async def launch(cls, executable: str = None) -> "AsyncBrowser":
+        executables = [executable] if executable else driver_cache.browser_executables("chrome")
+        if not executables:
+            raise RuntimeError("Chrome was not found, pass the path of its executable to AsyncBrowser.launch()")
+
+        # With port 0, Chrome picks a free port and writes it to the "DevToolsActivePort" file of its
+        # profile folder, so many browsers can run side by side.
+        user_data_dir = tempfile.mkdtemp(prefix="swag-labs-chrome-")
+        process = await asyncio.create_subprocess_exec(
+            executables[0],
+            *CHROME_ARGUMENTS,
+            "--remote-debugging-port=0",
+            f"--user-data-dir={user_data_dir}",
+            "about:blank",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            url = await cls._devtools_url(process, user_data_dir)
+            connection = await CDPConnection.connect(url)
+        except BaseException:
+            process.kill()
+            await process.wait()
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+        return cls(process, connection, user_data_dir)
+
+    # Waits for the "DevToolsActivePort" file (port on the first line, websocket path on the second)
+    # and returns the URL of the browser's websocket.
+    @staticmethod
+    async def _devtools_url(process, user_data_dir: str) -> str:
+        path = os.path.join(user_data_dir, "DevToolsActivePort")
+        deadline = asyncio.get_running_loop().time() + LAUNCH_TIMEOUT
+        while asyncio.get_running_loop().time() < deadline:
+            if process.returncode is not None:
+                raise RuntimeError(f"Chrome exited with code {process.returncode} while starting")
+            try:
+                with open(path) as file:
+                    lines = file.read().split()
+            except OSError:
+                lines = []
+            if len(lines) == 2:
+                return f"ws://127.0.0.1:{lines[0]}{lines[1]}"
+            await asyncio.sleep(0.05)
+        raise RuntimeError(f"Chrome did not start its DevTools server within {LAUNCH_TIMEOUT}s")
+
+    # Opens a new session: a tab in a new browser context, showing 'url'.
+    async def new_session(self, url: str = "about:blank") -> CDPSession:
+        context_id = (await self.connection.send("Target.createBrowserContext", {"disposeOnDetach": True}))[
+            "browserContextId"
+        ]
+        target_id = (
+            await self.connection.send("Target.createTarget", {"url": "about:blank", "browserContextId": context_id})
+        )["targetId"]
+
+        # "flatten" sends the tab's commands and events over the browser connection, tagged with the session id.
+        session_id = (await self.connection.send("Target.attachToTarget", {"targetId": target_id, "flatten": True}))[
+            "sessionId"
+        ]
+        session = CDPSession(self.connection, session_id, target_id, context_id)
+
+        # Page and Runtime events are needed for the DOM ready, load and network idle futures.
+        await asyncio.gather(
+            session.send("Page.enable"),
+            session.send("Runtime.enable"),
+            session.send("Page.setLifecycleEventsEnabled", {"enabled": True}),
+        )
+        if url != "about:blank":
+            await navigate(session, url)
+        return session
+
+    # Closes a session's tab and disposes of its browser context, with all its cookies and storage.
+    async def close_session(self, session: CDPSession) -> None:
+        await self.connection.send("Target.disposeBrowserContext", {"browserContextId": session.context_id})
+
+    async def close(self) -> None:
+        try:
+            await asyncio.wait_for(self.connection.send("Browser.close"), 5)
+        except Exception:
+            self.process.kill()
+        await self.connection.close()
+        await self.process.wait()
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+    async def __aenter__(self) -> "AsyncBrowser":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+# Opens 'url' in a session and returns once its DOM is ready (the DOMContentLoaded event), without polling.
+async def navigate(session: CDPSession, url: str, timeout: float = 30) -> None:
+    dom_ready = session.expect_dom_ready()
+    result = await session.send("Page.navigate", {"url": url})
+    if result.get("errorText"):
+        dom_ready.cancel()
+        raise RuntimeError(f"Failed to open {url}: {result['errorText']}")
+    await asyncio.wait_for(dom_ready, timeout)
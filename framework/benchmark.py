@@ -0,0 +1,429 @@
+import argparse
+import datetime
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from importlib import metadata
+from typing import Callable, Optional
+
+import pytest
+
+from framework import browser_factory
+from framework.browser_factory import create_driver
+from framework.browser_pool import BrowserPool
+from framework.seeding import seed_state
+from pages.cart_page import CartPage
+from pages.login_page import LoginPage
+from pages.overview_page import OverviewPage
+from pages.products_page import ProductsPage
+from standin.catalog import PASSWORD, PRODUCTS
+
+# Version of the results format. Results written by another version can't be compared.
+RESULTS_VERSION = 1
+
+# Cart sizes the cart page is read with. The catalog has 6 products, so larger carts repeat them.
+CART_SIZES = (1, 10, 50)
+
+# Environment fields that make timings incomparable when they differ between the baseline and this run.
+COMPARABLE_ENVIRONMENT = ("python", "machine", "cpu_count", "selenium")
+
+
+# One benchmark: 'setup' brings the browser (reset to the state of a new one, on the login page) to where
+# the measured step starts and returns what 'run' needs (e.g. a page object). Only 'run' is timed. A
+# benchmark with 'own_driver' gets no shared browser: 'run' is called with the browser name and does its
+# own launch (used to time the launch itself).
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable
+    setup: Optional[Callable] = None
+    own_driver: bool = False
+
+
+# The timings of one benchmark, in seconds.
+@dataclass
+class BenchmarkResult:
+    name: str
+    samples: list
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        quartiles = statistics.quantiles(ordered, n=4) if len(ordered) > 1 else [ordered[0]] * 3
+        return {
+            "samples": self.samples,
+            "median": statistics.median(ordered),
+            "mean": statistics.fmean(ordered),
+            "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+            "iqr": quartiles[2] - quartiles[0],
+            "min": ordered[0],
+            "max": ordered[-1],
+        }
+
+
+# ------------------------------------------------------------------------------------------- benchmarks
+
+def _launch_and_quit(browser: str) -> None:
+    create_driver(browser).quit()
+
+
+def _login_setup(driver) -> LoginPage:
+    return LoginPage(driver)
+
+
+def _login(login: LoginPage) -> None:
+    login.login("standard_user", PASSWORD)
+    assert login.is_logged_in(), "Login failed"
+
+
+def _products_setup(driver) -> ProductsPage:
+    seed_state(driver, "standard_user")
+    return ProductsPage(driver)
+
+
+def _cart_setup(size: int):
+    product_ids = [PRODUCTS[index % len(PRODUCTS)]["product_id"] for index in range(size)]
+
+    def setup(driver) -> CartPage:
+        seed_state(driver, "standard_user", product_ids, page="cart.html")
+        return CartPage(driver)
+
+    return setup
+
+
+def _get_cart_items(size: int):
+    def run(cart: CartPage) -> None:
+        items = cart.get_cart_items()
+        assert len(items) == size, f"Expected {size} items in the cart, got {len(items)}"
+
+    return run
+
+
+def _overview_setup(driver) -> OverviewPage:
+    seed_state(driver, "standard_user", ["sauce-labs-backpack", "sauce-labs-bike-light"], page="checkout-step-two.html")
+    return OverviewPage(driver)
+
+
+# The purchase journey of test_complete_checkout_flow, through the UI from the login page on.
+def _checkout_journey(login: LoginPage) -> None:
+    _login(login)
+    products = ProductsPage(login.driver)
+    products.add_to_cart("sauce-labs-backpack")
+    products.add_to_cart("sauce-labs-bike-light")
+    checkout = products.go_to_cart().click_checkout()
+    checkout.enter_customer_info("Test", "User", "12345")
+    header = checkout.click_continue().finish_checkout().get_complete_header()
+    assert header == "Thank you for your order!", f"Unexpected confirmation header: {header}"
+
+
+# The benchmarks, in the order they run.
+def benchmarks() -> list[Benchmark]:
+    return [
+        Benchmark("launch_and_quit", _launch_and_quit, own_driver=True),
+        Benchmark("LoginPage.login", _login, _login_setup),
+        Benchmark("ProductsPage.add_to_cart", lambda products: products.add_to_cart("sauce-labs-backpack"), _products_setup),
+        *(Benchmark(f"CartPage.get_cart_items[{size}]", _get_cart_items(size), _cart_setup(size)) for size in CART_SIZES),
+        Benchmark("OverviewPage.get_item_total", lambda overview: overview.get_item_total(), _overview_setup),
+        Benchmark("checkout_journey", _checkout_journey, _login_setup),
+    ]
+
+
+# Times one benchmark: 'warmup' untimed runs, then 'repeat' timed ones. Before every run, the shared
+# browser is reset the way the browser pool resets it between tests. The garbage collector is run before
+# and paused during every timed run, so a collection triggered by an earlier run isn't counted.
+def measure(benchmark: Benchmark, pool: BrowserPool, driver, repeat: int, warmup: int) -> BenchmarkResult:
+    samples = []
+    for index in range(warmup + repeat):
+        if benchmark.own_driver:
+            argument = pool.browser
+        else:
+            pool.reset(driver)
+            argument = benchmark.setup(driver) if benchmark.setup else driver
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            benchmark.run(argument)
+            duration = time.perf_counter() - start
+        finally:
+            gc.enable()
+        if index >= warmup:
+            samples.append(duration)
+    return BenchmarkResult(benchmark.name, samples)
+
+
+# Runs the benchmarks whose name contains 'only' (all if None) on one backend, with one shared browser.
+# The results are named "<backend>/<benchmark>", e.g. "fake/CartPage.get_cart_items[10]".
+def run_backend(backend: str, browser: str, repeat: int, warmup: int, only: Optional[str] = None) -> list[BenchmarkResult]:
+    browser_factory.backend = backend
+    selected = [benchmark for benchmark in benchmarks() if only is None or only in benchmark.name]
+    results = []
+    pool = BrowserPool(browser)
+    driver = create_driver(browser) if any(not benchmark.own_driver for benchmark in selected) else None
+    try:
+        for benchmark in selected:
+            result = measure(benchmark, pool, driver, repeat, warmup)
+            result.name = f"{backend}/{benchmark.name}"
+            print(f"  {result.name:50} median {statistics.median(result.samples) * 1000:9.3f} ms")
+            results.append(result)
+    finally:
+        if driver is not None:
+            driver.quit()
+    return results
+
+
+# ------------------------------------------------------------------------------------------- results
+
+# Describes where the results were measured, so a comparison can tell whether they are comparable.
+def environment(backends: list, browser: str) -> dict:
+    try:
+        selenium_version = metadata.version("selenium")
+    except metadata.PackageNotFoundError:
+        selenium_version = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "selenium": selenium_version,
+        "backends": backends,
+        "browser": browser,
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+# Returns the output of a git command in the project, or None without git.
+def _git(*args: str) -> Optional[str]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Writes the results and returns them as written.
+def write_results(path: str, results: list[BenchmarkResult], env: dict, settings: dict) -> dict:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    data = {
+        "version": RESULTS_VERSION,
+        "environment": env,
+        "settings": settings,
+        "benchmarks": {result.name: result.summary() for result in results},
+    }
+    with open(path, "w") as file:
+        json.dump(data, file, indent=1)
+    return data
+
+
+# Reads results written by write_results(). Raises OSError if the file can't be read, and ValueError if it
+# isn't results of this version of the benchmark.
+def load_results(path: str) -> dict:
+    with open(path) as file:
+        data = json.load(file)
+    version = data.get("version") if isinstance(data, dict) else None
+    if version != RESULTS_VERSION:
+        raise ValueError(f"{path} was written by another version of the benchmark (version {version})")
+    return data
+
+
+# ------------------------------------------------------------------------------------------- comparison
+
+# Returns the one-sided p-value of the Mann-Whitney U test that the values of 'a' tend to be larger than
+# those of 'b' (normal approximation, with the correction for ties). Unlike a t-test, it doesn't assume
+# normally distributed timings, which have a long tail of slow outliers.
+def mann_whitney_greater(a: list, b: list) -> float:
+    values = sorted([(value, 0) for value in a] + [(value, 1) for value in b])
+    n1, n2, n = len(a), len(b), len(a) + len(b)
+
+    # Rank the values (1 = smallest), giving tied values the average of their ranks.
+    rank_sum = 0.0
+    ties = 0.0
+    index = 0
+    while index < n:
+        end = index
+        while end + 1 < n and values[end + 1][0] == values[index][0]:
+            end += 1
+        rank = (index + end) / 2 + 1
+        rank_sum += rank * sum(1 for position in range(index, end + 1) if values[position][1] == 0)
+        count = end - index + 1
+        ties += count ** 3 - count
+        index = end + 1
+
+    u = rank_sum - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+# Returns the smallest p-value mann_whitney_greater() can give for samples of these sizes: when every
+# value of one sample is larger than every value of the other. With few samples it is large (0.04 for
+# 3 against 3), and a slowdown can never be significant at a smaller alpha.
+def smallest_p_value(n1: int, n2: int) -> float:
+    return mann_whitney_greater([float(value) for value in range(n2, n2 + n1)], [float(value) for value in range(n2)])
+
+
+# How one benchmark compares with the baseline.
+@dataclass
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+    p_slower: float
+    p_faster: float
+    verdict: str
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline if self.baseline else 0.0
+
+
+# Compares the benchmarks of two results. A benchmark has regressed when its median got slower by more
+# than 'threshold' (a fraction, 0.1 = 10%) and the samples say it is slower with a p-value below 'alpha'.
+# Both are needed: a big change in few noisy samples isn't significant, and a significant 1% change isn't
+# worth failing a build for. Improvements are found the same way.
+def compare(baseline: dict, current: dict, threshold: float, alpha: float) -> list[Comparison]:
+    comparisons = []
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+        p_slower = mann_whitney_greater(result["samples"], before["samples"])
+        p_faster = mann_whitney_greater(before["samples"], result["samples"])
+        comparison = Comparison(name, before["median"], result["median"], p_slower, p_faster, "same")
+        if comparison.change > threshold and p_slower < alpha:
+            comparison.verdict = "REGRESSION"
+        elif comparison.change < -threshold and p_faster < alpha:
+            comparison.verdict = "faster"
+        comparisons.append(comparison)
+    return comparisons
+
+
+# Returns the settings that differ between the baseline and this run ('settings' as written by main()).
+def settings_differences(baseline: dict, settings: dict) -> list[str]:
+    return [
+        f"{name}: {baseline.get('settings', {}).get(name)} -> {value}"
+        for name, value in settings.items()
+        if baseline.get("settings", {}).get(name) != value
+    ]
+
+
+# Returns the environment fields that differ between the baseline and this run.
+def environment_differences(baseline: dict, current: dict) -> list[str]:
+    return [
+        f"{name}: {baseline['environment'].get(name)} -> {current['environment'].get(name)}"
+        for name in COMPARABLE_ENVIRONMENT
+        if baseline["environment"].get(name) != current["environment"].get(name)
+    ]
+
+
+def print_comparison(comparisons: list[Comparison]) -> None:
+    print(f"{'benchmark':50} {'baseline':>10} {'current':>10} {'change':>8} {'p':>8}  verdict")
+    for comparison in comparisons:
+        p = comparison.p_slower if comparison.change >= 0 else comparison.p_faster
+        print(
+            f"{comparison.name:50} {comparison.baseline * 1000:10.3f} {comparison.current * 1000:10.3f} "
+            f"{comparison.change * 100:+7.1f}% {p:8.4f}  {comparison.verdict}"
+        )
+    print("(median times in ms)")
+
+
+# Command line entry point. Exits with 1 if a benchmark regressed against the baseline, 2 if it couldn't run:
+#   python -m framework.benchmark --backend fake --output .benchmarks/baseline.json      # on main
+#   python -m framework.benchmark --backend fake --baseline .benchmarks/baseline.json    # on a branch
+#   python -m framework.benchmark --backend fake --backend selenium --browser chrome --repeat 10
+# The selenium backend runs against the stand-in site, started for the run, so the results don't
+# depend on the network or the real site.
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark browser launches, page-object methods and the checkout journey")
+    parser.add_argument("--backend", action="append", choices=["fake", "selenium"], help="Backend to benchmark (repeatable, default: fake)")
+    parser.add_argument("--browser", default="chrome", choices=["chrome", "firefox"], help="Browser of the selenium backend")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed runs per benchmark")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed runs before the timed ones")
+    parser.add_argument("--only", help="Only run the benchmarks whose name contains this")
+    parser.add_argument("--output", default=".benchmark.json", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Smallest slowdown of the median that counts (0.10 = 10%%)")
+    parser.add_argument("--alpha", type=float, default=0.01, help="Largest p-value at which a slowdown counts")
+    args = parser.parse_args(argv)
+    if args.repeat < 2:
+        parser.error("--repeat must be at least 2")
+    backends = args.backend or ["fake"]
+
+    # The baseline is read before anything runs, so '--output' can be the baseline's own file (the new
+    # results then replace it once they have been compared with it).
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = load_results(args.baseline)
+        except (OSError, ValueError) as e:
+            print(f"Could not read the baseline: {e}")
+            return 2
+
+    # With too few samples, no slowdown can be significant at '--alpha'.
+    baseline_repeat = baseline.get("settings", {}).get("repeat", args.repeat) if baseline else args.repeat
+    smallest_p = smallest_p_value(args.repeat, baseline_repeat)
+    if smallest_p >= args.alpha:
+        runs = f"--repeat {args.repeat}" + (f" (and {baseline_repeat} in the baseline)" if baseline is not None else "")
+        message = f"with {runs}, the p-value can't get below {smallest_p:.4f}, so nothing can be significant at --alpha {args.alpha}"
+        if baseline is not None:
+            parser.error(message)
+        print(f"Warning: {message}. Don't use these results as a baseline.")
+
+    settings = {"repeat": args.repeat, "warmup": args.warmup, "only": args.only}
+    if baseline is not None:
+        for difference in settings_differences(baseline, settings):
+            print(f"Warning: the baseline was measured with other settings ({difference})")
+
+    # The fake driver has the stand-in built in. Real browsers get the stand-in started in its own process.
+    process = None
+    if "selenium" in backends:
+        from standin.server import start_server_process
+        process, url = start_server_process()
+        LoginPage.URL = url if url.endswith("/") else url + "/"
+
+    results = []
+    try:
+        for backend in backends:
+            print(f"Benchmarking the {backend} backend ({args.repeat} runs each):")
+            results.extend(run_backend(backend, args.browser, args.repeat, args.warmup, args.only))
+
+    # create_driver() reports a failed launch with pytest.fail(). A failed benchmark is not a regression.
+    except (Exception, pytest.fail.Exception) as e:
+        print(f"Benchmarking failed: {e}")
+        return 2
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    current = write_results(args.output, results, environment(backends, args.browser), settings)
+    print(f"Results written to {args.output}")
+    if baseline is None:
+        return 0
+
+    for difference in environment_differences(baseline, current):
+        print(f"Warning: the baseline was measured in another environment ({difference})")
+    comparisons = compare(baseline, current, args.threshold, args.alpha)
+    print_comparison(comparisons)
+    regressions = [comparison.name for comparison in comparisons if comparison.verdict == "REGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} benchmarks regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
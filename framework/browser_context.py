@@ -0,0 +1,76 @@
+import itertools
+import json
+import urllib.request
+
+from websocket import create_connection
+
+
+# A connection to the browser-level DevTools endpoint of a Chrome launched by ChromeDriver.
+# Commands sent with 'driver.execute_cdp_cmd' go to the current tab, but creating and disposing
+# browser contexts is only allowed on the browser itself, so those commands are sent here.
+class BrowserDevTools:
+
+    def __init__(self, driver):
+
+        # ChromeDriver reports the address Chrome's DevTools server listens on. Its /json/version page
+        # contains the URL of the browser-level websocket.
+        address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=10) as response:
+            url = json.load(response)["webSocketDebuggerUrl"]
+        self.socket = create_connection(url, timeout=30)
+        self.ids = itertools.count(1)
+
+    # Sends a DevTools command and returns its result. Events received in the meantime are ignored.
+    def send(self, method: str, params: dict = None) -> dict:
+        message_id = next(self.ids)
+        self.socket.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+        while True:
+            message = json.loads(self.socket.recv())
+            if message.get("id") != message_id:
+                continue
+            if "error" in message:
+                raise RuntimeError(f"DevTools command {method} failed: {message['error'].get('message')}")
+            return message.get("result", {})
+
+    def close(self) -> None:
+        self.socket.close()
+
+
+# Returns the browser-level DevTools connection of a driver, opening it the first time.
+def devtools_for(driver) -> BrowserDevTools:
+    if getattr(driver, "_browser_devtools", None) is None:
+        driver._browser_devtools = BrowserDevTools(driver)
+    return driver._browser_devtools
+
+
+# An isolated browser context (like an incognito window) inside an already running Chrome, with one
+# tab in it. Cookies, localStorage, sessionStorage and the cache of a context are not shared with any
+# other context, so a test running in a new context gets the same isolation as a new browser, without
+# launching one. While the context is open, the driver is switched to its tab, and every command the
+# test sends goes there. close() disposes of the context (and everything stored in it) and switches
+# the driver back to the tab it was on before.
+class BrowserContext:
+
+    def __init__(self, driver, url: str = "about:blank"):
+        self.driver = driver
+        self.devtools = devtools_for(driver)
+        self.previous_handle = driver.current_window_handle
+
+        self.context_id = self.devtools.send("Target.createBrowserContext", {"disposeOnDetach": True})["browserContextId"]
+        self.target_id = self.devtools.send(
+            "Target.createTarget", {"url": url, "browserContextId": self.context_id}
+        )["targetId"]
+
+        # ChromeDriver uses the DevTools target id as the window handle of a tab.
+        driver.switch_to.window(self._handle_of(self.target_id))
+
+    # Finds the window handle of the tab with the given DevTools target id.
+    def _handle_of(self, target_id: str) -> str:
+        for handle in self.driver.window_handles:
+            if handle == target_id or handle.endswith(target_id):
+                return handle
+        raise RuntimeError(f"ChromeDriver does not know the new tab {target_id}")
+
+    def close(self) -> None:
+        self.driver.switch_to.window(self.previous_handle)
+        self.devtools.send("Target.disposeBrowserContext", {"browserContextId": self.context_id})
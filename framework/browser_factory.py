@@ -0,0 +1,150 @@
+import time
+
+import pytest
+
+from framework import browser_profile, driver_cache, network_policy
+from framework.instrumentation import CommandEvent, emit, instrument
+from pages.login_page import LoginPage
+
+# Which kind of driver create_driver() returns: "selenium" launches a real browser, "fake" returns an
+# in-memory fake driver showing the stand-in site (see fake_driver.py). Set by conftest.py ('--backend').
+backend = "selenium"
+
+# Launches a brand new browser process for the given browser name ("chrome" or "firefox")
+# and returns the WebDriver instance that controls it. This used to live inline in the
+# 'driver' fixture in conftest.py. It was moved here so that both the fixture and the
+# browser pool (see browser_pool.py) can launch browsers the same way. 'site_url' is the site under test
+# the network policy allows; it defaults to LoginPage.URL, and is only passed by the prewarmer (see
+# prewarm.py), which launches browsers before the 'base_url' fixture has set LoginPage.URL.
+def create_driver(browser: str, site_url: str = None):
+
+    # Remember when the launch started, so its duration can be reported once the browser is up.
+    start = time.perf_counter()
+    site_url = site_url or LoginPage.URL
+
+    # The browser's copy of the profile template, if it gets one (see below).
+    profile_dir = None
+
+    # The fake driver needs no browser. It shows the site at LoginPage.URL, rendered from the
+    # stand-in's catalog and rules, so the page objects can be checked thousands of times per second.
+    if backend == "fake":
+        from framework.fake_driver import FakeDriver
+        from standin.fake_site import SwagLabsSite
+        driver = FakeDriver(SwagLabsSite(), LoginPage.URL)
+
+    # If the browser to be used is Chrome, configure and initialize the Chrome WebDriver.
+    elif browser == "chrome":
+
+        # Selenium's driver classes are imported here, when a browser is really launched, so that runs
+        # that never launch one ('--collect-only', '--help', '--backend fake') don't pay for importing them.
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+        from selenium.webdriver.chrome.service import Service as ChromeService
+
+        # Set up Chrome's options from the settings every browser shares (headless, window size, no password
+        # prompts, no third-party cookies; see browser_profile.py). The browser gets its own copy of the
+        # profile template, which already has the preferences applied and its first run done.
+        opts = ChromeOptions()
+        profile_dir = browser_profile.templates.clone("chrome") if browser_profile.templates else None
+        browser_profile.apply_chrome_options(opts, profile_dir)
+
+        # Block the requests the network policy ('--network-policy') doesn't allow (see network_policy.py).
+        network_policy.active.apply_chrome_options(opts, site_url)
+
+        print("Initializing ChromeDriver...")
+
+        # Attempt to initialize the ChromeDriver. This block includes error handling to catch any exceptions that may occur.
+        try:
+
+            # Create a ChromeService instance, which is responsible for managing the ChromeDriver executable.
+            # resolve_driver() finds the ChromeDriver executable once per session in the on-disk driver cache,
+            # and only downloads it (with webdriver-manager) if it is not cached yet (see driver_cache.py).
+            service = ChromeService(driver_cache.resolve_driver("chrome"))
+
+            # Initialize the Chrome WebDriver instance, passing in the ChromeService instance and the ChromeOptions instance.
+            driver = webdriver.Chrome(service=service, options=opts)
+            network_policy.active.apply_chrome_driver(driver)
+            print("ChromeDriver initialized successfully.")
+
+        # Catch any exceptions that occur during ChromeDriver initialization and handle them accordingly.
+        except Exception as e:
+
+            # Log an error message with the exception details.
+            # Fail the test setup using pytest.fail, passing in an error message with the exception details.
+            print(f"Error initializing ChromeDriver: {e}")
+            if profile_dir:
+                browser_profile.remove_profile(profile_dir)
+            pytest.fail(f"Failed to initialize ChromeDriver: {e}")
+
+    # Else if the Firefox browser is used.
+    elif browser == "firefox":
+
+        # See the comment about importing Selenium above.
+        from selenium import webdriver
+        from selenium.webdriver.firefox.options import Options as FirefoxOptions
+        from selenium.webdriver.firefox.service import Service as FirefoxService
+
+        # See the comment about the browser settings and the profile template above.
+        opts = FirefoxOptions()
+        profile_dir = browser_profile.templates.clone("firefox") if browser_profile.templates else None
+        browser_profile.apply_firefox_options(opts, profile_dir)
+
+        # See the comment about the network policy above.
+        network_policy.active.apply_firefox_options(opts, site_url)
+
+        print("Initializing GeckoDriver...")
+
+        # Attempt to initialize the GeckoDriver. This block includes error handling to catch any exceptions that may occur.
+        try:
+
+            # Create a FirefoxService instance, which is responsible for managing the GeckoDriver executable.
+            # See the comment about resolve_driver() above.
+            service = FirefoxService(driver_cache.resolve_driver("firefox"))
+
+            # Initialize the Firefox WebDriver instance, passing in the FirefoxService instance and the FirefoxOptions instance.
+            driver = webdriver.Firefox(service=service, options=opts)
+            print("GeckoDriver initialized successfully.")
+
+        # Catch any exceptions that occur during GeckoDriver initialization and handle them accordingly.
+        except Exception as e:
+
+            # Log an error message with the exception details.
+            # Fail the test setup using pytest.fail, passing in an error message with the exception details.
+            print(f"Error initializing GeckoDriver: {e}")
+            if profile_dir:
+                browser_profile.remove_profile(profile_dir)
+            pytest.fail(f"Failed to initialize GeckoDriver: {e}")
+
+    else:
+        # Handle unsupported browser choice
+        error_message = f"Unsupported browser '{browser}' specified. Choose 'chrome' or 'firefox'."
+        print(error_message)
+        pytest.fail(error_message)
+
+    # Time every WebDriver command this driver sends, for the features that need it (see instrumentation.py),
+    # and report how long launching the browser took as a "launchBrowser" event.
+    instrument(driver)
+    emit(CommandEvent(driver, "launchBrowser", {"browser": browser}, time.perf_counter() - start))
+
+    # Delete the browser's copy of the profile template when it quits.
+    if profile_dir:
+        _remove_profile_on_quit(driver, profile_dir)
+
+    # No implicit wait is set. An implicit wait makes every lookup that should find nothing block
+    # for the full wait time. The page objects wait explicitly instead (see waits.py and base_page.py).
+
+    return driver
+
+
+# Wraps the driver's 'quit' method so the browser's copy of the profile template is deleted right after
+# the browser has exited. Whatever is left over when the run ends is deleted by ProfileTemplates.close().
+def _remove_profile_on_quit(driver, profile_dir: str) -> None:
+    original_quit = driver.quit
+
+    def quit():
+        try:
+            original_quit()
+        finally:
+            browser_profile.remove_profile(profile_dir)
+
+    driver.quit = quit
@@ -0,0 +1,168 @@
+import collections
+import os
+import statistics
+import weakref
+from dataclasses import dataclass, fields
+from typing import Optional
+
+from framework import instrumentation
+
+# Number of recent WebDriver commands the rolling average command latency of a browser is taken over.
+LATENCY_WINDOW = 50
+
+
+# The limits a pooled browser is recycled at (quit and replaced by a new one). Limits left at None are
+# not checked. The memory is the RSS of the driver's whole process tree (driver, browser, renderers...),
+# which counts memory shared between those processes more than once, so set it from a measured baseline.
+@dataclass(frozen=True)
+class HealthLimits:
+    max_rss_mb: Optional[float] = None
+    max_handles: Optional[int] = None
+    max_latency_ms: Optional[float] = None
+    max_tests: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return any(getattr(self, field.name) is not None for field in fields(self))
+
+
+# The health of one browser after a test. Memory and handles are None when they can't be measured
+# (not on Linux, a remote browser, the fake driver) or when no limit needs them.
+@dataclass
+class BrowserHealth:
+    tests: int
+    rss_mb: Optional[float] = None
+    handles: Optional[int] = None
+    latency_ms: Optional[float] = None
+
+
+# A browser that was recycled after 'test', because of 'reason' (e.g. "rss 812MB > 800MB").
+@dataclass
+class RecycleEvent:
+    test: str
+    browser: str
+    reason: str
+    tests: int
+    rss_mb: Optional[float] = None
+    handles: Optional[int] = None
+    latency_ms: Optional[float] = None
+
+
+# Watches the health of the pooled browsers: the memory and the open handles (file descriptors) of each
+# browser's process tree, the rolling average latency of its WebDriver commands, and the number of tests
+# it ran. Long-lived browsers slowly leak memory and get slower, so once one goes over a limit, check()
+# tells the caller to replace it. Enabled by the browser health options (see conftest.py).
+class HealthSupervisor:
+
+    def __init__(self, limits: HealthLimits):
+        self.limits = limits
+
+        # Per browser: the latencies of its last commands, and the number of tests it ran. Weak keys, so
+        # a browser that was quit for another reason (e.g. a failed reset) is forgotten by itself.
+        self.latencies = weakref.WeakKeyDictionary()
+        self.tests = weakref.WeakKeyDictionary()
+
+        # Every browser recycled by this process.
+        self.events: list[RecycleEvent] = []
+
+    def start(self) -> None:
+        instrumentation.add_listener(self.on_command)
+
+    def stop(self) -> None:
+        instrumentation.remove_listener(self.on_command)
+
+    # Listener called by instrumentation.py after every command. The launch isn't a command of the browser.
+    def on_command(self, event) -> None:
+        if event.command == "launchBrowser":
+            return
+        window = self.latencies.get(event.driver)
+        if window is None:
+            window = self.latencies[event.driver] = collections.deque(maxlen=LATENCY_WINDOW)
+        window.append(event.duration)
+
+    # Measures a browser after a test. Reading the process tree takes a few milliseconds, so it is only
+    # done when there is a memory or handles limit.
+    def measure(self, driver) -> BrowserHealth:
+        health = BrowserHealth(self.tests.get(driver, 0))
+        window = self.latencies.get(driver)
+        if window:
+            health.latency_ms = round(statistics.fmean(window) * 1000, 1)
+        if self.limits.max_rss_mb is not None or self.limits.max_handles is not None:
+            usage = process_tree_usage(_driver_pid(driver))
+            if usage is not None:
+                health.rss_mb, health.handles = usage
+        return health
+
+    # Called after every test with the browser it used. Returns a RecycleEvent if the browser went over a
+    # limit and must be replaced, or None if it can be used for the next test.
+    def check(self, driver, test: str) -> Optional[RecycleEvent]:
+        self.tests[driver] = self.tests.get(driver, 0) + 1
+        health = self.measure(driver)
+        reasons = []
+        if _over(self.limits.max_rss_mb, health.rss_mb):
+            reasons.append(f"rss {health.rss_mb:g}MB > {self.limits.max_rss_mb:g}MB")
+        if _over(self.limits.max_handles, health.handles):
+            reasons.append(f"handles {health.handles} > {self.limits.max_handles}")
+        if _over(self.limits.max_latency_ms, health.latency_ms):
+            reasons.append(f"command latency {health.latency_ms:g}ms > {self.limits.max_latency_ms:g}ms")
+        if self.limits.max_tests is not None and health.tests >= self.limits.max_tests:
+            reasons.append(f"ran {health.tests} tests")
+        if not reasons:
+            return None
+
+        self.latencies.pop(driver, None)
+        self.tests.pop(driver, None)
+        browser = getattr(driver, "capabilities", {}).get("browserName", "")
+        event = RecycleEvent(test, browser, ", ".join(reasons), health.tests, health.rss_mb, health.handles, health.latency_ms)
+        self.events.append(event)
+        return event
+
+
+def _over(limit, value) -> bool:
+    return limit is not None and value is not None and value > limit
+
+
+# Returns the pid of the driver process (chromedriver, geckodriver) Selenium started, whose process
+# tree includes the browser. None for drivers without a local process.
+def _driver_pid(driver) -> Optional[int]:
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+# Returns (RSS in MB, open file descriptors) of a process and all its descendants, read from /proc.
+# Returns None if that isn't possible (no pid, or not Linux).
+def process_tree_usage(pid: Optional[int]) -> Optional[tuple]:
+    if pid is None or not os.path.isdir(f"/proc/{pid}"):
+        return None
+
+    # Map every process to its children. The parent pid is the 2nd field after the "(command)" in stat.
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as file:
+                parent = int(file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    rss = handles = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+
+        # The process may have exited in the meantime.
+        try:
+            with open(f"/proc/{current}/statm") as file:
+                rss += int(file.read().split()[1]) * page_size
+            handles += len(os.listdir(f"/proc/{current}/fd"))
+        except (OSError, IndexError, ValueError):
+            continue
+    return round(rss / 1024 / 1024, 1), handles
+
+
+# The supervisor of this test process, when a browser health limit is set. Set by conftest.py.
+supervisor: Optional[HealthSupervisor] = None
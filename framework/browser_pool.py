@@ -0,0 +1,107 @@
+from framework import prewarm
+from framework.browser_factory import create_driver
+from pages.login_page import LoginPage
+
+# This class keeps a pool of long-lived browsers for one test process (one pytest worker).
+# Launching Chrome/Firefox is the slowest part of a test, so instead of starting a new browser
+# for every test, a browser is handed out to a test, returned to the pool when the test is done,
+# and fully reset before it is handed out again. Tests get the same isolation they would get from
+# a brand new browser: no cookies, no localStorage/sessionStorage, a single tab, on the login page.
+class BrowserPool:
+
+    # 'browser' is the browser name passed to create_driver ("chrome" or "firefox").
+    def __init__(self, browser: str):
+        self.browser = browser
+
+        # Browsers that are not currently used by a test.
+        self.idle = []
+
+        # Every browser this pool launched and has not quit yet, so close() can quit all of them.
+        self.all = []
+
+        # Simple counters that are printed at the end of the session.
+        self.launched = 0
+        self.reused = 0
+        self.discarded = 0
+
+    # Hands out a browser that is ready to be used by a test. 'reset=False' skips resetting a reused
+    # browser, for callers that isolate the test some other way (see browser_context.py).
+    def acquire(self, reset: bool = True):
+
+        # Reuse an idle browser if there is one. A reused browser has been used by an earlier test,
+        # so it is reset first. If the reset fails, the browser is thrown away and we try the next one.
+        while self.idle:
+            driver = self.idle.pop()
+            try:
+                if reset:
+                    self.reset(driver)
+            except Exception as e:
+                print(f"Browser failed to reset, replacing it: {e}")
+                self.discard(driver)
+                continue
+            self.reused += 1
+            return driver
+
+        # No idle browser could be reused, so take one launched in the background since the run
+        # started (see prewarm.py), or launch a new one. A new browser is already clean.
+        driver = prewarm.take(self.browser) or create_driver(self.browser)
+        self.all.append(driver)
+        self.launched += 1
+        return driver
+
+    # Gives a browser back to the pool once the test that used it has finished.
+    def release(self, driver) -> None:
+        self.idle.append(driver)
+
+    # Quits a browser and removes it from the pool for good.
+    def discard(self, driver) -> None:
+        if driver in self.all:
+            self.all.remove(driver)
+        self.discarded += 1
+
+        # The browser may already be broken (that's often why it is discarded), so ignore errors.
+        _quit(driver)
+
+    # Puts a used browser back into the same state as a freshly launched one.
+    def reset(self, driver) -> None:
+
+        # Close every tab/window except the first one, then switch back to the first one.
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        # Cookies and web storage can only be cleared for the site that is currently open,
+        # so make sure the browser is on the application before clearing them.
+        if not driver.current_url.startswith(LoginPage.URL):
+            driver.get(LoginPage.URL)
+
+        # Delete all cookies and clear localStorage and sessionStorage. The site keeps the
+        # logged in user in a cookie and the cart contents in localStorage.
+        driver.delete_all_cookies()
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+
+        # Navigate back to the login page, so the page is loaded again without the old state.
+        driver.get(LoginPage.URL)
+
+    # Quits every browser in the pool. Called once at the end of the session.
+    def close(self) -> None:
+        for driver in list(self.all):
+            _quit(driver)
+        self.all.clear()
+        self.idle.clear()
+
+
+# Quits a browser, ignoring errors, and closes its DevTools connection if browser_context.py opened one.
+def _quit(driver) -> None:
+    devtools = getattr(driver, "_browser_devtools", None)
+    if devtools is not None:
+        try:
+            devtools.close()
+        except Exception:
+            pass
+    try:
+        driver.quit()
+    except Exception:
+        pass
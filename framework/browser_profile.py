@@ -0,0 +1,272 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from framework import driver_cache
+
+# The ioctl that makes a file a copy-on-write clone of another file (Linux, on btrfs and XFS).
+FICLONE = 0x40049409
+
+# Free space the /dev/shm tmpfs needs for the profiles to be kept there with '--profile-tmpfs'. Chrome
+# uses the same space for its shared memory, and Docker gives /dev/shm only 64 MB by default.
+TMPFS_MIN_FREE = 1024 * 1024 * 1024
+
+# How long the one-off first run that initializes a profile template may take.
+WARM_UP_TIMEOUT = 30
+
+# Files a browser leaves in its profile while it runs (locks, its DevTools port) or that are only
+# caches. They are removed from a template after its first run, so every copy starts clean.
+VOLATILE_FILES = [
+    "SingletonLock", "SingletonSocket", "SingletonCookie", "DevToolsActivePort", "lock", ".parentlock",
+    "Crashpad", "crashes", "minidumps", "GrShaderCache", "ShaderCache", "GraphiteDawnCache",
+    os.path.join("Default", "Cache"), os.path.join("Default", "Code Cache"), os.path.join("Default", "GPUCache"),
+    "cache2", "startupCache", "screenshot.png",
+]
+
+
+# The settings every browser is launched with, in one place. create_driver() turns them into the
+# Chrome and Firefox options, and the profile templates below write the same preferences into the
+# template profiles, so a browser behaves the same whether its profile came from a template or not.
+@dataclass(frozen=True)
+class BrowserSettings:
+
+    # Run without a visible window, at a fixed window size, so pages render the same everywhere.
+    headless: bool = True
+    width: int = 1920
+    height: int = 1080
+
+    # Chrome features to turn off: password leak detection and the UI change that comes with it, whose
+    # popups can appear even with the password manager turned off.
+    disabled_chrome_features: tuple = ("PasswordLeakDetection", "PasswordLeakToggleMove")
+
+    # Never offer to save passwords. The "Save password?" prompts get in the way of the tests.
+    save_passwords: bool = False
+
+    # Block third-party cookies but still allow first-party cookies, minimizing cookie-consent dialogs
+    # and preventing external trackers from affecting tests.
+    block_third_party_cookies: bool = True
+
+    def chrome_arguments(self) -> list[str]:
+        arguments = ["--disable-gpu", f"--window-size={self.width},{self.height}"]
+        if self.headless:
+            arguments.insert(0, "--headless=new")
+
+        # Chrome only uses the last '--disable-features' argument, so all features go in one.
+        if self.disabled_chrome_features:
+            arguments.append(f"--disable-features={','.join(self.disabled_chrome_features)}")
+        return arguments
+
+    # Chrome preferences, with dotted names (e.g. "profile.password_manager_enabled").
+    def chrome_prefs(self) -> dict:
+        return {
+            "credentials_enable_service": self.save_passwords,
+            "profile.password_manager_enabled": self.save_passwords,
+            "profile.password_manager_leak_detection_enabled": False,
+            "profile.block_third_party_cookies": self.block_third_party_cookies,
+        }
+
+    def firefox_arguments(self) -> list[str]:
+        arguments = [f"--width={self.width}", f"--height={self.height}"]
+        if self.headless:
+            arguments.insert(0, "--headless")
+        return arguments
+
+    def firefox_prefs(self) -> dict:
+        return {
+            "signon.rememberSignons": self.save_passwords,
+
+            # 1 = only accept cookies from the site that is open.
+            "network.cookie.cookieBehavior": 1 if self.block_third_party_cookies else 0,
+        }
+
+
+# The settings of this test run.
+SETTINGS = BrowserSettings()
+
+# Firefox preferences that skip the work and the pages of a first start. They are only written into
+# the template, whose first start has already happened.
+FIREFOX_FIRST_RUN_PREFS = {
+    "browser.shell.checkDefaultBrowser": False,
+    "browser.startup.homepage_override.mstone": "ignore",
+    "startup.homepage_welcome_url": "about:blank",
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.reportingpolicy.firstRun": False,
+}
+
+
+# Applies SETTINGS to ChromeOptions. With 'profile_dir' (a copy of the template), the preferences are
+# already in the profile, so they don't have to be passed (and written into a new profile) again.
+def apply_chrome_options(opts, profile_dir: str = None) -> None:
+    for argument in SETTINGS.chrome_arguments():
+        opts.add_argument(argument)
+    if profile_dir:
+        opts.add_argument(f"--user-data-dir={profile_dir}")
+    else:
+        opts.add_experimental_option("prefs", SETTINGS.chrome_prefs())
+
+
+# Applies SETTINGS to FirefoxOptions. See apply_chrome_options(). GeckoDriver uses a profile given with
+# '-profile' in place, instead of creating a new one.
+def apply_firefox_options(opts, profile_dir: str = None) -> None:
+    for argument in SETTINGS.firefox_arguments():
+        opts.add_argument(argument)
+    if profile_dir:
+        opts.add_argument("-profile")
+        opts.add_argument(profile_dir)
+    else:
+        for name, value in SETTINGS.firefox_prefs().items():
+            opts.set_preference(name, value)
+
+
+# Builds one profile per browser with SETTINGS applied and its first run done (the "template"), and
+# gives every launched browser its own copy. Copying a ready profile is cheaper than having the browser
+# create and initialize a new one at every launch. The copies go to the temp folder, and are cloned
+# copy-on-write where the file system supports it (btrfs, XFS). With 'tmpfs=True' they go to the /dev/shm
+# tmpfs instead, if it has TMPFS_MIN_FREE bytes free, so profiles cost no disk I/O (but are full copies).
+# Hard links are not used: browsers update some profile files in place (SQLite databases), which would
+# change the template too. Enabled by default, '--no-profile-template' turns it off (see conftest.py).
+class ProfileTemplates:
+
+    def __init__(self, directory: str = None, tmpfs: bool = False):
+        self.root = tempfile.mkdtemp(prefix="swag-labs-profiles-", dir=directory or (_tmpfs_directory() if tmpfs else None))
+
+        # {browser: path of its template}, built on first use. Browsers can be launched from the prewarm
+        # thread (see prewarm.py) and the test thread at the same time, hence the lock.
+        self.templates = {}
+        self.lock = threading.Lock()
+
+    # Returns the template of a browser, building it the first time.
+    def template(self, browser: str) -> str:
+        with self.lock:
+            if browser not in self.templates:
+                path = os.path.join(self.root, f"{browser}-template")
+                os.makedirs(path)
+                start = time.perf_counter()
+                _build_template(browser, path)
+                print(f"Built the {browser} profile template in {time.perf_counter() - start:.2f}s: {path}")
+                self.templates[browser] = path
+            return self.templates[browser]
+
+    # Returns the path of a new copy of the browser's template, for one browser. Delete it with remove_profile().
+    def clone(self, browser: str) -> str:
+        template = self.template(browser)
+        target = tempfile.mkdtemp(prefix=f"{browser}-", dir=self.root)
+        shutil.copytree(template, target, symlinks=True, copy_function=_clone_file, dirs_exist_ok=True)
+        return target
+
+    # Deletes the templates and any copy that was not removed yet. Called once at the end of the run.
+    def close(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+# Deletes a copy of a template once its browser has quit.
+def remove_profile(profile_dir: str) -> None:
+    shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+# Returns the tmpfs at /dev/shm if it is there and has TMPFS_MIN_FREE bytes free, or None for the temp folder.
+def _tmpfs_directory() -> Optional[str]:
+    if not os.path.isdir("/dev/shm") or not os.access("/dev/shm", os.W_OK):
+        return None
+    free = shutil.disk_usage("/dev/shm").free
+    if free < TMPFS_MIN_FREE:
+        print(f"Only {free // 1024 // 1024} MB free in /dev/shm, keeping the browser profiles in the temp folder.")
+        return None
+    return "/dev/shm"
+
+
+# Copies a file as a copy-on-write clone if the file system can, or with a normal copy otherwise.
+def _clone_file(source: str, target: str) -> None:
+    if fcntl is not None:
+        try:
+            with open(source, "rb") as source_file, open(target, "wb") as target_file:
+                fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+            shutil.copystat(source, target)
+            return
+        except OSError:
+            pass
+    shutil.copy2(source, target)
+
+
+# Writes SETTINGS into a new profile folder, then starts the browser on it once (if it is installed),
+# so the browser does its first-run work (creating its databases and settings files) in the template
+# instead of in every launched browser.
+def _build_template(browser: str, path: str) -> None:
+    if browser == "chrome":
+        # Chrome keeps a profile's preferences as nested JSON in Default/Preferences. The "First Run"
+        # file tells Chrome its first run is over.
+        prefs = {}
+        for name, value in SETTINGS.chrome_prefs().items():
+            *parents, leaf = name.split(".")
+            node = prefs
+            for parent in parents:
+                node = node.setdefault(parent, {})
+            node[leaf] = value
+        os.makedirs(os.path.join(path, "Default"))
+        with open(os.path.join(path, "Default", "Preferences"), "w") as file:
+            json.dump(prefs, file)
+        open(os.path.join(path, "First Run"), "w").close()
+        command = [*SETTINGS.chrome_arguments(), f"--user-data-dir={path}", "--no-first-run",
+                   "--remote-debugging-port=0", "about:blank"]
+
+        # Chrome writes its DevTools port to the profile once it has started.
+        ready = os.path.join(path, "DevToolsActivePort")
+    elif browser == "firefox":
+        # Firefox reads user.js at every start.
+        with open(os.path.join(path, "user.js"), "w") as file:
+            for name, value in {**SETTINGS.firefox_prefs(), **FIREFOX_FIRST_RUN_PREFS}.items():
+                file.write(f"user_pref({json.dumps(name)}, {json.dumps(value)});\n")
+
+        # '--screenshot' loads the page, saves a screenshot and exits.
+        command = [*SETTINGS.firefox_arguments(), "-profile", path, "-no-remote",
+                   "--screenshot", os.path.join(path, "screenshot.png"), "about:blank"]
+        ready = None
+    else:
+        return
+
+    executables = driver_cache.browser_executables(browser)
+    if executables:
+        _warm_up([executables[0], *command], ready)
+    for name in VOLATILE_FILES:
+        target = os.path.join(path, name)
+        if os.path.isdir(target) and not os.path.islink(target):
+            shutil.rmtree(target, ignore_errors=True)
+        elif os.path.lexists(target):
+            os.remove(target)
+
+
+# Runs the browser until it exits or, if 'ready' is given, until that file appears, then stops it.
+# A template whose first run failed still has the preferences, so failures are only printed.
+def _warm_up(command: list, ready: Optional[str]) -> None:
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError as e:
+        print(f"Could not start {command[0]} to initialize the profile template: {e}")
+        return
+    deadline = time.monotonic() + WARM_UP_TIMEOUT
+    while process.poll() is None and time.monotonic() < deadline:
+        if ready is not None and os.path.exists(ready):
+            break
+        time.sleep(0.05)
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+# The profile templates of this test process, unless '--no-profile-template' is used. Set by conftest.py.
+templates: Optional[ProfileTemplates] = None
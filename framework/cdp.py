@@ -0,0 +1,273 @@
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import os
+import struct
+from urllib.parse import urlparse
+
+# Constant defined by the websocket standard (RFC 6455), used to check the server's handshake answer.
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Websocket frame types used here.
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+class ConnectionClosed(Exception):
+    pass
+
+
+# Raised when the browser answers a DevTools command with an error.
+class CDPError(Exception):
+    pass
+
+
+# A minimal asyncio websocket client, just enough to talk to Chrome's DevTools server: text messages,
+# fragmented messages, ping/pong and close. The websocket libraries in requirements.txt are either
+# blocking (websocket-client) or built on trio (trio-websocket), so neither fits an asyncio API.
+class WebSocket:
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    # Opens a websocket connection to a "ws://host:port/path" URL.
+    @classmethod
+    async def connect(cls, url: str) -> "WebSocket":
+        parsed = urlparse(url)
+
+        # DevTools messages (e.g. page sources) can be large, so allow big reads.
+        reader, writer = await asyncio.open_connection(parsed.hostname, parsed.port or 80, limit=2 ** 26)
+
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write(
+            (
+                f"GET {parsed.path or '/'} HTTP/1.1\r\n"
+                f"Host: {parsed.hostname}:{parsed.port}\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Key: {key}\r\n"
+                "Sec-WebSocket-Version: 13\r\n\r\n"
+            ).encode()
+        )
+        await writer.drain()
+
+        response = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        expected = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        if " 101 " not in response.split("\r\n", 1)[0] or expected not in response:
+            writer.close()
+            raise ConnectionClosed(f"Websocket handshake with {url} failed: {response.splitlines()[0]!r}")
+        return cls(reader, writer)
+
+    # Sends one frame. Frames sent by a client must be masked with a random key.
+    async def _send_frame(self, opcode: int, payload: bytes) -> None:
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([0x80 | length])
+        elif length < 2 ** 16:
+            header += bytes([0x80 | 126]) + struct.pack("!H", length)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack("!Q", length)
+        mask = os.urandom(4)
+        repeated_mask = (mask * (length // 4 + 1))[:length]
+        masked = (int.from_bytes(payload, "big") ^ int.from_bytes(repeated_mask, "big")).to_bytes(length, "big")
+        self.writer.write(header + mask + masked)
+        await self.writer.drain()
+
+    async def send(self, text: str) -> None:
+        await self._send_frame(OPCODE_TEXT, text.encode("utf-8"))
+
+    # Returns the next text message, answering pings and putting fragmented messages back together.
+    async def recv(self) -> str:
+        message = b""
+        while True:
+            first, second = await self._read(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await self._read(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await self._read(8))[0]
+            payload = await self._read(length) if length else b""
+
+            if opcode == OPCODE_PING:
+                await self._send_frame(OPCODE_PONG, payload)
+                continue
+            if opcode == OPCODE_CLOSE:
+                raise ConnectionClosed("Websocket connection closed by the server")
+            if opcode in (OPCODE_TEXT, OPCODE_CONTINUATION):
+                message += payload
+                if first & 0x80:
+                    return message.decode("utf-8")
+
+    # Reads exactly 'count' bytes. A connection that ends or breaks in the middle raises ConnectionClosed.
+    async def _read(self, count: int) -> bytes:
+        try:
+            return await self.reader.readexactly(count)
+        except asyncio.IncompleteReadError:
+            raise ConnectionClosed("Websocket connection closed")
+        except ConnectionError as e:
+            raise ConnectionClosed(f"Websocket connection lost: {e}") from e
+
+    async def close(self) -> None:
+        try:
+            await self._send_frame(OPCODE_CLOSE, b"")
+        except (ConnectionError, RuntimeError):
+            pass
+        self.writer.close()
+
+
+# A connection to a browser's DevTools server. Commands are sent with send() and can be awaited
+# concurrently: every command has an id, and a background task hands each answer to the command with the
+# same id. Events (messages without an id) are delivered to the subscribers of that event and session.
+# One connection carries the commands of many pages at once ("flat" sessions, see CDPSession).
+class CDPConnection:
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.listeners = {}
+
+        # Why the connection stopped reading, once it has. Commands sent after that fail straight away.
+        self.error = None
+        self.reader_task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    @classmethod
+    async def connect(cls, url: str) -> "CDPConnection":
+        return cls(await WebSocket.connect(url))
+
+    # Sends a command (to the page of 'session_id', or to the browser itself) and returns its result.
+    async def send(self, method: str, params: dict = None, session_id: str = None) -> dict:
+        message_id = next(self.ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        if self.error is not None:
+            raise self.error
+        future = asyncio.get_running_loop().create_future()
+        self.pending[message_id] = future
+        await self.websocket.send(json.dumps(message))
+        return await future
+
+    # Calls 'callback(params)' for every 'method' event of 'session_id' until remove_listener() is called.
+    def add_listener(self, method: str, callback, session_id: str = None) -> None:
+        self.listeners.setdefault((session_id, method), []).append(callback)
+
+    def remove_listener(self, method: str, callback, session_id: str = None) -> None:
+        callbacks = self.listeners.get((session_id, method), [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                message = json.loads(await self.websocket.recv())
+                if "id" in message:
+                    future = self.pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CDPError(message["error"].get("message", str(message["error"]))))
+                    else:
+                        future.set_result(message.get("result", {}))
+                else:
+                    self._dispatch(message)
+
+        # Whatever stops the reader (the connection breaking, a message that isn't JSON) fails the commands
+        # waiting for an answer, which would otherwise never come.
+        except asyncio.CancelledError:
+            self._fail_pending(ConnectionClosed("DevTools connection closed"))
+            raise
+        except Exception as e:
+            self._fail_pending(e)
+
+    # Calls the listeners of an event. A listener that raises is reported by the event loop, and doesn't
+    # stop the other listeners or the reader.
+    def _dispatch(self, message: dict) -> None:
+        key = (message.get("sessionId"), message.get("method"))
+        for callback in list(self.listeners.get(key, [])):
+            try:
+                callback(message.get("params", {}))
+            except Exception as e:
+                asyncio.get_running_loop().call_exception_handler(
+                    {"message": f"DevTools listener of {key[1]} failed", "exception": e}
+                )
+
+    def _fail_pending(self, error: Exception) -> None:
+        self.error = error
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending.clear()
+
+    async def close(self) -> None:
+        self.reader_task.cancel()
+        await self.websocket.close()
+
+
+# One page (tab) of the browser, driven over the shared CDPConnection. Also lets callers wait for
+# events of that page instead of polling, e.g. DOM ready or network idle.
+class CDPSession:
+
+    def __init__(self, connection: CDPConnection, session_id: str, target_id: str, context_id: str):
+        self.connection = connection
+        self.session_id = session_id
+        self.target_id = target_id
+        self.context_id = context_id
+
+    async def send(self, method: str, params: dict = None) -> dict:
+        return await self.connection.send(method, params, self.session_id)
+
+    # Returns a future that completes with the parameters of the next 'method' event of this page
+    # (for which 'predicate(params)' is true, if given). Create it *before* doing whatever triggers
+    # the event, so the event can't be missed:
+    #   loaded = session.expect("Page.loadEventFired")
+    #   await page.click("#checkout")
+    #   await asyncio.wait_for(loaded, 10)
+    def expect(self, method: str, predicate=None) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+
+        def callback(params):
+            if not future.done() and (predicate is None or predicate(params)):
+                future.set_result(params)
+
+        self.connection.add_listener(method, callback, self.session_id)
+        future.add_done_callback(lambda _: self.connection.remove_listener(method, callback, self.session_id))
+        return future
+
+    # Returns a queue that receives the parameters of every 'method' event of this page.
+    def subscribe(self, method: str) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self.connection.add_listener(method, queue.put_nowait, self.session_id)
+        return queue
+
+    # Futures for the common page events. DOM ready is "DOMContentLoaded"; network idle is Chrome's
+    # "networkIdle" lifecycle event (no network requests for 500ms).
+    def expect_dom_ready(self) -> asyncio.Future:
+        return self.expect("Page.domContentEventFired")
+
+    def expect_load(self) -> asyncio.Future:
+        return self.expect("Page.loadEventFired")
+
+    def expect_network_idle(self) -> asyncio.Future:
+        return self.expect("Page.lifecycleEvent", lambda params: params.get("name") == "networkIdle")
+
+    # Runs JavaScript in the page and returns its result. 'script' is written like a Selenium
+    # execute_script() script: it may use 'arguments' and must 'return' its result. Promises are awaited.
+    async def execute_script(self, script: str, *args):
+        expression = f"(function () {{ {script} }}).apply(null, {json.dumps(list(args))})"
+        result = await self.send(
+            "Runtime.evaluate", {"expression": expression, "returnByValue": True, "awaitPromise": True}
+        )
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            message = details.get("exception", {}).get("description") or details.get("text")
+            raise CDPError(f"Script failed: {message}")
+        return result.get("result", {}).get("value")
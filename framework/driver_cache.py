@@ -0,0 +1,334 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Folder where driver binaries (chromedriver, geckodriver) are cached between runs.
+# Can be changed with the SWAG_DRIVER_CACHE environment variable or the '--driver-cache-dir' option.
+DEFAULT_CACHE_DIR = os.environ.get(
+    "SWAG_DRIVER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "swag-labs-drivers")
+)
+
+# The manifest file inside the cache folder. It maps a cache key (browser, browser major version and
+# platform) to the cached binary's file name and its SHA-256 checksum.
+MANIFEST_NAME = "manifest.json"
+
+# Lock file next to the manifest, held while a process updates the manifest.
+MANIFEST_LOCK_NAME = "manifest.lock"
+
+# Executables that are tried, in order, to find out which browser version is installed.
+BROWSER_EXECUTABLES = {
+    "chrome": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"],
+    "firefox": ["firefox", "firefox-esr"],
+}
+
+# Where the browsers are installed on macOS (app bundles) and Windows (Program Files, or the user's
+# AppData for per-user installs), which are usually not on the PATH. Tried after BROWSER_EXECUTABLES.
+INSTALL_LOCATIONS = {
+    "chrome": [
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        "/Applications/Chromium.app/Contents/MacOS/Chromium",
+        os.path.join("%PROGRAMFILES%", "Google", "Chrome", "Application", "chrome.exe"),
+        os.path.join("%PROGRAMFILES(X86)%", "Google", "Chrome", "Application", "chrome.exe"),
+        os.path.join("%LOCALAPPDATA%", "Google", "Chrome", "Application", "chrome.exe"),
+    ],
+    "firefox": [
+        "/Applications/Firefox.app/Contents/MacOS/firefox",
+        os.path.join("%PROGRAMFILES%", "Mozilla Firefox", "firefox.exe"),
+        os.path.join("%PROGRAMFILES(X86)%", "Mozilla Firefox", "firefox.exe"),
+    ],
+}
+
+# Environment variables that set the installed browser's version, for browsers that can't be found or
+# asked (e.g. SWAG_CHROME_VERSION=131).
+VERSION_VARIABLES = {"chrome": "SWAG_CHROME_VERSION", "firefox": "SWAG_FIREFOX_VERSION"}
+
+# Settings used by resolve_driver(). conftest.py sets them from the command line options.
+cache_dir = DEFAULT_CACHE_DIR
+offline = False
+
+# Drivers already resolved in this process, so resolution happens only once per session.
+# Failures are remembered too, so that with '--offline-drivers' every test fails fast with the same message.
+_resolved = {}
+
+
+# Raised when a driver cannot be found in the cache and may not (or could not) be downloaded.
+class DriverCacheError(Exception):
+    pass
+
+
+# Sets where drivers are cached and whether downloading is allowed. Called once from conftest.py.
+def configure(directory: str = None, offline_mode: bool = False) -> None:
+    global cache_dir, offline
+    cache_dir = directory or DEFAULT_CACHE_DIR
+    offline = offline_mode
+    _resolved.clear()
+
+
+# Returns the paths of the installed executables of a browser: those on the PATH, in the order of
+# BROWSER_EXECUTABLES, then those in the INSTALL_LOCATIONS that exist.
+def browser_executables(browser: str) -> list:
+    paths = [shutil.which(executable) for executable in BROWSER_EXECUTABLES.get(browser, [])]
+    for location in INSTALL_LOCATIONS.get(browser, []):
+        location = os.path.expandvars(location)
+        if "%" not in location and os.path.isfile(location):
+            paths.append(location)
+    return list(dict.fromkeys(path for path in paths if path))
+
+
+# Returns the version of the installed browser (e.g. "131.0.6778.85"), or None if it can't be found.
+# The version in the browser's VERSION_VARIABLES environment variable wins.
+def browser_version(browser: str):
+    if os.environ.get(VERSION_VARIABLES.get(browser, "")):
+        return os.environ[VERSION_VARIABLES[browser]]
+    for path in browser_executables(browser):
+        try:
+            output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            output = ""
+        match = re.search(r"(\d+(?:\.\d+)+)", output)
+        if match:
+            return match.group(1)
+
+        # Chrome on Windows prints nothing for '--version', but keeps its files in a folder named after
+        # the version, next to chrome.exe.
+        if not path.lower().endswith(".exe"):
+            continue
+        versions = [name for name in _list_dir(os.path.dirname(path)) if re.fullmatch(r"\d+(?:\.\d+)+", name)]
+        if versions:
+            return max(versions, key=lambda name: [int(part) for part in name.split(".")])
+    return None
+
+
+def _list_dir(directory: str) -> list:
+    try:
+        return os.listdir(directory)
+    except OSError:
+        return []
+
+
+# Builds the key a driver is cached under. A driver works with every browser release that has the
+# same major version, so only the major version is part of the key.
+def cache_key(browser: str, version: str) -> str:
+    major = version.split(".")[0]
+    return f"{browser}-{major}-{sys.platform}-{platform.machine().lower()}"
+
+
+# Returns the SHA-256 checksum of a file.
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_manifest(directory: str) -> dict:
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+# Holds the manifest lock while a process reads, changes and writes the manifest, so parallel test
+# processes updating it at the same time don't lose each other's entries. Without fcntl (Windows), the
+# updates are only atomic (see _write_manifest()).
+@contextlib.contextmanager
+def _manifest_lock(directory: str):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, MANIFEST_LOCK_NAME), "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+# Writes the manifest to a temporary file first and then renames it, so parallel test processes
+# never see a half written manifest.
+def _write_manifest(directory: str, manifest: dict) -> None:
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(temp_path, os.path.join(directory, MANIFEST_NAME))
+
+
+# Returns the path of the cached driver for 'key' if it is there and its checksum is still correct.
+# A missing or corrupted binary is removed from the manifest and None is returned.
+def lookup(key: str, directory: str = None):
+    directory = directory or cache_dir
+    manifest = _read_manifest(directory)
+    entry = manifest.get(key)
+    if not entry:
+        return None
+
+    path = os.path.join(directory, entry["file"])
+    if os.path.isfile(path) and _sha256(path) == entry["sha256"]:
+        return path
+
+    print(f"Cached driver for {key} is missing or corrupted, removing it from the cache.")
+    with _manifest_lock(directory):
+        manifest = _read_manifest(directory)
+        if manifest.get(key) == entry:
+            del manifest[key]
+            _write_manifest(directory, manifest)
+    return None
+
+
+# Returns the key of the newest cached driver of a browser for this platform, or None. Used when the
+# installed browser's version can't be found.
+def newest_key(browser: str, directory: str = None):
+    suffix = cache_key(browser, "0")[len(f"{browser}-0"):]
+    majors = []
+    for key in _read_manifest(directory or cache_dir):
+        major = key[len(browser) + 1:-len(suffix)]
+        if key.startswith(f"{browser}-") and key.endswith(suffix) and major.isdigit():
+            majors.append(int(major))
+    return f"{browser}-{max(majors)}{suffix}" if majors else None
+
+
+# Copies a driver binary into the cache under 'key' and records its checksum. Returns the cached path.
+def store(key: str, source_path: str, version: str = "", directory: str = None) -> str:
+    directory = directory or cache_dir
+    file_name = os.path.join(key, os.path.basename(source_path))
+    target = os.path.join(directory, file_name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    # Copy to a temporary name and rename, so a parallel process never runs a half copied binary.
+    temp_target = f"{target}.{os.getpid()}.tmp"
+    shutil.copy2(source_path, temp_target)
+    os.chmod(temp_target, os.stat(temp_target).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.replace(temp_target, target)
+
+    checksum = _sha256(target)
+    with _manifest_lock(directory):
+        manifest = _read_manifest(directory)
+        manifest[key] = {"file": file_name, "sha256": checksum, "browser_version": version}
+        _write_manifest(directory, manifest)
+    return target
+
+
+# Downloads the driver for 'browser' with webdriver-manager and returns the downloaded binary's path.
+# webdriver-manager is imported here so it is only loaded when a download is really needed.
+def _download(browser: str) -> str:
+    if browser == "chrome":
+        from webdriver_manager.chrome import ChromeDriverManager
+        return ChromeDriverManager().install()
+    if browser == "firefox":
+        from webdriver_manager.firefox import GeckoDriverManager
+        return GeckoDriverManager().install()
+    raise DriverCacheError(f"Unsupported browser '{browser}'")
+
+
+# Returns the path of the driver binary to use for 'browser', resolving it only once per process.
+# Cached drivers are used without any network access. On a cache miss the driver is downloaded
+# and cached, unless offline mode is on, in which case a DriverCacheError is raised straight away.
+def resolve_driver(browser: str) -> str:
+    if browser in _resolved:
+        result = _resolved[browser]
+        if isinstance(result, DriverCacheError):
+            raise result
+        return result
+
+    try:
+        result = _resolve(browser)
+    except DriverCacheError as e:
+        _resolved[browser] = e
+        raise
+    _resolved[browser] = result
+    return result
+
+
+def _resolve(browser: str) -> str:
+    version = browser_version(browser)
+    if version is None:
+
+        # Without the browser's version, the newest cached driver is the best guess.
+        key = newest_key(browser)
+        path = lookup(key) if key else None
+        if path:
+            print(f"Could not find the installed {browser} version, using the newest cached driver ({key}).")
+            return path
+        if offline:
+            raise DriverCacheError(
+                f"Offline driver mode: could not find the installed {browser} version and no {browser} driver is cached. "
+                f"Set {VERSION_VARIABLES[browser]} to the browser's version, or seed the cache with "
+                f"'python -m framework.driver_cache seed --browser {browser} --browser-version <version>'."
+            )
+
+        # Without a known version the driver can't be cached, so let webdriver-manager work it out.
+        return _download(browser)
+
+    key = cache_key(browser, version)
+    path = lookup(key)
+    if path:
+        return path
+
+    if offline:
+        raise DriverCacheError(
+            f"Offline driver mode: no cached driver for {key} in {cache_dir}. "
+            f"Seed the cache first, e.g. 'python -m framework.driver_cache seed --browser {browser}' "
+            f"(add '--driver-path <binary>' to use an existing driver binary)."
+        )
+
+    print(f"No cached driver for {key}, downloading it...")
+    return store(key, _download(browser), version)
+
+
+# Command line entry point, used to pre-seed the cache (e.g. while building CI images):
+#   python -m framework.driver_cache seed --browser chrome
+#   python -m framework.driver_cache seed --browser chrome --driver-path /usr/bin/chromedriver --browser-version 131
+#   python -m framework.driver_cache list
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the cached WebDriver binaries")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Cache folder")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Add a driver to the cache")
+    seed.add_argument("--browser", choices=sorted(BROWSER_EXECUTABLES), required=True)
+    seed.add_argument("--driver-path", help="Existing driver binary to cache instead of downloading one")
+    seed.add_argument("--browser-version", help="Browser version the driver is for (default: the installed browser's)")
+
+    commands.add_parser("list", help="List the cached drivers and check their checksums")
+
+    args = parser.parse_args(argv)
+    configure(args.cache_dir)
+
+    if args.command == "seed":
+        version = args.browser_version or browser_version(args.browser)
+        if not version:
+            print(f"Could not find the installed {args.browser} version, pass --browser-version.")
+            return 1
+        key = cache_key(args.browser, version)
+        path = store(key, args.driver_path or _download(args.browser), version)
+        print(f"Cached {key}: {path}")
+        return 0
+
+    manifest = _read_manifest(cache_dir)
+    if not manifest:
+        print(f"No cached drivers in {cache_dir}")
+    for key in sorted(manifest):
+        status = "ok" if lookup(key) else "CORRUPTED (removed)"
+        print(f"{key}: {manifest[key]['file']} [{status}]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from typing import Optional
+
+# JavaScript that reads every item row matching a CSS selector (passed as arguments[0]) in one go and
+# returns a plain object per row. Reading '.text' of each element from Python costs one WebDriver round
+# trip per element, so a cart with N items costs N+1 round trips. This script costs exactly one, no matter
+# how many items there are. 'innerText' is used because it matches what Selenium's '.text' returns.
+ITEM_ROWS_SCRIPT = """
+var rows = document.querySelectorAll(arguments[0]);
+return Array.prototype.map.call(rows, function (row) {
+    function text(selector) {
+        var element = row.querySelector(selector);
+        return element ? element.innerText.trim() : null;
+    }
+    var link = row.querySelector("a[id$='_title_link']");
+    var button = row.querySelector("button[id^='add-to-cart-'], button[id^='remove-']");
+    return {
+        id: link ? link.id.replace(/^item_/, "").replace(/_title_link$/, "") : null,
+        button_id: button ? button.id : null,
+        name: text(".inventory_item_name"),
+        description: text(".inventory_item_desc"),
+        price: text(".inventory_item_price"),
+        quantity: text(".cart_quantity")
+    };
+});
+"""
+
+# CSS selectors of the item rows on the different pages. The cart page and the checkout overview
+# page use the same cart item markup, the products (inventory) page uses its own.
+CART_ROW_SELECTOR = ".cart_list .cart_item"
+INVENTORY_ROW_SELECTOR = ".inventory_list .inventory_item"
+
+
+# One item row as shown on the products, cart or checkout overview page.
+# 'item_id' is the site's numeric item id (from the "item_4_title_link" link id).
+# 'product_id' is the id used in the add/remove button ids (e.g. "sauce-labs-backpack"),
+# it is None on the overview page, which has no buttons.
+# 'quantity' is None on the products page, which does not show quantities.
+# 'in_cart' tells whether the row shows a "Remove" button rather than an "Add to cart" button.
+@dataclass
+class ItemRow:
+    item_id: Optional[int]
+    product_id: Optional[str]
+    name: str
+    description: str
+    price: float
+    quantity: Optional[int]
+    in_cart: bool
+
+
+# Turns one of the plain objects returned by ITEM_ROWS_SCRIPT into an ItemRow.
+def _to_item_row(raw: dict) -> ItemRow:
+    button_id = raw.get("button_id") or ""
+    if button_id.startswith("add-to-cart-"):
+        product_id = button_id[len("add-to-cart-"):]
+    elif button_id.startswith("remove-"):
+        product_id = button_id[len("remove-"):]
+    else:
+        product_id = None
+
+    return ItemRow(
+        item_id=int(raw["id"]) if raw.get("id") else None,
+        product_id=product_id,
+        name=raw.get("name") or "",
+        description=raw.get("description") or "",
+        price=float(raw["price"].replace("$", "")) if raw.get("price") else 0.0,
+        quantity=int(raw["quantity"]) if raw.get("quantity") else None,
+        in_cart=button_id.startswith("remove-"),
+    )
+
+
+# Turns the result of ITEM_ROWS_SCRIPT into ItemRow objects.
+def parse_item_rows(raw_rows: list) -> list[ItemRow]:
+    return [_to_item_row(raw) for raw in raw_rows]
+
+
+# Reads every row matching 'row_selector' with a single script call and returns them as ItemRow objects.
+# The caller is responsible for waiting until the list has been rendered.
+def extract_item_rows(driver, row_selector: str) -> list[ItemRow]:
+    return parse_item_rows(driver.execute_script(ITEM_ROWS_SCRIPT, row_selector))
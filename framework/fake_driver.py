@@ -0,0 +1,671 @@
+import functools
+import itertools
+import re
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+from selenium.webdriver.remote.command import Command
+
+from framework.extraction import ITEM_ROWS_SCRIPT
+from framework.journeys import RESTORE_SCRIPT, SNAPSHOT_SCRIPT
+
+# An in-memory stand-in for a WebDriver, for checking page-object logic without a browser. Pages are
+# HTML strings produced by a FakeSite (see standin/fake_site.py for the Swag Labs one), parsed into a
+# small element tree. Clicks and typing are passed to the site, which changes its state and renders the
+# next page ("scripted transitions"). Only the part of the WebDriver API the page objects and the
+# framework use is implemented: get, find_element(s) by id, class name, name, tag name and CSS selector,
+# .text, .click, .send_keys, .clear, .is_displayed, .get_attribute, cookies, a single window, and the
+# scripts listed in SCRIPTS. Every call goes through execute(), like in a real WebDriver, so the
+# instrumentation (see instrumentation.py) and the command profiler work with it too.
+
+# Elements that never have children or an end tag.
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Elements that start a new line in the text of an element (like the browser's innerText).
+BLOCK_ELEMENTS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "footer", "form", "h1", "h2",
+    "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "section", "table", "tr", "ul",
+}
+
+# The single window of a fake driver.
+WINDOW_HANDLE = "fake-window"
+
+
+# One element of a parsed page. 'children' holds Node objects and strings (text).
+class Node:
+
+    def __init__(self, tag: str, attrs: dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+
+        # The current value of a form field, which changes when text is typed into it.
+        self.value = attrs.get("value") or ""
+
+    @property
+    def classes(self) -> list:
+        return (self.attrs.get("class") or "").split()
+
+    def elements(self):
+        for child in self.children:
+            if isinstance(child, Node):
+                yield child
+                yield from child.elements()
+
+    def closest(self, selector: str):
+        node = self
+        while node is not None and node.tag != "#document":
+            if matches(node, selector):
+                return node
+            node = node.parent
+        return None
+
+    # Like the browser's 'hidden' attribute, 'display: none' style and hidden inputs.
+    def is_displayed(self) -> bool:
+        node = self
+        while node is not None:
+            style = (node.attrs.get("style") or "").replace(" ", "")
+            if "hidden" in node.attrs or "display:none" in style:
+                return False
+            node = node.parent
+        return not (self.tag == "input" and self.attrs.get("type") == "hidden")
+
+    # The visible text of the element, like the browser's innerText (and Selenium's '.text').
+    def text(self) -> str:
+        parts = []
+
+        def walk(node):
+            for child in node.children:
+                if isinstance(child, str):
+                    parts.append(child)
+                elif child.tag not in ("script", "style") and child.is_displayed():
+                    block = child.tag in BLOCK_ELEMENTS
+                    parts.append("\n" if block else "")
+                    walk(child)
+                    parts.append("\n" if block else "")
+
+        walk(self)
+        lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+
+class _TreeBuilder(HTMLParser):
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.document = Node("#document", {})
+        self.current = self.document
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: value if value is not None else "" for name, value in attrs}, self.current)
+        self.current.children.append(node)
+        if tag not in VOID_ELEMENTS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        self.current.children.append(Node(tag, {name: value or "" for name, value in attrs}, self.current))
+
+    def handle_endtag(self, tag):
+        node = self.current
+        while node is not None and node.tag != tag:
+            node = node.parent
+        if node is not None and node.parent is not None:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.document
+
+
+# ------------------------------------------------------------------------------------------- CSS selectors
+
+# One simple selector: a tag, "#id", ".class" or "[attribute]" / "[attribute<op>value]".
+_SIMPLE_SELECTOR = re.compile(
+    r"""(?P<tag>\*|[a-zA-Z][\w-]*)
+      | \#(?P<id>[\w-]+)
+      | \.(?P<cls>[\w-]+)
+      | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[~^$*|]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?\]""",
+    re.VERBOSE,
+)
+_COMBINATOR = re.compile(r"\s*([>+~])?\s*")
+
+# How an attribute value is compared in "[attribute<op>value]".
+_ATTRIBUTE_OPERATORS = {
+    "=": lambda actual, value: actual == value,
+    "^=": lambda actual, value: actual.startswith(value),
+    "$=": lambda actual, value: actual.endswith(value),
+    "*=": lambda actual, value: value in actual,
+    "~=": lambda actual, value: value in actual.split(),
+    "|=": lambda actual, value: actual == value or actual.startswith(value + "-"),
+}
+
+
+def _matches_simple(node: Node, simple) -> bool:
+    if simple["tag"]:
+        return simple["tag"] == "*" or node.tag == simple["tag"].lower()
+    if simple["id"]:
+        return node.attrs.get("id") == simple["id"]
+    if simple["cls"]:
+        return simple["cls"] in node.classes
+    actual = node.attrs.get(simple["attr"])
+    if actual is None:
+        return False
+    if not simple["op"]:
+        return True
+    value = next(v for v in (simple["dq"], simple["sq"], simple["bare"]) if v is not None)
+    return _ATTRIBUTE_OPERATORS[simple["op"]](actual, value)
+
+
+# Splits a selector list ("a, b") on the commas that are not inside quotes or brackets.
+def _split_selector_list(selector: str) -> list:
+    groups, current, depth, quote = [], "", 0, None
+    for char in selector:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "\"'":
+            quote = char
+        elif char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            groups.append(current)
+            current = ""
+            continue
+        current += char
+    groups.append(current)
+    return [group.strip() for group in groups]
+
+
+# Turns a selector into a list of alternatives. Each alternative is a list of (combinator, [simple
+# selectors]) steps, where the combinator tells how a step relates to the one before it:
+# " " (descendant), ">" (child), "+" (next sibling) or "~" (later sibling).
+@functools.lru_cache(maxsize=None)
+def _compile(selector: str) -> list:
+    alternatives = []
+    for group in _split_selector_list(selector):
+        steps, simples, combinator, position = [], [], None, 0
+        while position < len(group):
+            if group[position] in " >+~":
+                match = _COMBINATOR.match(group, position)
+                if simples:
+                    steps.append((combinator, simples))
+                    simples = []
+                combinator = match.group(1) or " "
+                position = match.end()
+                continue
+            match = _SIMPLE_SELECTOR.match(group, position)
+            if not match:
+                raise InvalidSelectorException(f"The fake driver does not support the selector {selector!r}")
+            simples.append(match.groupdict())
+            position = match.end()
+        if not simples:
+            raise InvalidSelectorException(f"Invalid selector {selector!r}")
+        steps.append((combinator, simples))
+        alternatives.append(steps)
+    return alternatives
+
+
+def _previous_siblings(node: Node):
+    siblings = [child for child in node.parent.children if isinstance(child, Node)]
+    return reversed(siblings[: siblings.index(node)])
+
+
+def _matches_steps(node: Node, steps: list, index: int) -> bool:
+    combinator, simples = steps[index]
+    if not all(_matches_simple(node, simple) for simple in simples):
+        return False
+    if index == 0:
+        return True
+
+    if combinator == ">":
+        candidates = [node.parent]
+    elif combinator == "+":
+        candidates = list(_previous_siblings(node))[:1]
+    elif combinator == "~":
+        candidates = _previous_siblings(node)
+    else:
+        candidates = []
+        ancestor = node.parent
+        while ancestor is not None and ancestor.tag != "#document":
+            candidates.append(ancestor)
+            ancestor = ancestor.parent
+    return any(
+        candidate is not None and candidate.tag != "#document" and _matches_steps(candidate, steps, index - 1)
+        for candidate in candidates
+    )
+
+
+def matches(node: Node, selector: str) -> bool:
+    return any(_matches_steps(node, steps, len(steps) - 1) for steps in _compile(selector))
+
+
+# Returns the elements under 'root' that match the CSS selector, in document order.
+def select(root: Node, selector: str) -> list:
+    alternatives = _compile(selector)
+    return [node for node in root.elements() if any(_matches_steps(node, s, len(s) - 1) for s in alternatives)]
+
+
+# Returns the elements under 'root' found with a WebDriver locator strategy ('By.ID', 'By.CSS_SELECTOR'...).
+def find(root: Node, by: str, value: str) -> list:
+    if by == "id":
+        return [node for node in root.elements() if node.attrs.get("id") == value]
+    if by == "class name":
+        return [node for node in root.elements() if value in node.classes]
+    if by == "name":
+        return [node for node in root.elements() if node.attrs.get("name") == value]
+    if by == "tag name":
+        return [node for node in root.elements() if node.tag == value.lower()]
+    if by == "css selector":
+        return select(root, value)
+    raise InvalidSelectorException(f"The fake driver does not support locating elements by {by!r}")
+
+
+# ------------------------------------------------------------------------------------------- sites
+
+# The application shown by a FakeDriver. A site renders the HTML of a page from its state (cookies and
+# storage of the driver) and reacts to clicks and typing, usually by changing that state and calling
+# driver.open() or driver.render(). Every driver gets its own site object.
+class FakeSite:
+
+    # Returns the HTML of the page at 'path' (the part of the URL after the base URL, e.g. "cart.html").
+    def render(self, driver, path: str) -> str:
+        raise NotImplementedError
+
+    # Called after an element was clicked.
+    def click(self, driver, node: Node) -> None:
+        pass
+
+    # Called after text was typed into (or cleared from) a form field.
+    def input(self, driver, node: Node) -> None:
+        pass
+
+
+# A site made of fixed HTML pages, for testing page objects against HTML fixtures:
+#   site = StaticSite({"cart.html": CART_HTML, "checkout-step-one.html": STEP_ONE_HTML},
+#                     transitions={"#checkout": "checkout-step-one.html"})
+# 'transitions' maps a CSS selector to what clicking a matching element (or an element inside it) does:
+# a page path to open, or a function called with the driver and the clicked node.
+class StaticSite(FakeSite):
+
+    def __init__(self, pages: dict, transitions: dict = None):
+        self.pages = pages
+        self.transitions = transitions or {}
+
+    def render(self, driver, path: str) -> str:
+        return self.pages.get(path, "<html><body><h1>Not Found</h1></body></html>")
+
+    def click(self, driver, node: Node) -> None:
+        for selector, target in self.transitions.items():
+            if node.closest(selector) is not None:
+                if callable(target):
+                    target(driver, node)
+                else:
+                    driver.open(target)
+                return
+
+
+# ------------------------------------------------------------------------------------------- scripts
+
+# Scripts the fake driver can "run", keyed by their text with whitespace collapsed. The value is a Python
+# function called with the driver and the script's arguments. These are the scripts the framework and the
+# page objects send; register_script() adds more.
+SCRIPTS = {}
+
+
+def _script_key(script: str) -> str:
+    return " ".join(script.split())
+
+
+def register_script(script: str, handler) -> None:
+    SCRIPTS[_script_key(script)] = handler
+
+
+# Python version of ITEM_ROWS_SCRIPT (see extraction.py).
+def _item_rows(driver, row_selector: str) -> list:
+    rows = []
+    for row in select(driver.document, row_selector):
+
+        def text(selector):
+            found = select(row, selector)
+            return found[0].text().strip() if found else None
+
+        links = select(row, "a[id$='_title_link']")
+        buttons = select(row, "button[id^='add-to-cart-'], button[id^='remove-']")
+        link_id = links[0].attrs["id"] if links else None
+        rows.append(
+            {
+                "id": re.sub(r"_title_link$", "", re.sub(r"^item_", "", link_id)) if link_id else None,
+                "button_id": buttons[0].attrs["id"] if buttons else None,
+                "name": text(".inventory_item_name"),
+                "description": text(".inventory_item_desc"),
+                "price": text(".inventory_item_price"),
+                "quantity": text(".cart_quantity"),
+            }
+        )
+    return rows
+
+
+def _clear_storage(driver) -> None:
+    driver.local_storage.clear()
+    driver.session_storage.clear()
+
+
+def _restore_storage(driver, local: dict, session: dict) -> None:
+    _clear_storage(driver)
+    driver.local_storage.update(local)
+    driver.session_storage.update(session)
+
+
+register_script(ITEM_ROWS_SCRIPT, _item_rows)
+register_script("return document.readyState", lambda driver: "complete")
+register_script("window.localStorage.clear(); window.sessionStorage.clear();", _clear_storage)
+register_script(
+    "window.localStorage.setItem(arguments[0], arguments[1]);",
+    lambda driver, key, value: driver.local_storage.__setitem__(key, str(value)),
+)
+register_script(
+    "window.localStorage.removeItem(arguments[0]);", lambda driver, key: driver.local_storage.pop(key, None)
+)
+register_script(
+    SNAPSHOT_SCRIPT, lambda driver: {"local": dict(driver.local_storage), "session": dict(driver.session_storage)}
+)
+register_script(RESTORE_SCRIPT, _restore_storage)
+
+
+# ------------------------------------------------------------------------------------------- driver
+
+# An element of the fake driver's current page, with the WebElement methods the page objects use.
+# Once the page changes (navigation or re-render), using it raises StaleElementReferenceException.
+class FakeElement:
+
+    def __init__(self, driver, element_id: str):
+        self.parent = driver
+        self.id = element_id
+
+    def _execute(self, command: str, params: dict = None):
+        return self.parent.execute(command, dict(params or {}, id=self.id))["value"]
+
+    @property
+    def tag_name(self) -> str:
+        return self._execute(Command.GET_ELEMENT_TAG_NAME)
+
+    @property
+    def text(self) -> str:
+        return self._execute(Command.GET_ELEMENT_TEXT)
+
+    def click(self) -> None:
+        self._execute(Command.CLICK_ELEMENT)
+
+    def send_keys(self, *value) -> None:
+        self._execute(Command.SEND_KEYS_TO_ELEMENT, {"text": "".join(str(part) for part in value)})
+
+    def clear(self) -> None:
+        self._execute(Command.CLEAR_ELEMENT)
+
+    def is_displayed(self) -> bool:
+        return self._execute("isElementDisplayed")
+
+    def is_enabled(self) -> bool:
+        return self._execute("isElementEnabled")
+
+    def get_attribute(self, name: str):
+        return self._execute(Command.GET_ELEMENT_ATTRIBUTE, {"name": name})
+
+    def find_element(self, by: str = "id", value: str = None):
+        return self._execute(Command.FIND_CHILD_ELEMENT, {"using": by, "value": value})
+
+    def find_elements(self, by: str = "id", value: str = None) -> list:
+        return self._execute(Command.FIND_CHILD_ELEMENTS, {"using": by, "value": value})
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FakeElement) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"<FakeElement {self.id}>"
+
+
+class _SwitchTo:
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle: str) -> None:
+        self.driver.execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+
+
+class FakeDriver:
+
+    # 'site' renders the pages of the site at 'base_url' (see FakeSite). URLs outside it show an empty page.
+    def __init__(self, site: FakeSite, base_url: str):
+        self.site = site
+        self.base_url = base_url
+        self.capabilities = {"browserName": "fake"}
+        self.session_id = "fake-session"
+        self.switch_to = _SwitchTo(self)
+
+        # The browser state a site reads and writes: cookies ({name: cookie}) and web storage.
+        self.cookies = {}
+        self.local_storage = {}
+        self.session_storage = {}
+
+        self.url = "about:blank"
+        self.document = parse_html("")
+        self.closed = False
+
+        # Elements handed out for the current page, by id and by node.
+        self._ids = itertools.count(1)
+        self._nodes = {}
+        self._element_ids = {}
+
+        # Callbacks a site scheduled with schedule(), as (due time, callback), e.g. a delayed navigation.
+        self._timers = []
+
+        self._commands = {
+            Command.GET: lambda p: self._navigate(p["url"]),
+            Command.GET_CURRENT_URL: lambda p: self.url,
+            Command.GET_TITLE: lambda p: "".join(node.text() for node in select(self.document, "title")),
+            Command.GET_PAGE_SOURCE: lambda p: self._source,
+            Command.FIND_ELEMENT: lambda p: self._find_one(self.document, p),
+            Command.FIND_ELEMENTS: lambda p: self._find_all(self.document, p),
+            Command.FIND_CHILD_ELEMENT: lambda p: self._find_one(self._node(p["id"]), p),
+            Command.FIND_CHILD_ELEMENTS: lambda p: self._find_all(self._node(p["id"]), p),
+            Command.GET_ELEMENT_TEXT: lambda p: self._node(p["id"]).text(),
+            Command.GET_ELEMENT_TAG_NAME: lambda p: self._node(p["id"]).tag,
+            Command.GET_ELEMENT_ATTRIBUTE: lambda p: self._attribute(self._node(p["id"]), p["name"]),
+            "isElementDisplayed": lambda p: self._node(p["id"]).is_displayed(),
+            "isElementEnabled": lambda p: "disabled" not in self._node(p["id"]).attrs,
+            Command.CLICK_ELEMENT: lambda p: self._click(self._node(p["id"])),
+            Command.SEND_KEYS_TO_ELEMENT: lambda p: self._type(self._node(p["id"]), p["text"]),
+            Command.CLEAR_ELEMENT: lambda p: self._type(self._node(p["id"]), None),
+            Command.W3C_EXECUTE_SCRIPT: lambda p: self._run_script(p["script"], p["args"]),
+            Command.W3C_EXECUTE_SCRIPT_ASYNC: lambda p: self._run_script(p["script"], p["args"]),
+            Command.ADD_COOKIE: lambda p: self.cookies.__setitem__(p["cookie"]["name"], dict(p["cookie"])),
+            Command.GET_ALL_COOKIES: lambda p: list(self.cookies.values()),
+            Command.DELETE_ALL_COOKIES: lambda p: self.cookies.clear(),
+            Command.W3C_GET_CURRENT_WINDOW_HANDLE: lambda p: self._window(),
+            "getWindowHandles": lambda p: [] if self.closed else [WINDOW_HANDLE],
+            Command.SWITCH_TO_WINDOW: lambda p: self._switch_window(p["handle"]),
+            Command.CLOSE: lambda p: setattr(self, "closed", True),
+            Command.QUIT: lambda p: setattr(self, "closed", True),
+        }
+
+    # Runs a command, like WebDriver's execute(): returns {"value": result}.
+    def execute(self, driver_command: str, params: dict = None) -> dict:
+        self._run_timers()
+        handler = self._commands.get(driver_command)
+        if handler is None:
+            raise WebDriverException(f"The fake driver does not support the '{driver_command}' command")
+        return {"value": handler(params or {})}
+
+    # --------------------------------------------------------------- WebDriver API
+
+    def get(self, url: str) -> None:
+        self.execute(Command.GET, {"url": url})
+
+    @property
+    def current_url(self) -> str:
+        return self.execute(Command.GET_CURRENT_URL)["value"]
+
+    @property
+    def title(self) -> str:
+        return self.execute(Command.GET_TITLE)["value"]
+
+    @property
+    def page_source(self) -> str:
+        return self.execute(Command.GET_PAGE_SOURCE)["value"]
+
+    def find_element(self, by: str = "id", value: str = None) -> FakeElement:
+        return self.execute(Command.FIND_ELEMENT, {"using": by, "value": value})["value"]
+
+    def find_elements(self, by: str = "id", value: str = None) -> list:
+        return self.execute(Command.FIND_ELEMENTS, {"using": by, "value": value})["value"]
+
+    def execute_script(self, script: str, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT, {"script": script, "args": list(args)})["value"]
+
+    # Asynchronous scripts are looked up in SCRIPTS like the others; their handlers return the result directly.
+    def execute_async_script(self, script: str, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT_ASYNC, {"script": script, "args": list(args)})["value"]
+
+    def add_cookie(self, cookie: dict) -> None:
+        self.execute(Command.ADD_COOKIE, {"cookie": cookie})
+
+    def get_cookies(self) -> list:
+        return self.execute(Command.GET_ALL_COOKIES)["value"]
+
+    def get_cookie(self, name: str):
+        return next((cookie for cookie in self.get_cookies() if cookie["name"] == name), None)
+
+    def delete_all_cookies(self) -> None:
+        self.execute(Command.DELETE_ALL_COOKIES)
+
+    @property
+    def current_window_handle(self) -> str:
+        return self.execute(Command.W3C_GET_CURRENT_WINDOW_HANDLE)["value"]
+
+    @property
+    def window_handles(self) -> list:
+        return self.execute("getWindowHandles")["value"]
+
+    def close(self) -> None:
+        self.execute(Command.CLOSE)
+
+    def quit(self) -> None:
+        self.execute(Command.QUIT)
+
+    # --------------------------------------------------------------- used by sites
+
+    # Opens a page of the site: 'path' is relative to the current page (e.g. "cart.html" or "./").
+    def open(self, path: str) -> None:
+        self._navigate(urljoin(self.url if self.url.startswith(self.base_url) else self.base_url, path))
+
+    # Renders the current page again from the site's state, like a page that rebuilds its HTML.
+    # A site that redirects instead calls open() and returns None from its render().
+    def render(self) -> None:
+        html = self.site.render(self, self.path) if self.url.startswith(self.base_url) else ""
+        if html is not None:
+            self._load(html)
+
+    # The current page's path relative to the base URL (e.g. "cart.html", "" for the start page).
+    @property
+    def path(self) -> str:
+        return urlparse(self.url[len(self.base_url):]).path if self.url.startswith(self.base_url) else ""
+
+    # Calls 'callback()' once 'delay' seconds have passed, before the next command that follows. Like a
+    # page's timers, scheduled callbacks are dropped when another page is opened.
+    def schedule(self, delay: float, callback) -> None:
+        self._timers.append((time.perf_counter() + delay, callback))
+
+    # --------------------------------------------------------------- internals
+
+    def _window(self) -> str:
+        if self.closed:
+            raise NoSuchWindowException("The window of the fake driver has been closed")
+        return WINDOW_HANDLE
+
+    def _switch_window(self, handle: str) -> None:
+        if handle != WINDOW_HANDLE or self.closed:
+            raise NoSuchWindowException(f"No window with handle {handle!r}")
+
+    def _navigate(self, url: str) -> None:
+        self._window()
+        self._timers.clear()
+        self.url = url
+        self.render()
+
+    def _load(self, html: str) -> None:
+        self._source = html
+        self.document = parse_html(html)
+        self._nodes.clear()
+        self._element_ids.clear()
+
+    def _run_timers(self) -> None:
+        now = time.perf_counter()
+        for timer in [timer for timer in self._timers if timer[0] <= now]:
+            if timer in self._timers:
+                self._timers.remove(timer)
+                timer[1]()
+
+    def _element(self, node: Node) -> FakeElement:
+        if node not in self._element_ids:
+            element_id = f"fake-element-{next(self._ids)}"
+            self._element_ids[node] = element_id
+            self._nodes[element_id] = node
+        return FakeElement(self, self._element_ids[node])
+
+    def _node(self, element_id: str) -> Node:
+        node = self._nodes.get(element_id)
+        if node is None:
+            raise StaleElementReferenceException(f"Element {element_id} is not on the current page anymore")
+        return node
+
+    def _find_all(self, root: Node, params: dict) -> list:
+        return [self._element(node) for node in find(root, params["using"], params["value"])]
+
+    def _find_one(self, root: Node, params: dict) -> FakeElement:
+        found = find(root, params["using"], params["value"])
+        if not found:
+            raise NoSuchElementException(f"Unable to locate element: {params['using']}={params['value']!r}")
+        return self._element(found[0])
+
+    @staticmethod
+    def _attribute(node: Node, name: str):
+        if name == "value":
+            return node.value
+        return node.attrs.get(name)
+
+    def _click(self, node: Node) -> None:
+        if not node.is_displayed():
+            raise WebDriverException("Element is not displayed, so it can't be clicked")
+        self.site.click(self, node)
+
+    def _type(self, node: Node, text) -> None:
+        node.value = "" if text is None else node.value + text
+        self.site.input(self, node)
+
+    def _run_script(self, script: str, args: list):
+        handler = SCRIPTS.get(_script_key(script))
+        if handler is None:
+            raise WebDriverException(
+                f"The fake driver can't run this script, register a Python version with register_script(): {script[:80]!r}"
+            )
+        return handler(self, *args)
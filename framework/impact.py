@@ -0,0 +1,329 @@
+import ast
+import inspect
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Version of the impact map format. A map written by another version is treated as stale.
+MAP_VERSION = 1
+
+# Changed files that never affect which tests pass (documentation).
+IGNORED_SUFFIXES = (".md", ".txt", ".rst")
+
+# Changes to these files can affect every test, so they always select the full suite.
+ALWAYS_FULL = ("conftest.py", "requirements.txt", "pytest.ini", "setup.cfg", "pyproject.toml", "tox.ini")
+
+# The modules that launch, pool and prewarm the browsers of a test process. What they do for one test
+# (launching a browser, resolving the driver binary) serves every test, so their calls are recorded as
+# shared, and a change to them always selects the full suite.
+BROWSER_MODULES = ("framework/browser_factory.py", "framework/browser_pool.py", "framework/driver_cache.py", "framework/prewarm.py")
+
+# A hunk header of 'git diff -U0': the changed lines of the old and new file, e.g. "@@ -12,3 +12,4 @@".
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+# Records which functions of the project's own modules (page objects, framework, stand-in) each test
+# calls, with a profile hook (sys.setprofile) that sees every Python function call. A function is
+# recorded as (path relative to the root, qualified name), e.g. ("pages/confirmation_page.py",
+# "ConfirmationPage.get_complete_header"). Calls made while a session, package or module scoped fixture
+# is set up affect every test that uses the fixture, so they are recorded as 'shared' instead, and so are
+# the calls made by BROWSER_MODULES and by other threads (e.g. the prewarm thread, see prewarm.py).
+# Enabled with '--impact-record' (see conftest.py).
+class ImpactTracer:
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root) + os.sep
+        self.shared = set()
+        self.current: Optional[set] = None
+
+        # Depth of the non-function scoped fixtures being set up (see conftest.py).
+        self.shared_depth = 0
+
+        # The outermost frame of BROWSER_MODULES that is running, and the thread the tests run on.
+        self.browser_frame = None
+        self.thread = None
+
+        # {code object: (path, qualified name), or None for code outside the project}, so every
+        # function's file is only looked at once.
+        self.codes = {}
+
+        # {path: scopes() of the file}, for Pythons whose code objects have no qualified name.
+        self.file_scopes = {}
+
+    # Traces this thread and the threads started from now on.
+    def start(self) -> None:
+        self.thread = threading.get_ident()
+        threading.setprofile(self.on_event)
+        sys.setprofile(self.on_event)
+
+    def stop(self) -> None:
+        threading.setprofile(None)
+        sys.setprofile(None)
+
+    def start_test(self) -> None:
+        self.current = set()
+
+    # Returns the functions the test that just finished called.
+    def stop_test(self) -> set:
+        functions, self.current = self.current or set(), None
+        return functions
+
+    def on_event(self, frame, event, arg) -> None:
+        if event != "call":
+            if event == "return" and frame is self.browser_frame:
+                self.browser_frame = None
+            return
+        code = frame.f_code
+        key = self.codes.get(code, False)
+        if key is False:
+            key = self.codes[code] = self._function(code)
+        if key is None:
+            return
+        if threading.get_ident() != self.thread:
+            self.shared.add(key)
+            return
+        if self.browser_frame is None and key[0] in BROWSER_MODULES:
+            self.browser_frame = frame
+        if self.current is None or self.shared_depth or self.browser_frame is not None:
+            self.shared.add(key)
+        else:
+            self.current.add(key)
+
+    # Returns the (path, qualified name) of a function of the project, or None. The body of a module or
+    # class (run once, when the module is imported) is left out: changes to it are handled as changes to
+    # the whole module or class (see select()). Only function code is compiled with CO_OPTIMIZED.
+    def _function(self, code) -> Optional[tuple]:
+        filename = code.co_filename
+        if not filename.startswith(self.root) or not code.co_flags & inspect.CO_OPTIMIZED or filename == __file__:
+            return None
+        path = os.path.relpath(filename, self.root).replace(os.sep, "/")
+        if path.startswith(("tests/", ".")) or "site-packages" in path or path in ALWAYS_FULL:
+            return None
+        return path, getattr(code, "co_qualname", None) or self._qualname(filename, path, code.co_firstlineno)
+
+    # Returns the qualified name of the function starting at a line, from the file's source. Only Python
+    # 3.11 and newer have it on the code object. A lambda is named after the function it is in, which
+    # select() treats the same.
+    def _qualname(self, filename: str, path: str, line: int) -> str:
+        if path not in self.file_scopes:
+            try:
+                with open(filename) as file:
+                    self.file_scopes[path] = scopes(file.read())
+            except (OSError, SyntaxError, ValueError):
+                self.file_scopes[path] = {}
+        scope = self.file_scopes[path].get(line)
+        return scope[1] if scope is not None else "<module>"
+
+
+# Which functions each test of a baseline run called, and the git blob id of every project file the
+# run depended on, so the map can tell whether it still describes the code it is applied to.
+@dataclass
+class ImpactMap:
+    tests: dict = field(default_factory=dict)
+    shared: list = field(default_factory=list)
+    blobs: dict = field(default_factory=dict)
+    commit: str = ""
+
+    def save(self, path: str) -> None:
+        data = {"version": MAP_VERSION, "commit": self.commit, "blobs": self.blobs, "shared": self.shared, "tests": self.tests}
+        with open(path, "w") as file:
+            json.dump(data, file, indent=1, sort_keys=True)
+
+    # Returns the map stored at 'path', or None if there is none (or it was written by another version).
+    @classmethod
+    def load(cls, path: str) -> Optional["ImpactMap"]:
+        try:
+            with open(path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != MAP_VERSION:
+            return None
+        return cls(data["tests"], data["shared"], data["blobs"], data["commit"])
+
+    # Returns {path: set of qualified names} of a test.
+    def functions(self, nodeid: str) -> dict:
+        return {path: set(names) for path, names in self.tests.get(nodeid, {}).items()}
+
+
+# Groups (path, qualified name) pairs by path: {path: sorted names}, the form stored in the map.
+def by_path(functions) -> dict:
+    grouped = {}
+    for path, name in functions:
+        grouped.setdefault(path, set()).add(name)
+    return {path: sorted(names) for path, names in sorted(grouped.items())}
+
+
+# Returns the project files (relative paths) of the modules imported in this process.
+def imported_files(root: str) -> set:
+    root = os.path.abspath(root) + os.sep
+    files = set()
+    for module in list(sys.modules.values()):
+        filename = getattr(module, "__file__", None)
+        if filename and filename.startswith(root) and "site-packages" not in filename:
+            files.add(os.path.relpath(filename, root).replace(os.sep, "/"))
+    return files
+
+
+def _git(root: str, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, check=True).stdout
+
+
+# Returns {path: blob id} of the given files as they are in the working tree.
+def working_blobs(root: str, paths) -> dict:
+    paths = sorted(path for path in paths if os.path.isfile(os.path.join(root, path)))
+    if not paths:
+        return {}
+    return dict(zip(paths, _git(root, "hash-object", "--", *paths).split()))
+
+
+# Builds the map of a recorded run from {nodeid: {path: [function names]}} and the (path, function name)
+# pairs called by shared fixtures. The git blob id of every project file the tests depended on is stored
+# with it, so select() can tell when the map no longer matches the code. Returns None without git.
+def build_map(root: str, tests: dict, shared: set) -> Optional[ImpactMap]:
+    paths = {path for functions in tests.values() for path in functions}
+    paths |= {path for path, name in shared}
+    paths |= {path for path in imported_files(root) if not path.startswith("tests/")}
+    try:
+        blobs = working_blobs(root, paths)
+        commit = _git(root, "rev-parse", "HEAD").strip()
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Could not save the impact map, it needs git: {e}")
+        return None
+    return ImpactMap(tests, sorted(shared), blobs, commit)
+
+
+# Returns {path: set of changed line numbers in the working tree} of the files that differ from 'base',
+# with an empty set for deleted files, and every line of files git doesn't track yet.
+def changed_lines(root: str, base: str) -> dict:
+    changes = {}
+    path = None
+    for line in _git(root, "diff", "-U0", "--no-color", "--no-ext-diff", "--no-renames", base, "--").splitlines():
+        if line.startswith("--- "):
+            old_path = line[6:] if line.startswith("--- a/") else None
+        elif line.startswith("+++ "):
+            path = line[6:] if line.startswith("+++ b/") else old_path
+            changes.setdefault(path, set())
+        elif line.startswith("@@") and path is not None:
+            match = HUNK_HEADER.match(line)
+            start, count = int(match.group(1)), int(match.group(2) or 1)
+
+            # A hunk that only deletes lines has no new lines. It is attributed to the line before the gap.
+            changes[path].update(range(start, start + count) if count else [max(start, 1)])
+    for new_path in _git(root, "ls-files", "--others", "--exclude-standard").splitlines():
+        changes[new_path] = {0}
+    return changes
+
+
+# Returns the innermost function or class around each line of a Python file, as {line: (kind, qualified
+# name)}, with the qualified names Python gives functions (e.g. "CartPage.get_cart_rows"). Lines outside
+# every function and class are not in the result.
+def scopes(source: str) -> dict:
+    result = {}
+
+    def visit(node, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                name = f"{prefix}{child.name}"
+                kind = "class" if isinstance(child, ast.ClassDef) else "function"
+                first = min([child.lineno, *(decorator.lineno for decorator in child.decorator_list)])
+                for number in range(first, child.end_lineno + 1):
+                    result[number] = (kind, name)
+                visit(child, f"{name}." if kind == "class" else f"{name}.<locals>.")
+            else:
+                visit(child, prefix)
+
+    visit(ast.parse(source), "")
+    return result
+
+
+# The outcome of an impact selection: the tests to run, or None for the full suite, and why.
+@dataclass
+class Selection:
+    nodeids: Optional[set]
+    reason: str
+
+
+# Chooses the tests affected by the changes between 'base' and the working tree, according to the map.
+# 'nodeids' are the collected tests. Falls back to the full suite (nodeids None) whenever the map can't
+# be trusted or a change can't be tied to specific tests.
+def select(root: str, impact_map: Optional[ImpactMap], base: str, nodeids: list) -> Selection:
+    if impact_map is None:
+        return Selection(None, "no impact map, record one with --impact-record")
+    try:
+        base_blobs = dict(
+            (line.split("\t")[1], line.split()[2]) for line in _git(root, "ls-tree", "-r", base).splitlines()
+        )
+        changes = changed_lines(root, base)
+    except (OSError, subprocess.CalledProcessError) as e:
+        return Selection(None, f"could not compare with {base}: {getattr(e, 'stderr', '') or e}".strip())
+
+    # The map only describes the code it was recorded on. If a file it depends on is different in the base,
+    # the tests may call other functions now.
+    stale = sorted(path for path, blob in impact_map.blobs.items() if base_blobs.get(path) != blob)
+    if stale:
+        return Selection(None, f"the impact map is stale ({stale[0]} changed since it was recorded)")
+
+    functions = {nodeid: impact_map.functions(nodeid) for nodeid in nodeids}
+    shared = by_path(map(tuple, impact_map.shared))
+
+    # Tests the map doesn't know (new tests) always run.
+    selected = {nodeid for nodeid in nodeids if nodeid not in impact_map.tests}
+    for path, lines in sorted(changes.items()):
+        if path.endswith(IGNORED_SUFFIXES):
+            continue
+        if os.path.basename(path) in ALWAYS_FULL or path in BROWSER_MODULES:
+            return Selection(None, f"{path} changed")
+
+        # A changed test module: run its tests.
+        if path.startswith("tests/"):
+            selected.update(nodeid for nodeid in nodeids if nodeid.startswith(f"{path}::"))
+            continue
+        if not path.endswith(".py"):
+            return Selection(None, f"{path} changed and is not Python code")
+
+        # Files no test depended on don't affect the tests.
+        if path not in impact_map.blobs:
+            continue
+        if not os.path.exists(os.path.join(root, path)):
+            return Selection(None, f"{path} was deleted")
+
+        with open(os.path.join(root, path)) as file:
+            line_scopes = scopes(file.read())
+        for line in sorted(lines):
+            scope = line_scopes.get(line)
+
+            # A change outside every function (imports, constants, class attributes such as locators) affects
+            # every test that used the module or class. If the map has no test calling into it, it
+            # was only used at import time, so the full suite runs.
+            if scope is None:
+                prefix, what = "", f"module code of {path}"
+            elif scope[0] == "class":
+                prefix, what = f"{scope[1]}.", f"class {scope[1]} in {path}"
+            else:
+                prefix, what = None, None
+            if prefix is not None:
+                users = {nodeid for nodeid, used in functions.items() if any(name.startswith(prefix) for name in used.get(path, ()))}
+                if not users or any(name.startswith(prefix) for name in shared.get(path, ())):
+                    return Selection(None, f"{what} changed (line {line})")
+                selected.update(users)
+                continue
+
+            # A changed function (or a lambda or function defined in it) affects the tests that called it.
+            name = scope[1]
+            if any(_same_function(used, name) for used in shared.get(path, ())):
+                return Selection(None, f"{path}:{name} changed and is shared by every test (a fixture or browser launch uses it)")
+            selected.update(
+                nodeid for nodeid, used in functions.items() if any(_same_function(other, name) for other in used.get(path, ()))
+            )
+
+    return Selection(selected, f"{len(selected)} of {len(nodeids)} tests affected by the changes since {base}")
+
+
+def _same_function(recorded: str, changed: str) -> bool:
+    return recorded == changed or recorded.startswith(f"{changed}.<locals>.")
@@ -0,0 +1,71 @@
+import time
+from dataclasses import dataclass
+
+# WebDriver commands after which the elements found before may belong to another document or window.
+# instrument() counts them per driver ('driver._navigations'), so the page objects' element caches know
+# when to forget their elements (see pages/locators.py).
+NAVIGATION_COMMANDS = {
+    "get", "goBack", "goForward", "refresh", "newWindow", "close",
+    "switchToWindow", "switchToFrame", "switchToParentFrame",
+}
+
+# Functions called after every WebDriver command (see instrument()). Features that need to see
+# every command, such as the command profiler, register themselves here with add_listener().
+_listeners = []
+
+
+# One finished WebDriver command: the driver that ran it, the command name (e.g. "findElement"),
+# its parameters, how long it took (in seconds) and the exception it raised, if any.
+@dataclass
+class CommandEvent:
+    driver: object
+    command: str
+    params: dict
+    duration: float
+    error: Exception = None
+
+
+def add_listener(listener) -> None:
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+# Passes an event to every listener. Used by instrument() below, and by code that wants to report
+# something that is not a WebDriver command, such as how long launching the browser took.
+def emit(event: CommandEvent) -> None:
+    for listener in list(_listeners):
+        listener(event)
+
+
+# Wraps the driver's 'execute' method, which every WebDriver command (find, click, get, execute_script...)
+# goes through, so each command is timed and passed to the registered listeners, and navigations are counted.
+# Without listeners, the only cost is reading the clock twice per command.
+def instrument(driver):
+    if getattr(driver, "_instrumented", False):
+        return driver
+
+    original_execute = driver.execute
+    driver._navigations = 0
+
+    def execute(driver_command, params=None):
+        if driver_command in NAVIGATION_COMMANDS:
+            driver._navigations += 1
+        start = time.perf_counter()
+        error = None
+        try:
+            return original_execute(driver_command, params)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if _listeners:
+                emit(CommandEvent(driver, driver_command, params or {}, time.perf_counter() - start, error))
+
+    driver.execute = execute
+    driver._instrumented = True
+    return driver
@@ -0,0 +1,141 @@
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from pages.login_page import LoginPage
+
+# Reads the web storage of the open page: {"local": {key: value}, "session": {key: value}}.
+SNAPSHOT_SCRIPT = """
+function read(storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) { items[storage.key(i)] = storage.getItem(storage.key(i)); }
+    return items;
+}
+return {local: read(window.localStorage), session: read(window.sessionStorage)};
+"""
+
+# Replaces the web storage of the open page with arguments[0] (localStorage) and arguments[1] (sessionStorage).
+RESTORE_SCRIPT = """
+var local = arguments[0], session = arguments[1];
+window.localStorage.clear();
+window.sessionStorage.clear();
+Object.keys(local).forEach(function (key) { window.localStorage.setItem(key, local[key]); });
+Object.keys(session).forEach(function (key) { window.sessionStorage.setItem(key, session[key]); });
+"""
+
+# The cookie fields that are restored. The domain is left out, so the cookie gets the host of the site
+# it is restored on (browsers refuse cookies whose domain doesn't match, e.g. for 127.0.0.1). The expiry is
+# left out too: it is an absolute time, and the site's session cookie only lasts 10 minutes, so a restored
+# copy could already be expired. Restored cookies last as long as the browser.
+COOKIE_FIELDS = ("name", "value", "path", "secure", "httpOnly", "sameSite")
+
+# Age (in seconds) after which a snapshot is not restored anymore, and the journey is built again. The
+# state the site keeps on its server side for a session (if any) may not last longer.
+MAX_SNAPSHOT_AGE = 300
+
+
+# The state of the site in a browser: its cookies, its web storage and the page that is open. That is all
+# the state Swag Labs keeps (the user in a cookie, the cart in localStorage, see seeding.py).
+@dataclass
+class BrowserSnapshot:
+    url: str
+    cookies: list
+    local_storage: dict
+    session_storage: dict
+
+    # When the snapshot was taken (time.monotonic()).
+    taken: float = field(default_factory=time.monotonic)
+
+
+def take_snapshot(driver) -> BrowserSnapshot:
+    storage = driver.execute_script(SNAPSHOT_SCRIPT)
+    cookies = [{name: cookie[name] for name in COOKIE_FIELDS if name in cookie} for cookie in driver.get_cookies()]
+    return BrowserSnapshot(driver.current_url, cookies, storage["local"], storage["session"])
+
+
+# Puts a browser into the state of a snapshot. Whatever state the browser had is replaced, so a restored
+# test sees exactly what the test that built the journey saw.
+def restore_snapshot(driver, snapshot: BrowserSnapshot) -> None:
+
+    # Cookies and web storage can only be written for the site that is currently open.
+    if not driver.current_url.startswith(LoginPage.URL):
+        driver.get(LoginPage.URL)
+    driver.delete_all_cookies()
+    for cookie in snapshot.cookies:
+        driver.add_cookie(cookie)
+    driver.execute_script(RESTORE_SCRIPT, snapshot.local_storage, snapshot.session_storage)
+
+    # Load the page again, so it renders with the restored state.
+    driver.get(snapshot.url)
+
+
+# Returns the name a journey is known by: the module and name of the function that builds it.
+def journey_name(build) -> str:
+    return f"{build.__module__}.{build.__qualname__}"
+
+
+# Many tests start with the same steps (e.g. logging in through the login page) before doing what they
+# test. Such a "journey prefix" is declared with the 'journey' marker and its steps as a function:
+#   @pytest.mark.journey(steps=logged_in_through_ui)
+#   def test_cart_badge_updates(driver): ...
+# The first test of a journey in a test process runs its steps and takes a snapshot of the browser state
+# right after them. Every other test of the journey gets that snapshot restored instead (until it is
+# MAX_SNAPSHOT_AGE old, then the next test builds the journey again), which costs a
+# handful of WebDriver commands however long the steps are. The parallel runner keeps the tests of a
+# journey on as few workers as possible (see schedule_units()), so each journey is built about once.
+class JourneyCache:
+
+    def __init__(self):
+        self.snapshots = {}
+
+        # Simple counters that are printed at the end of the session.
+        self.built = 0
+        self.restored = 0
+
+    # Puts the browser at the end of the journey. Returns True if the journey was built (its steps ran),
+    # False if its snapshot was restored.
+    def enter(self, driver, build) -> bool:
+        name = journey_name(build)
+        snapshot = self.snapshots.get(name)
+        if snapshot is not None and time.monotonic() - snapshot.taken <= MAX_SNAPSHOT_AGE:
+            restore_snapshot(driver, snapshot)
+            self.restored += 1
+            return False
+
+        # A journey whose steps failed is not stored, so the next test of the journey tries again.
+        build(driver)
+        self.snapshots[name] = take_snapshot(driver)
+        self.built += 1
+        return True
+
+
+# The journey cache of this test process, unless '--no-journey-sharing' is used. Set by conftest.py.
+cache: Optional[JourneyCache] = None
+
+
+# Returns the journey function of a test's 'journey' marker, or None. The function is passed as 'steps=',
+# because a marker called with a function as its only argument decorates that function instead.
+def marked_journey(item):
+    marker = item.get_closest_marker("journey")
+    return marker.kwargs.get("steps") if marker is not None else None
+
+
+# Splits the tests into the units the parallel runner hands out (see parallel.py): the tests of a journey
+# stay together, so the worker that builds the journey also runs the tests that restore it. A journey with
+# more tests than a worker's share is split into several units, so the workers stay balanced.
+def schedule_units(items, workers: int) -> list:
+    share = max(math.ceil(len(items) / max(workers, 1)), 1)
+    units = []
+    by_journey = {}
+    for item in items:
+        build = marked_journey(item)
+        if build is None:
+            units.append([item.nodeid])
+            continue
+        unit = by_journey.get(journey_name(build))
+        if unit is None or len(unit) >= share:
+            unit = by_journey[journey_name(build)] = []
+            units.append(unit)
+        unit.append(item.nodeid)
+    return units
@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+
+from framework.async_browser import AsyncBrowser
+from pages.aio.login_page import AsyncLoginPage
+from pages.login_page import LoginPage
+
+# Name of the pseudo step that covers a whole journey, from opening the session to closing it.
+JOURNEY = "journey"
+
+# Percentiles reported for every step.
+PERCENTILES = (50, 95, 99)
+
+
+# The timings of one step (a page-object method such as "CartPage.click_checkout") during a load run.
+@dataclass
+class StepStats:
+    durations: list = field(default_factory=list)
+    errors: int = 0
+
+
+# Returns the p-th percentile (nearest-rank method) of a sorted list of numbers.
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+# Collects the duration of every step of every journey.
+class LoadRecorder:
+
+    def __init__(self):
+        self.steps: dict[str, StepStats] = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, step: str, duration: float, failed: bool = False) -> None:
+        stats = self.steps.setdefault(step, StepStats())
+        if failed:
+            stats.errors += 1
+        else:
+            stats.durations.append(duration)
+
+    # Returns [{"step", "count", "errors", "throughput", "mean", "p50", "p95", "p99", "max"}], one per step
+    # in the order the steps first ran. Times are in milliseconds, throughput is per second of the run.
+    def summary(self) -> list[dict]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        rows = []
+        for step, stats in self.steps.items():
+            durations = sorted(stats.durations)
+            row = {
+                "step": step,
+                "count": len(durations),
+                "errors": stats.errors,
+                "throughput": round(len(durations) / elapsed, 3) if elapsed else 0.0,
+                "mean": round(sum(durations) / len(durations) * 1000, 1) if durations else 0.0,
+            }
+            for p in PERCENTILES:
+                row[f"p{p}"] = round(percentile(durations, p) * 1000, 1)
+            row["max"] = round(durations[-1] * 1000, 1) if durations else 0.0
+            rows.append(row)
+        return rows
+
+    def write_csv(self, path: str) -> None:
+        rows = self.summary()
+        _make_parent(path)
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]) if rows else ["step"])
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def write_json(self, path: str, settings: dict) -> None:
+        _make_parent(path)
+        with open(path, "w") as file:
+            json.dump(
+                {
+                    "settings": settings,
+                    "elapsed": round((self.finished or time.perf_counter()) - self.started, 3),
+                    "steps": self.summary(),
+                },
+                file,
+                indent=2,
+            )
+
+
+def _make_parent(path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+
+# Wraps a page object so that every method call is timed and recorded as a step named like the
+# synchronous page objects' methods (e.g. "CheckoutPage.enter_customer_info", as in the WebDriver
+# profile). Page objects returned by a method (the next page) are wrapped too, so a journey is written
+# exactly like a test, and every step is timed without changing the page objects. A page class can be
+# wrapped too, to time its class methods (AsyncLoginPage.open).
+class TimedPage:
+
+    def __init__(self, page, recorder: LoadRecorder):
+        self._page = page
+        self._recorder = recorder
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._page, name)
+        if not callable(attribute):
+            return attribute
+        page_class = self._page if isinstance(self._page, type) else type(self._page)
+        step = f"{page_class.__name__.removeprefix('Async')}.{name}"
+
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = await attribute(*args, **kwargs)
+            except Exception:
+                self._recorder.record(step, time.perf_counter() - start, failed=True)
+                raise
+            self._recorder.record(step, time.perf_counter() - start)
+            if hasattr(result, "session"):
+                return TimedPage(result, self._recorder)
+            return result
+
+        return timed
+
+
+# The purchase journey of test_complete_checkout_flow, done through the UI from the login page on:
+# log in, add a product, open the cart, check out and confirm the order.
+async def checkout_journey(session, recorder: LoadRecorder) -> None:
+    login = await TimedPage(AsyncLoginPage, recorder).open(session)
+    products = await login.login("standard_user", "secret_sauce")
+    await products.add_to_cart("sauce-labs-backpack")
+    cart = await products.go_to_cart()
+    checkout = await cart.click_checkout()
+    await checkout.enter_customer_info("Test", "User", "12345")
+    overview = await checkout.click_continue()
+    if "Sauce Labs Backpack" not in await overview.get_item_list():
+        raise AssertionError("Expected item missing in overview")
+    confirmation = await overview.finish_checkout()
+    header = await confirmation.get_complete_header()
+    if header != "Thank you for your order!":
+        raise AssertionError(f"Unexpected confirmation header: {header}")
+
+
+# Runs 'journey' from 'users' concurrent sessions of one headless Chrome (see async_browser.py) until
+# 'duration' seconds have passed or 'iterations' journeys have been started, whichever comes first.
+# Users start one after the other, spread evenly over 'ramp_up' seconds. Every journey runs in a new
+# session (a new browser context), like a new visitor. Returns the recorder with all step timings.
+async def run_load(
+    users: int,
+    duration: float = None,
+    iterations: int = None,
+    ramp_up: float = 0.0,
+    journey=checkout_journey,
+    executable: str = None,
+) -> LoadRecorder:
+    if duration is None and iterations is None:
+        raise ValueError("Either a duration or a number of iterations is needed")
+
+    async with await AsyncBrowser.launch(executable) as browser:
+
+        # The browser launch is not part of the measured run.
+        recorder = await run_users(browser, users, duration, iterations, ramp_up, journey)
+    recorder.finished = time.perf_counter()
+    return recorder
+
+
+# Runs the users of run_load() on an open browser, or anything else with new_session() and
+# close_session(session). Returns the recorder, with the run's start time but not its end. 'clock' and
+# 'sleep' are what the schedule is kept with (the tests pass their own, so they don't depend on timing).
+async def run_users(browser, users: int, duration: float = None, iterations: int = None, ramp_up: float = 0.0,
+                    journey=checkout_journey, clock=time.perf_counter, sleep=asyncio.sleep) -> LoadRecorder:
+    recorder = LoadRecorder()
+    deadline = math.inf
+    started = 0
+
+    # Returns True if the user may start another journey, and counts it.
+    def claim_iteration() -> bool:
+        nonlocal started
+        if clock() >= deadline or (iterations is not None and started >= iterations):
+            return False
+        started += 1
+        return True
+
+    async def user(index: int) -> None:
+        await sleep(ramp_up * index / users)
+        while claim_iteration():
+            start = clock()
+            failed = False
+            session = None
+            try:
+                session = await browser.new_session()
+                await journey(session, recorder)
+            except Exception as e:
+                failed = True
+                print(f"User {index}: journey failed: {e!r}")
+            finally:
+                if session is not None:
+                    await browser.close_session(session)
+            recorder.record(JOURNEY, clock() - start, failed)
+
+    recorder.started = clock()
+    if duration is not None:
+        deadline = recorder.started + duration
+    await asyncio.gather(*(user(index) for index in range(users)))
+    return recorder
+
+
+# Prints the summary table.
+def print_summary(recorder: LoadRecorder) -> None:
+    columns = ["count", "errors", "throughput", "mean", "p50", "p95", "p99", "max"]
+    print(f"{'step':40} " + " ".join(f"{column:>10}" for column in columns))
+    for row in recorder.summary():
+        print(f"{row['step']:40} " + " ".join(f"{row[column]:>10}" for column in columns))
+    print("(times in ms, throughput per second)")
+
+
+# Command line entry point:
+#   python -m framework.load --base-url local --users 20 --ramp-up 10 --duration 60 --csv load.csv --json load.json
+#   python -m framework.load --base-url https://staging.example/ --users 5 --iterations 100
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the checkout journey from many concurrent browser sessions")
+    parser.add_argument("--base-url", default=LoginPage.URL, help="URL of the site, or 'local' to start the stand-in")
+    parser.add_argument("--users", type=int, default=1, help="Number of concurrent sessions")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which the sessions are started")
+    parser.add_argument("--duration", type=float, help="Seconds to run for")
+    parser.add_argument("--iterations", type=int, help="Total number of journeys to run")
+    parser.add_argument("--chrome", help="Path of the Chrome executable (default: found on the PATH)")
+    parser.add_argument("--csv", help="Write the per-step statistics to this CSV file")
+    parser.add_argument("--json", help="Write the per-step statistics to this JSON file")
+    args = parser.parse_args(argv)
+    if args.duration is None and args.iterations is None:
+        parser.error("pass --duration and/or --iterations")
+
+    process = None
+    url = args.base_url
+    if url == "local":
+        from standin.server import start_server_process
+        process, url = start_server_process()
+    LoginPage.URL = url if url.endswith("/") else url + "/"
+
+    try:
+        recorder = asyncio.run(run_load(args.users, args.duration, args.iterations, args.ramp_up, executable=args.chrome))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print_summary(recorder)
+    if args.csv:
+        recorder.write_csv(args.csv)
+    if args.json:
+        settings = {key: getattr(args, key) for key in ("users", "ramp_up", "duration", "iterations")}
+        recorder.write_json(args.json, dict(settings, base_url=LoginPage.URL))
+    journeys = next((row for row in recorder.summary() if row["step"] == JOURNEY), None)
+    return 1 if journeys is None or journeys["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import json
+import select
+import socket
+import socketserver
+import threading
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+# URL patterns of the image and font requests blocked by the "block-images-fonts" preset in Chrome.
+IMAGE_AND_FONT_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+]
+
+# The available presets, and what each of them blocks.
+PRESETS = {
+    "allow-all": {"images_fonts": False, "third_party": False},
+    "block-images-fonts": {"images_fonts": True, "third_party": False},
+    "block-third-party": {"images_fonts": False, "third_party": True},
+    "block-all": {"images_fonts": True, "third_party": True},
+}
+
+# Hosts that are never treated as third-party (the local stand-in site runs on them).
+LOCAL_HOSTS = ["localhost", "127.0.0.1"]
+
+
+# Requests blocked and bytes downloaded by one browser during one test. Blocked requests are never
+# downloaded, so their size can't be known; the bytes that were still downloaded are counted instead.
+# A field is None when the browser can't report it (e.g. Firefox without the blocking proxy).
+@dataclass
+class NetworkStats:
+    blocked_requests: int = None
+    transferred_bytes: int = None
+
+
+# Decides which requests the test browsers may make. Chrome blocks images and fonts through the DevTools
+# protocol (Network.setBlockedURLs) and third-party hosts with a host resolver rule that makes every host
+# except the site under test unresolvable. Firefox uses preferences for images and fonts and sends its
+# traffic through a small local proxy (BlockingProxy) that refuses third-party hosts.
+class NetworkPolicy:
+
+    def __init__(self, preset: str = "allow-all"):
+        self.preset = preset
+        self.images_fonts = PRESETS[preset]["images_fonts"]
+        self.third_party = PRESETS[preset]["third_party"]
+        self.proxy = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.images_fonts or self.third_party
+
+    # Applies the policy to ChromeOptions before launch. 'site_url' is the site under test,
+    # whose host (and the local hosts) stay reachable when third-party hosts are blocked.
+    def apply_chrome_options(self, opts, site_url: str) -> None:
+        if not self.enabled:
+            return
+
+        # Chrome's performance log contains the network events used to count blocked requests.
+        opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+        if self.third_party:
+            excluded = ", ".join(f"EXCLUDE {host}" for host in [urlparse(site_url).hostname, *LOCAL_HOSTS])
+            opts.add_argument(f"--host-resolver-rules=MAP * ~NOTFOUND, {excluded}")
+
+    # Applies the parts of the policy that need a running Chrome.
+    def apply_chrome_driver(self, driver) -> None:
+        if self.images_fonts:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": IMAGE_AND_FONT_PATTERNS})
+
+    # Applies the policy to FirefoxOptions before launch.
+    def apply_firefox_options(self, opts, site_url: str) -> None:
+        if self.images_fonts:
+            # 2 = never load images. Fonts: only use the browser's own fonts, never download web fonts.
+            opts.set_preference("permissions.default.image", 2)
+            opts.set_preference("browser.display.use_document_fonts", 0)
+
+        if self.third_party:
+            if self.proxy is None:
+                self.proxy = BlockingProxy([urlparse(site_url).hostname, *LOCAL_HOSTS])
+                self.proxy.start()
+
+            # Manual proxy configuration (type 1) for both HTTP and HTTPS traffic.
+            opts.set_preference("network.proxy.type", 1)
+            opts.set_preference("network.proxy.http", "127.0.0.1")
+            opts.set_preference("network.proxy.http_port", self.proxy.port)
+            opts.set_preference("network.proxy.ssl", "127.0.0.1")
+            opts.set_preference("network.proxy.ssl_port", self.proxy.port)
+
+    # Returns the requests blocked and bytes downloaded since the previous call, for this driver.
+    def collect(self, driver) -> NetworkStats:
+        if not self.enabled:
+            return NetworkStats()
+
+        if driver.capabilities.get("browserName") == "chrome":
+            return _chrome_stats(driver)
+
+        stats = NetworkStats()
+        if self.proxy is not None:
+            stats.blocked_requests, stats.transferred_bytes = self.proxy.take_counts()
+        return stats
+
+    def close(self) -> None:
+        if self.proxy is not None:
+            self.proxy.stop()
+            self.proxy = None
+
+
+# Reads Chrome's performance log (which is emptied by every read) and counts the requests that failed
+# because they were blocked, and the bytes received by the requests that finished.
+def _chrome_stats(driver) -> NetworkStats:
+    stats = NetworkStats(0, 0)
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.loadingFailed":
+            if params.get("blockedReason") or params.get("errorText") == "net::ERR_NAME_NOT_RESOLVED":
+                stats.blocked_requests += 1
+        elif method == "Network.loadingFinished":
+            stats.transferred_bytes += int(params.get("encodedDataLength", 0))
+    return stats
+
+
+# A minimal HTTP/HTTPS forward proxy for Firefox that only lets requests to 'allowed_hosts' through.
+# HTTPS requests arrive as "CONNECT host:port" and are tunneled without being decrypted, so only the
+# host name is looked at. Blocked requests get a 403 response. Counts blocked requests and the bytes
+# sent back to the browser.
+class BlockingProxy:
+
+    def __init__(self, allowed_hosts):
+        self.allowed_hosts = set(allowed_hosts)
+        self.blocked_requests = 0
+        self.transferred_bytes = 0
+        self.lock = threading.Lock()
+        self.server = None
+        self.port = None
+
+    def start(self) -> None:
+        proxy = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                proxy._handle(self.request)
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    # Returns (blocked requests, transferred bytes) since the previous call and resets both counters.
+    def take_counts(self):
+        with self.lock:
+            counts = (self.blocked_requests, self.transferred_bytes)
+            self.blocked_requests = 0
+            self.transferred_bytes = 0
+        return counts
+
+    def _handle(self, client) -> None:
+        # Read the request head (request line and headers).
+        head = b""
+        while b"\r\n\r\n" not in head:
+            chunk = client.recv(65536)
+            if not chunk:
+                return
+            head += chunk
+
+        request_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+        method, target, _ = request_line.split(" ", 2)
+        if method == "CONNECT":
+            host, _, port = target.rpartition(":")
+        else:
+            parsed = urlparse(target)
+            host, port = parsed.hostname, parsed.port or 80
+
+        if host not in self.allowed_hosts:
+            with self.lock:
+                self.blocked_requests += 1
+            client.sendall(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            return
+
+        try:
+            upstream = socket.create_connection((host, int(port)), timeout=30)
+        except OSError:
+            client.sendall(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            return
+
+        if method == "CONNECT":
+            client.sendall(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+        else:
+            # Forward the plain HTTP request, with the absolute URL in the request line turned back into a path.
+            # The connection is closed after one request, so the browser can't send a request for another
+            # (possibly blocked) host over it.
+            parsed = urlparse(target)
+            path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+            head_text, _, body = head.partition(b"\r\n\r\n")
+            lines = head_text.decode("latin-1").split("\r\n")
+            lines = [f"{method} {path} {request_line.split(' ', 2)[2]}"] + [
+                line for line in lines[1:]
+                if line.split(":", 1)[0].lower() not in ("connection", "proxy-connection", "keep-alive")
+            ] + ["Connection: close"]
+            upstream.sendall("\r\n".join(lines).encode("latin-1") + b"\r\n\r\n" + body)
+        self._pipe(client, upstream)
+
+    # Copies data in both directions until one side closes, counting the bytes sent to the browser.
+    def _pipe(self, client, upstream) -> None:
+        sockets = [client, upstream]
+        try:
+            while True:
+                readable, _, _ = select.select(sockets, [], [], 30)
+                if not readable:
+                    return
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    if sock is upstream:
+                        client.sendall(data)
+                        with self.lock:
+                            self.transferred_bytes += len(data)
+                    else:
+                        upstream.sendall(data)
+        finally:
+            upstream.close()
+
+
+# The policy used for the browsers launched in this process. conftest.py sets it from '--network-policy'.
+active = NetworkPolicy()
@@ -0,0 +1,275 @@
+import argparse
+import sqlite3
+import statistics
+import sys
+import time
+from dataclasses import dataclass, fields
+from typing import Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from framework.waits import DEFAULT_POLL, DEFAULT_TIMEOUT
+
+# JavaScript (run with execute_async_script) that reads the Navigation Timing and Paint Timing of the
+# current document and its Largest Contentful Paint. LCP is only available through a PerformanceObserver,
+# which reports the buffered entries shortly after it is created, so the script waits up to 100ms for it.
+# Times are in milliseconds since the start of the navigation.
+TIMING_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var navigation = performance.getEntriesByType("navigation")[0];
+var paints = {};
+performance.getEntriesByType("paint").forEach(function (entry) { paints[entry.name] = entry.startTime; });
+var result = {
+    url: location.href,
+    time_origin: performance.timeOrigin,
+    ttfb: navigation ? navigation.responseStart : null,
+    dom_content_loaded: navigation ? navigation.domContentLoadedEventEnd : null,
+    load: navigation ? navigation.loadEventEnd : null,
+    fcp: paints["first-contentful-paint"] === undefined ? null : paints["first-contentful-paint"],
+    lcp: null,
+    dom_nodes: document.getElementsByTagName("*").length
+};
+var types = window.PerformanceObserver ? PerformanceObserver.supportedEntryTypes || [] : [];
+if (types.indexOf("largest-contentful-paint") === -1) { done(result); return; }
+new PerformanceObserver(function (list) {
+    var entries = list.getEntries();
+    result.lcp = entries[entries.length - 1].startTime;
+    done(result);
+}).observe({type: "largest-contentful-paint", buffered: true});
+setTimeout(function () { done(result); }, 100);
+"""
+
+# Returns the start of the navigation that loaded the current document, which identifies the document.
+TIME_ORIGIN_SCRIPT = "return performance.timeOrigin"
+
+# Metrics of a PageTiming, with their unit, in the order they are reported.
+METRICS = {
+    "ttfb": "s",
+    "dom_content_loaded": "s",
+    "load": "s",
+    "fcp": "s",
+    "lcp": "s",
+    "js_heap_mb": "MB",
+    "dom_nodes": "",
+}
+
+
+# A performance budget of a page object class: the largest acceptable value of each metric. Metrics left
+# at None are not checked. Declared on the page class, e.g. in products_page.py:
+#   BUDGET = PerformanceBudget(lcp=1.5, js_heap_mb=30)
+@dataclass(frozen=True)
+class PerformanceBudget:
+    ttfb: Optional[float] = None
+    dom_content_loaded: Optional[float] = None
+    load: Optional[float] = None
+    fcp: Optional[float] = None
+    lcp: Optional[float] = None
+    js_heap_mb: Optional[float] = None
+    dom_nodes: Optional[int] = None
+
+
+# The measurements taken when a test arrived on a page. Times are in seconds since the start of the
+# navigation. The navigation and paint timings are None when the page was reached without loading a new
+# document (a client-side route change), and the heap
+# size is None in browsers without the DevTools Performance domain (anything but Chrome).
+@dataclass
+class PageTiming:
+    test: str
+    page: str
+    url: str
+    ttfb: Optional[float] = None
+    dom_content_loaded: Optional[float] = None
+    load: Optional[float] = None
+    fcp: Optional[float] = None
+    lcp: Optional[float] = None
+    js_heap_mb: Optional[float] = None
+    dom_nodes: Optional[int] = None
+
+
+# One metric of a page that went over the page's budget.
+@dataclass
+class BudgetViolation:
+    timing: PageTiming
+    metric: str
+    value: float
+    limit: float
+
+    def __str__(self) -> str:
+        unit = METRICS[self.metric]
+        return f"{self.timing.page} {self.metric} {self.value:.3f}{unit} > {self.limit}{unit} ({self.timing.url})"
+
+
+# Collects a PageTiming every time a page object is created for a page it hasn't measured yet (see
+# BasePage.__init__), and checks it against the page class's BUDGET. A page is a page class on a document,
+# so a second ProductsPage(driver) on the same document costs one script call and isn't measured again.
+# Enabled with '--page-timing' (see conftest.py).
+class PageTimingMonitor:
+
+    def __init__(self):
+        self.current_test = ""
+
+        # Timings and budget violations of the current test, taken by conftest.py after each test.
+        self.timings: list[PageTiming] = []
+        self.violations: list[BudgetViolation] = []
+
+    # Called by BasePage.__init__ with the new page object.
+    def on_page(self, page) -> None:
+        timing = self.measure(page)
+        if timing is None:
+            return
+        self.timings.append(timing)
+        budget = getattr(type(page), "BUDGET", None)
+        if budget is not None:
+            self.violations.extend(check_budget(timing, budget))
+
+    # Waits for the page to finish loading and measures it. Returns None if the page was already measured,
+    # or if the driver can't run the timing script (e.g. the fake driver).
+    def measure(self, page) -> Optional[PageTiming]:
+        driver = page.driver
+        name = type(page).__name__
+        try:
+            time_origin = driver.execute_script(TIME_ORIGIN_SCRIPT)
+            new_document = getattr(driver, "_timed_document", None) != time_origin
+            if not new_document and name in driver._timed_pages:
+                return None
+            _wait_until_loaded(driver)
+            raw = driver.execute_async_script(TIMING_SCRIPT)
+        except WebDriverException:
+            return None
+
+        timing = PageTiming(self.current_test, name, raw["url"], dom_nodes=raw["dom_nodes"])
+
+        # Only report the navigation and paint timings once per document.
+        if new_document:
+            driver._timed_document = time_origin
+            driver._timed_pages = set()
+            for metric in ("ttfb", "dom_content_loaded", "load", "fcp", "lcp"):
+                setattr(timing, metric, raw[metric] / 1000 if raw[metric] else None)
+        driver._timed_pages.add(name)
+
+        metrics = _devtools_metrics(driver)
+        if metrics:
+            timing.js_heap_mb = round(metrics["JSHeapUsedSize"] / 1024 / 1024, 2)
+            timing.dom_nodes = int(metrics.get("Nodes", timing.dom_nodes))
+        return timing
+
+    # Returns the timings and violations of the test that just ran, and starts over for the next one.
+    def take(self) -> tuple:
+        timings, violations = self.timings, self.violations
+        self.timings, self.violations = [], []
+        return timings, violations
+
+
+# Waits until the document has finished loading (document.readyState is "complete"), for up to
+# DEFAULT_TIMEOUT seconds. This is not a page object wait, so it doesn't go through Waiter and doesn't show
+# in the wait report. A page that doesn't finish loading in time is measured as it is.
+def _wait_until_loaded(driver) -> None:
+    deadline = time.perf_counter() + DEFAULT_TIMEOUT
+    while driver.execute_script("return document.readyState") != "complete" and time.perf_counter() < deadline:
+        time.sleep(DEFAULT_POLL)
+
+
+# Reads Chrome's DevTools Performance.getMetrics ({name: value}), enabling the Performance domain the
+# first time. Returns None for browsers without the Chrome DevTools Protocol.
+def _devtools_metrics(driver) -> Optional[dict]:
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return None
+    try:
+        if not getattr(driver, "_performance_enabled", False):
+            driver.execute_cdp_cmd("Performance.enable", {})
+            driver._performance_enabled = True
+        return {metric["name"]: metric["value"] for metric in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+    except WebDriverException:
+        return None
+
+
+def check_budget(timing: PageTiming, budget: PerformanceBudget) -> list[BudgetViolation]:
+    violations = []
+    for field in fields(budget):
+        limit = getattr(budget, field.name)
+        value = getattr(timing, field.name)
+        if limit is not None and value is not None and value > limit:
+            violations.append(BudgetViolation(timing, field.name, value, limit))
+    return violations
+
+
+# The monitor of this test process, when '--page-timing' is used. Set by conftest.py.
+monitor: Optional[PageTimingMonitor] = None
+
+
+# Keeps the page timings of every run in a small SQLite database, for the trend report.
+class TimingHistory:
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS page_timings ("
+            "run REAL NOT NULL, test TEXT NOT NULL, page TEXT NOT NULL, metric TEXT NOT NULL, value REAL NOT NULL)"
+        )
+
+    # Stores the timings of one run. Returns the run's id (its start time).
+    def add_run(self, timings: list[dict]) -> float:
+        run = time.time()
+        with self.connection:
+            for timing in timings:
+                for metric in METRICS:
+                    if timing.get(metric) is not None:
+                        self.connection.execute(
+                            "INSERT INTO page_timings (run, test, page, metric, value) VALUES (?, ?, ?, ?, ?)",
+                            (run, timing["test"], timing["page"], metric, timing[metric]),
+                        )
+        return run
+
+    # Returns {(page, metric): [median of each run]} for the last 'runs' runs, oldest run first.
+    def trend(self, runs: int = 5) -> dict:
+        run_ids = [row[0] for row in self.connection.execute(
+            "SELECT DISTINCT run FROM page_timings ORDER BY run DESC LIMIT ?", (runs,)
+        )]
+        trend = {}
+        for run in sorted(run_ids):
+            values = {}
+            for page, metric, value in self.connection.execute(
+                "SELECT page, metric, value FROM page_timings WHERE run = ?", (run,)
+            ):
+                values.setdefault((page, metric), []).append(value)
+            for key, samples in values.items():
+                trend.setdefault(key, []).append(statistics.median(samples))
+        return dict(sorted(trend.items(), key=lambda item: (item[0][0], list(METRICS).index(item[0][1]))))
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+# Returns the lines of the trend report: the median of every page metric in each of the last runs,
+# and the change of the latest run against the median of the runs before it.
+def trend_lines(trend: dict) -> list[str]:
+    lines = []
+    for (page, metric), medians in trend.items():
+        unit = METRICS[metric]
+        history = " ".join(f"{value:.3f}" if unit == "s" else f"{value:g}" for value in medians)
+        change = ""
+        if len(medians) > 1 and statistics.median(medians[:-1]):
+            previous = statistics.median(medians[:-1])
+            change = f"{(medians[-1] - previous) / previous * 100:+.0f}%"
+        lines.append(f"  {page:18} {metric:20} {change:>6}  {history} {unit}".rstrip())
+    return lines
+
+
+# Command line entry point, to look at the trend outside a test run:
+#   python -m framework.page_timing --db .page_timing.sqlite --runs 10
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Show the page timing trend of the last test runs")
+    parser.add_argument("--db", default=".page_timing.sqlite", help="Page timing database written by --page-timing")
+    parser.add_argument("--runs", type=int, default=5, help="Number of runs to show")
+    args = parser.parse_args(argv)
+
+    history = TimingHistory(args.db)
+    lines = trend_lines(history.trend(args.runs))
+    history.close()
+    print("Median per run, oldest first, and the change of the latest run:")
+    print("\n".join(lines) if lines else "  No page timings recorded yet.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
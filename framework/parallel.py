@@ -0,0 +1,162 @@
+import heapq
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from pytest import TestReport
+
+# Duration (in seconds) assumed for a test that has never been run before.
+DEFAULT_DURATION = 5.0
+
+# Weight of the latest run when updating a test's average duration. Older runs fade out gradually,
+# so the schedule follows the suite as it changes without jumping around because of one slow run.
+SMOOTHING = 0.3
+
+# User property of the reports made up for tests a crashed worker never ran. They took no time, so their
+# duration must not be recorded (see conftest.py).
+NOT_RUN = "not_run"
+
+
+# Keeps the duration of every test from previous runs in a small SQLite database,
+# so the parallel runner can schedule the longest tests first.
+class DurationHistory:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS durations ("
+            "nodeid TEXT PRIMARY KEY, average REAL NOT NULL, last REAL NOT NULL, runs INTEGER NOT NULL, updated REAL NOT NULL)"
+        )
+
+    # Returns {nodeid: average duration} for the given tests that have been run before.
+    def get(self, nodeids) -> dict:
+        known = dict(self.connection.execute("SELECT nodeid, average FROM durations"))
+        return {nodeid: known[nodeid] for nodeid in nodeids if nodeid in known}
+
+    # Records the durations ({nodeid: seconds}) measured in this run.
+    def update(self, durations: dict) -> None:
+        now = time.time()
+        with self.connection:
+            for nodeid, duration in durations.items():
+                row = self.connection.execute("SELECT average, runs FROM durations WHERE nodeid = ?", (nodeid,)).fetchone()
+                if row is None:
+                    average, runs = duration, 1
+                else:
+                    average, runs = (1 - SMOOTHING) * row[0] + SMOOTHING * duration, row[1] + 1
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO durations (nodeid, average, last, runs, updated) VALUES (?, ?, ?, ?, ?)",
+                    (nodeid, average, duration, runs, now),
+                )
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+# Splits the tests over 'workers' groups using the longest-processing-time-first rule: tests are taken
+# from the longest to the shortest, and each one goes to the group with the smallest total so far.
+# Tests without history get the median known duration (or DEFAULT_DURATION if nothing is known).
+# Ties (e.g. when every known duration is 0) go to the worker with the fewest units, so the tests are still
+# spread over the workers. Each group is returned longest test first. 'units' is a list of lists of nodeids that must stay together
+# on one worker, in order; a single test is a unit of one.
+def lpt_schedule(units: list, durations: dict, workers: int) -> list:
+    fallback = statistics.median(durations.values()) if durations else DEFAULT_DURATION
+
+    def unit_duration(unit):
+        return sum(durations.get(nodeid, fallback) for nodeid in unit)
+
+    # A heap of (total duration, number of units, worker index), so the least loaded worker is always on top.
+    loads = [(0.0, 0, index) for index in range(workers)]
+    groups = [[] for _ in range(workers)]
+    for unit in sorted(units, key=unit_duration, reverse=True):
+        total, count, index = heapq.heappop(loads)
+        groups[index].extend(unit)
+        heapq.heappush(loads, (total + unit_duration(unit), count + 1, index))
+    return [group for group in groups if group]
+
+
+# Runs the session's tests in 'workers' separate pytest processes and merges their results into this
+# process's report. Each worker is a normal pytest run of the same command line, limited to its share of
+# the tests (so it has its own browser pool), that streams its test reports to a file. The reports are
+# replayed here through the normal reporting hooks, so the terminal output, the failure count and plugins
+# such as --junitxml see a single run. 'units' is passed to lpt_schedule().
+def run_parallel(session, workers: int, durations: dict, units: list) -> None:
+    config = session.config
+    items = {item.nodeid: item for item in session.items}
+    groups = lpt_schedule(units, durations, workers)
+
+    temp_dir = tempfile.mkdtemp(prefix="swag-workers-")
+    processes = []
+    for index, group in enumerate(groups):
+        tests_file = os.path.join(temp_dir, f"worker{index}.tests")
+        results_file = os.path.join(temp_dir, f"worker{index}.jsonl")
+        log_file = os.path.join(temp_dir, f"worker{index}.log")
+        with open(tests_file, "w") as file:
+            file.write("\n".join(group))
+        open(results_file, "w").close()
+
+        # The same command line as this run; the options added at the end override '--workers'.
+        # The root directory is passed explicitly so the workers' test ids match this process's test ids.
+        command = [sys.executable, "-m", "pytest", *config.invocation_params.args, f"--rootdir={config.rootpath}",
+                   "--workers=0", f"--worker-id={index}", f"--worker-tests={tests_file}", f"--worker-results={results_file}"]
+        with open(log_file, "w") as log:
+            process = subprocess.Popen(command, cwd=str(config.invocation_params.dir), stdout=log, stderr=subprocess.STDOUT)
+        processes.append({"process": process, "results": open(results_file), "log": log_file, "tests": group, "seen": set(), "buffer": ""})
+
+    print(f"\nRunning {len(items)} tests on {len(processes)} workers (logs in {temp_dir})")
+
+    # Replay the workers' reports as they come in, until every worker has exited.
+    while True:
+        running = False
+        for worker in processes:
+            exited = worker["process"].poll() is not None
+            _replay(config, items, worker)
+            running = running or not exited
+        if not running:
+            break
+        time.sleep(0.1)
+
+    # A worker that crashed may not have reported all of its tests. Report those as failures, marked as
+    # not run, so their made-up duration of 0 isn't recorded.
+    for index, worker in enumerate(processes):
+        worker["results"].close()
+        code = worker["process"].returncode
+        for nodeid in worker["tests"]:
+            if nodeid not in worker["seen"]:
+                item = items[nodeid]
+                report = TestReport(nodeid, item.location, {}, "failed",
+                                    f"Worker {index} exited (code {code}) before running this test, see {worker['log']}", "call",
+                                    user_properties=[(NOT_RUN, True)])
+                config.hook.pytest_runtest_logstart(nodeid=nodeid, location=item.location)
+                config.hook.pytest_runtest_logreport(report=report)
+                config.hook.pytest_runtest_logfinish(nodeid=nodeid, location=item.location)
+
+
+# Reads the new, complete lines of a worker's results file and feeds each report to this process's hooks.
+def _replay(config, items: dict, worker: dict) -> None:
+    worker["buffer"] += worker["results"].read()
+    *lines, worker["buffer"] = worker["buffer"].split("\n")
+    for line in lines:
+        if not line:
+            continue
+        report = config.hook.pytest_report_from_serializable(config=config, data=json.loads(line))
+        location = items[report.nodeid].location if report.nodeid in items else report.location
+
+        if report.nodeid not in worker["seen"]:
+            worker["seen"].add(report.nodeid)
+            config.hook.pytest_runtest_logstart(nodeid=report.nodeid, location=location)
+        config.hook.pytest_runtest_logreport(report=report)
+        if report.when == "teardown":
+            config.hook.pytest_runtest_logfinish(nodeid=report.nodeid, location=location)
+
+
+# Used by a worker: appends one test report to the worker's results file.
+def write_report(config, path: str, report) -> None:
+    data = config.hook.pytest_report_to_serializable(config=config, report=report)
+    with open(path, "a") as file:
+        file.write(json.dumps(data) + "\n")
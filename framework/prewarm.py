@@ -0,0 +1,100 @@
+import queue
+import threading
+from typing import Optional
+
+from framework.browser_factory import create_driver
+
+# How long close() waits for a browser that is still being launched.
+CLOSE_TIMEOUT = 30
+
+# Launches browsers in a background thread as soon as the tests are collected (from
+# pytest_collection_finish), so that launching them overlaps resolving the driver binary and setting up
+# the session fixtures, instead of only starting once all of that is done and the first test asks for a
+# browser. Launched browsers wait in a queue. The browser pool and '--fresh-browser' take a browser
+# from the queue (see take()) before launching one themselves.
+class BrowserPrewarmer:
+
+    # 'browser' and 'site_url' are passed to create_driver(). 'count' browsers are launched.
+    def __init__(self, browser: str, count: int, site_url: str = None):
+        self.browser = browser
+        self.count = count
+        self.site_url = site_url
+
+        # Launched browsers no test has taken yet. None is put in last, once no more browsers will come.
+        self.ready = queue.Queue()
+
+        # Set by close(), so no more browsers are launched once the run is over.
+        self.stopped = threading.Event()
+
+        # A daemon thread, so a browser launch that hangs can't keep the test process alive.
+        self.thread = threading.Thread(target=self._launch_all, name="browser-prewarm", daemon=True)
+
+        # Simple counters that are printed at the end of the session.
+        self.launched = 0
+        self.taken = 0
+
+    def start(self) -> None:
+        self.thread.start()
+
+    # Launches the browsers one after the other, so the first one is ready as early as possible.
+    def _launch_all(self) -> None:
+        try:
+            for _ in range(self.count):
+                if self.stopped.is_set():
+                    return
+                try:
+                    driver = create_driver(self.browser, self.site_url)
+
+                # create_driver reports a failed launch with pytest.fail(), which raises a BaseException.
+                # Launching the next browser would fail the same way, so stop. The test that needs a
+                # browser then launches one itself, and fails with the error.
+                except BaseException as e:
+                    print(f"Prewarming a {self.browser} browser failed: {e}")
+                    return
+                self.launched += 1
+                self.ready.put(driver)
+        finally:
+            self.ready.put(None)
+
+    # Returns the next prewarmed browser, or None once there are none left. A browser that is still being
+    # launched is waited for, since it will be ready sooner than a browser launched from scratch.
+    def take(self):
+        driver = self.ready.get()
+        if driver is None:
+
+            # Put the marker back, so the next call returns None straight away too.
+            self.ready.put(None)
+            return None
+        self.taken += 1
+        return driver
+
+    # Stops launching and quits the browsers no test has taken. Called once at the end of the run. A launch
+    # that hangs is given up on after CLOSE_TIMEOUT seconds; its daemon thread dies with the process.
+    def close(self) -> None:
+        self.stopped.set()
+        self.thread.join(timeout=CLOSE_TIMEOUT)
+        if self.thread.is_alive():
+            print(f"A {self.browser} browser launch did not finish within {CLOSE_TIMEOUT}s, giving up on it.")
+        while True:
+            try:
+                driver = self.ready.get_nowait()
+            except queue.Empty:
+                break
+            if driver is None:
+                self.ready.put(None)
+                break
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+# The prewarmer of this test process, when browsers are prewarmed ('--prewarm-browsers'). Set by conftest.py.
+active: Optional[BrowserPrewarmer] = None
+
+
+# Returns a prewarmed browser of the given kind, or None if there is none and the caller has to launch one.
+def take(browser: str):
+    if active is None or active.browser != browser:
+        return None
+    return active.take()
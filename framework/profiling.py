@@ -0,0 +1,126 @@
+import json
+import os
+import sys
+from dataclasses import dataclass
+
+from framework import instrumentation
+from pages.base_page import BasePage
+
+# Name used for commands sent while no test is running (e.g. while a session fixture sets up).
+NO_TEST = "(session)"
+
+
+# One profiled WebDriver command: the test it ran in, the page-object method (or other function)
+# that issued it, the WebDriver command name and how long it took in seconds.
+@dataclass
+class CommandRecord:
+    test: str
+    caller: str
+    command: str
+    duration: float
+
+
+# Finds out who issued the command being executed. Walks up the call stack and returns the outermost
+# page-object method on it (e.g. "OverviewPage.get_item_total"): a test calls a page-object method,
+# which may call other methods of the same page, and the method the test called is the interesting one.
+# Commands not issued by a page object are attributed to the first function outside Selenium and this
+# profiling code (e.g. "seeding.seed_state" or "browser_pool.reset").
+def find_caller(frame) -> str:
+    page_method = None
+    other = None
+    while frame is not None:
+        instance = frame.f_locals.get("self")
+        if isinstance(instance, BasePage):
+            page_method = f"{type(instance).__name__}.{frame.f_code.co_name}"
+        elif other is None and page_method is None:
+            module = frame.f_globals.get("__name__", "")
+            if not module.startswith(("selenium", "framework.instrumentation", "framework.profiling")):
+                other = f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return page_method or other or "(unknown)"
+
+
+# Records the latency of every WebDriver command and attributes it to the page-object method and the
+# test that issued it. Enabled with '--profile-webdriver' (see conftest.py).
+class CommandProfiler:
+
+    def __init__(self):
+        self.records: list[CommandRecord] = []
+        self.current_test = NO_TEST
+
+    def start(self) -> None:
+        instrumentation.add_listener(self.on_command)
+
+    def stop(self) -> None:
+        instrumentation.remove_listener(self.on_command)
+
+    # Listener called by instrumentation.py after every command.
+    def on_command(self, event) -> None:
+        caller = find_caller(sys._getframe(1))
+        self.records.append(CommandRecord(self.current_test, caller, event.command, event.duration))
+
+    # Returns {caller: {"count", "total", "max", "commands": {command: count}}}, slowest caller first.
+    def by_method(self) -> dict:
+        methods = {}
+        for record in self.records:
+            entry = methods.setdefault(record.caller, {"count": 0, "total": 0.0, "max": 0.0, "commands": {}})
+            entry["count"] += 1
+            entry["total"] += record.duration
+            entry["max"] = max(entry["max"], record.duration)
+            entry["commands"][record.command] = entry["commands"].get(record.command, 0) + 1
+        return dict(sorted(methods.items(), key=lambda item: item[1]["total"], reverse=True))
+
+    # Returns {test: {"count", "total", "commands": {command: count}}} in the order the tests ran.
+    def by_test(self) -> dict:
+        tests = {}
+        for record in self.records:
+            entry = tests.setdefault(record.test, {"count": 0, "total": 0.0, "commands": {}})
+            entry["count"] += 1
+            entry["total"] += record.duration
+            entry["commands"][record.command] = entry["commands"].get(record.command, 0) + 1
+        return tests
+
+    # Adds the commands of a JSON report written by write() (e.g. by a parallel worker) to this profiler.
+    def load(self, path: str) -> None:
+        with open(path) as file:
+            self.records.extend(CommandRecord(**record) for record in json.load(file)["commands"])
+
+    # Writes the JSON report to 'path', and the same data in the "folded stacks" format used by
+    # flamegraph tools (one "test;caller;command microseconds" line per stack) next to it.
+    # Returns the path of the folded stacks file.
+    def write(self, path: str) -> str:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(
+                {
+                    "methods": self.by_method(),
+                    "tests": self.by_test(),
+                    "commands": [record.__dict__ for record in self.records],
+                },
+                file,
+                indent=2,
+            )
+
+        stacks = {}
+        for record in self.records:
+            stack = ";".join((record.test, record.caller, record.command))
+            stacks[stack] = stacks.get(stack, 0) + record.duration
+        folded_path = os.path.splitext(path)[0] + ".folded"
+        with open(folded_path, "w") as file:
+            for stack, total in stacks.items():
+                file.write(f"{stack} {round(total * 1_000_000)}\n")
+        return folded_path
+
+    # Writes the summary shown at the end of the run: the slowest page-object methods
+    # and the number of WebDriver commands issued by each test.
+    def summary(self, terminalreporter, limit: int = 15) -> None:
+        terminalreporter.write_line("Slowest page-object methods (total time, commands, slowest command):")
+        for caller, entry in list(self.by_method().items())[:limit]:
+            terminalreporter.write_line(
+                f"  {entry['total']:8.3f}s  {entry['count']:5d} cmds  {entry['max'] * 1000:8.1f}ms  {caller}"
+            )
+
+        terminalreporter.write_line("WebDriver commands per test:")
+        for test, entry in self.by_test().items():
+            terminalreporter.write_line(f"  {entry['count']:5d} cmds  {entry['total']:8.3f}s  {test}")
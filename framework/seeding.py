@@ -0,0 +1,32 @@
+import json
+
+from pages.login_page import LoginPage
+from standin.catalog import CART_STORAGE_KEY, SESSION_COOKIE, product_by_id
+
+# Puts the browser straight into the state "logged in as 'username' with these products in the cart"
+# and opens 'page' (a path relative to the site, e.g. "inventory.html" or "cart.html").
+# Instead of typing the credentials into the login page and clicking "Add to cart" for every product,
+# it writes the state the site itself keeps: the logged in user in the "session-username" cookie and
+# the cart in the "cart-contents" localStorage key (a JSON list of item ids, see standin/catalog.py).
+# Tests that are about logging in or adding to the cart should keep using the UI instead.
+def seed_state(driver, username: str, product_ids=(), page: str = "inventory.html") -> None:
+
+    # Cookies and localStorage can only be written for the site that is currently open.
+    # A reset pooled browser is already on the login page, so this is usually skipped.
+    if not driver.current_url.startswith(LoginPage.URL):
+        driver.get(LoginPage.URL)
+
+    # Log the user in.
+    driver.add_cookie({"name": SESSION_COOKIE, "value": username, "path": "/"})
+
+    # Fill the cart. The site stores item ids (e.g. 4), the tests use product ids (e.g. "sauce-labs-backpack").
+    item_ids = [product_by_id(product_id)["item_id"] for product_id in product_ids]
+    if item_ids:
+        driver.execute_script(
+            "window.localStorage.setItem(arguments[0], arguments[1]);", CART_STORAGE_KEY, json.dumps(item_ids)
+        )
+    else:
+        driver.execute_script("window.localStorage.removeItem(arguments[0]);", CART_STORAGE_KEY)
+
+    # Load the requested page, which now renders with the seeded user and cart.
+    driver.get(LoginPage.URL + page)
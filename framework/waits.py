@@ -0,0 +1,124 @@
+import time
+from dataclasses import dataclass
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+
+# Default maximum time (in seconds) a wait is allowed to take before it fails,
+# and the default time (in seconds) to sleep between two checks of the condition.
+DEFAULT_TIMEOUT = 10
+DEFAULT_POLL = 0.05
+
+# Exceptions that just mean "not there yet" while polling. They are swallowed and the condition is checked again.
+IGNORED_EXCEPTIONS = (NoSuchElementException, StaleElementReferenceException)
+
+
+# One finished wait: what was waited for, how long it took (in seconds) and whether the condition was met.
+@dataclass
+class WaitRecord:
+    description: str
+    duration: float
+    succeeded: bool
+    test: str = ""
+
+
+# Every wait performed during the run is appended here while 'recording' is on, so conftest.py can report
+# how long waits took. It is only on with '--wait-report', so a long run doesn't keep every wait it did.
+# 'current_test' is set by conftest.py before each test so records can be attributed to it.
+WAIT_LOG: list[WaitRecord] = []
+recording = False
+current_test = ""
+
+
+# Adds a finished wait to WAIT_LOG, if waits are being recorded.
+def record(description: str, duration: float, succeeded: bool) -> None:
+    if recording:
+        WAIT_LOG.append(WaitRecord(description, duration, succeeded, current_test))
+
+
+# This class replaces the global 10 second implicit wait. Instead of every 'find_element' silently
+# blocking until something shows up (and every lookup that should find nothing blocking for the full
+# 10 seconds), page objects wait explicitly for a specific condition, each with its own timeout and polling
+# interval. Checks that something is absent, or that there are exactly N of something, return as soon
+# as the page has settled instead of waiting for the timeout.
+class Waiter:
+
+    # 'driver' is the WebDriver instance, 'timeout' and 'poll' are the defaults for this waiter's waits.
+    def __init__(self, driver, timeout: float = DEFAULT_TIMEOUT, poll: float = DEFAULT_POLL):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll = poll
+
+    # Calls 'condition(driver)' until it returns something truthy, then returns that value.
+    # Raises a TimeoutException mentioning 'description' if the condition is still not met after 'timeout' seconds.
+    def until(self, condition, description: str, timeout: float = None, poll: float = None):
+        timeout = self.timeout if timeout is None else timeout
+        poll = self.poll if poll is None else poll
+        start = time.perf_counter()
+        deadline = start + timeout
+
+        while True:
+            try:
+                value = condition(self.driver)
+            except IGNORED_EXCEPTIONS:
+                value = None
+
+            if value:
+                self._record(description, start, True)
+                return value
+
+            # Check the deadline after the condition, so a zero timeout still checks the condition once.
+            if time.perf_counter() >= deadline:
+                self._record(description, start, False)
+                raise TimeoutException(f"Timed out after {timeout}s waiting for {description}")
+            time.sleep(poll)
+
+    # Waits until the page has finished loading (document.readyState is "complete").
+    def dom_ready(self, timeout: float = None) -> None:
+        self.until(
+            lambda d: d.execute_script("return document.readyState") == "complete",
+            "document to be ready",
+            timeout,
+        )
+
+    # Waits until at least one element matching the locator is present and returns the first one.
+    def element(self, by: str, value: str, timeout: float = None):
+        return self.until(lambda d: d.find_elements(by, value), f"element {by}={value!r}", timeout)[0]
+
+    # Waits until an element matching the locator is present and displayed, and returns it.
+    def visible(self, by: str, value: str, timeout: float = None):
+        def condition(d):
+            elements = [element for element in d.find_elements(by, value) if element.is_displayed()]
+            return elements[0] if elements else None
+
+        return self.until(condition, f"visible element {by}={value!r}", timeout)
+
+    # Returns whatever 'find_elements' finds right now, after first waiting for the container element
+    # 'within' (a (by, value) tuple) to be present. The container tells us the page has rendered, so an
+    # empty result really means there are no matching elements. Does not wait for any items to show up.
+    def elements(self, by: str, value: str, within: tuple, timeout: float = None) -> list:
+        self.element(*within, timeout=timeout)
+        return self.driver.find_elements(by, value)
+
+    # Waits until no element matches the locator. Returns immediately if nothing matches already.
+    def assert_absent(self, by: str, value: str, timeout: float = None) -> None:
+        self.until(lambda d: not d.find_elements(by, value), f"no element {by}={value!r}", timeout)
+
+    # Waits until exactly 'count' elements match the locator and returns them.
+    # Returns as soon as the count matches, including when 'count' is 0.
+    def assert_count(self, by: str, value: str, count: int, timeout: float = None) -> list:
+        found = []
+
+        def condition(d):
+            found[:] = d.find_elements(by, value)
+            return len(found) == count
+
+        self.until(condition, f"{count} element(s) {by}={value!r}", timeout)
+        return list(found)
+
+    # Adds a finished wait to WAIT_LOG.
+    def _record(self, description: str, start: float, succeeded: bool) -> None:
+        record(description, time.perf_counter() - start, succeeded)
@@ -0,0 +1 @@
+# Initializes the 'pages.aio' package: asyncio versions of the page objects (see base_page.py).
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+from framework import waits
+from framework.cdp import CDPError, CDPSession
+from framework.extraction import ITEM_ROWS_SCRIPT, ItemRow, parse_item_rows
+
+# JavaScript that resolves once an element matching the selector (arguments[0]) is in the page, or, with
+# arguments[2] set, once no element matches anymore. It resolves false after arguments[1] milliseconds.
+# A MutationObserver is told about every change of the page, so nothing is polled.
+WAIT_FOR_SCRIPT = """
+var selector = arguments[0], timeout = arguments[1], absent = arguments[2];
+function done() { return (document.querySelector(selector) === null) === absent; }
+return new Promise(function (resolve) {
+    if (done()) { resolve(true); return; }
+    var observer = new MutationObserver(function () {
+        if (done()) { observer.disconnect(); clearTimeout(timer); resolve(true); }
+    });
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    var timer = setTimeout(function () { observer.disconnect(); resolve(done()); }, timeout);
+});
+"""
+
+# Errors that mean the page navigated away while a script was running in it. The script is then run
+# again in the new page.
+NAVIGATION_ERRORS = ("Execution context was destroyed", "Cannot find context", "Inspected target navigated")
+
+
+# This class is the parent class of every async page object. The async page objects do what the page
+# objects in 'pages' do, but over a DevTools session (see framework/cdp.py and framework/async_browser.py)
+# instead of WebDriver, and every action is a coroutine:
+#   products = await login.login("standard_user", "secret_sauce")
+#   await products.add_to_cart("sauce-labs-backpack")
+# While one session waits for the browser, the others carry on, so one process can drive many sessions.
+class AsyncBasePage:
+
+    def __init__(self, session: CDPSession):
+        self.session = session
+
+    # Waits until an element matching the CSS selector is in the page (or, with 'absent=True', until
+    # none is). Raises a TimeoutError if that does not happen within 'timeout' seconds.
+    async def wait_for(self, selector: str, timeout: float = waits.DEFAULT_TIMEOUT, absent: bool = False) -> None:
+        description = f"no element matching {selector}" if absent else f"element matching {selector}"
+        start = time.perf_counter()
+        deadline = start + timeout
+        while True:
+            remaining = max(deadline - time.perf_counter(), 0)
+            try:
+                found = await self.session.execute_script(WAIT_FOR_SCRIPT, selector, int(remaining * 1000), absent)
+            except CDPError as e:
+                if not any(error in str(e) for error in NAVIGATION_ERRORS):
+                    raise
+                found = False
+                await asyncio.sleep(0.01)
+
+            if found or time.perf_counter() >= deadline:
+                duration = time.perf_counter() - start
+                waits.record(description, duration, bool(found))
+                if not found:
+                    raise TimeoutError(f"Timed out after {timeout}s waiting for {description}")
+                return
+
+    # Runs a script on the first element matching the selector (passed to the script as 'element'),
+    # after waiting for it, and returns the script's result.
+    async def _on_element(self, selector: str, script: str, *args):
+        await self.wait_for(selector)
+        return await self.session.execute_script(
+            f"var element = document.querySelector(arguments[0]); {script}", selector, *args
+        )
+
+    async def click(self, selector: str) -> None:
+        await self._on_element(selector, "element.click();")
+
+    # Types text into an input field. The text is inserted like typed text, so the page's input
+    # handlers see it.
+    async def type(self, selector: str, text: str) -> None:
+        await self._on_element(selector, "element.focus();")
+        await self.session.send("Input.insertText", {"text": text})
+
+    # Returns the visible text of an element, like Selenium's '.text'.
+    async def text(self, selector: str) -> str:
+        return await self._on_element(selector, "return element.innerText.trim();")
+
+    # Returns the number of elements matching the selector, without waiting.
+    async def count(self, selector: str) -> int:
+        return await self.session.execute_script("return document.querySelectorAll(arguments[0]).length;", selector)
+
+    # Reads every row matching the selector with the same script the synchronous pages use (see extraction.py).
+    async def item_rows(self, row_selector: str) -> list[ItemRow]:
+        return parse_item_rows(await self.session.execute_script(ITEM_ROWS_SCRIPT, row_selector))
+
+
+# Returns a CSS selector for the element with the given id.
+def by_id(element_id: str) -> str:
+    return f'[id="{element_id}"]'
@@ -0,0 +1,23 @@
+from framework.extraction import CART_ROW_SELECTOR, ItemRow
+from pages.aio.base_page import AsyncBasePage, by_id
+from pages.aio.checkout_page import AsyncCheckoutPage
+
+
+# Async version of CartPage (see pages/cart_page.py).
+class AsyncCartPage(AsyncBasePage):
+
+    async def get_cart_rows(self) -> list[ItemRow]:
+        await self.wait_for(".cart_list")
+        return await self.item_rows(CART_ROW_SELECTOR)
+
+    async def get_cart_items(self) -> list[str]:
+        return [row.name for row in await self.get_cart_rows()]
+
+    async def get_item_prices(self) -> list[float]:
+        return [row.price for row in await self.get_cart_rows()]
+
+    # Clicks the checkout button and waits for the checkout information form.
+    async def click_checkout(self) -> AsyncCheckoutPage:
+        await self.click(by_id("checkout"))
+        await self.wait_for(by_id("first-name"))
+        return AsyncCheckoutPage(self.session)
@@ -0,0 +1,17 @@
+from pages.aio.base_page import AsyncBasePage, by_id
+from pages.aio.overview_page import AsyncOverviewPage
+
+
+# Async version of CheckoutPage (see pages/checkout_page.py).
+class AsyncCheckoutPage(AsyncBasePage):
+
+    async def enter_customer_info(self, first: str, last: str, postal: str) -> None:
+        await self.type(by_id("first-name"), first)
+        await self.type(by_id("last-name"), last)
+        await self.type(by_id("postal-code"), postal)
+
+    # Clicks the continue button and waits for the overview page (its finish button).
+    async def click_continue(self) -> AsyncOverviewPage:
+        await self.click(by_id("continue"))
+        await self.wait_for(by_id("finish"))
+        return AsyncOverviewPage(self.session)
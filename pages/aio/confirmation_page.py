@@ -0,0 +1,8 @@
+from pages.aio.base_page import AsyncBasePage
+
+
+# Async version of ConfirmationPage (see pages/confirmation_page.py).
+class AsyncConfirmationPage(AsyncBasePage):
+
+    async def get_complete_header(self) -> str:
+        return await self.text(".complete-header")
@@ -0,0 +1,37 @@
+from framework.async_browser import navigate
+from framework.cdp import CDPSession
+from pages.aio.base_page import AsyncBasePage, by_id
+from pages.aio.products_page import AsyncProductsPage
+from pages.login_page import LoginPage
+
+ERROR_SELECTOR = "h3[data-test='error']"
+
+
+# Async version of LoginPage (see pages/login_page.py).
+class AsyncLoginPage(AsyncBasePage):
+
+    # Opens the login page in a session and returns its page object. A constructor can't be awaited,
+    # so this replaces the navigation LoginPage does in its constructor.
+    @classmethod
+    async def open(cls, session: CDPSession) -> "AsyncLoginPage":
+        await navigate(session, LoginPage.URL)
+        return cls(session)
+
+    # Enters the credentials, clicks the login button and waits for the outcome: the products page, or the
+    # error message. Returns the products page object either way; use is_logged_in() to tell them apart.
+    async def login(self, username: str, password: str) -> AsyncProductsPage:
+        await self.type(by_id("user-name"), username)
+        await self.type(by_id("password"), password)
+        await self.click(by_id("login-button"))
+        await self.wait_for(f".title, {ERROR_SELECTOR}")
+        return AsyncProductsPage(self.session)
+
+    async def is_logged_in(self) -> bool:
+        await self.wait_for(f".title, {ERROR_SELECTOR}")
+        return await self.session.execute_script(
+            "var header = document.querySelector('.title'); return !!header && header.innerText.trim() === 'Products';"
+        )
+
+    async def error_message_displayed(self) -> bool:
+        await self.wait_for(f".title, {ERROR_SELECTOR}")
+        return await self.count(ERROR_SELECTOR) > 0
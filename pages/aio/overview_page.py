@@ -0,0 +1,24 @@
+from framework.extraction import CART_ROW_SELECTOR, ItemRow
+from pages.aio.base_page import AsyncBasePage, by_id
+from pages.aio.confirmation_page import AsyncConfirmationPage
+
+
+# Async version of OverviewPage (see pages/overview_page.py).
+class AsyncOverviewPage(AsyncBasePage):
+
+    # Clicks the finish button and waits for the confirmation page.
+    async def finish_checkout(self) -> AsyncConfirmationPage:
+        await self.click(by_id("finish"))
+        await self.wait_for(".complete-header")
+        return AsyncConfirmationPage(self.session)
+
+    async def get_item_rows(self) -> list[ItemRow]:
+        await self.wait_for(".cart_list")
+        return await self.item_rows(CART_ROW_SELECTOR)
+
+    async def get_item_list(self) -> list[str]:
+        return [row.name for row in await self.get_item_rows()]
+
+    # Returns the "Item total" amount (subtotal before tax), shown as "Item total: $XX.YY".
+    async def get_item_total(self) -> float:
+        return float((await self.text(".summary_subtotal_label")).split("$")[1].strip())
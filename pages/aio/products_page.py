@@ -0,0 +1,30 @@
+from framework.extraction import INVENTORY_ROW_SELECTOR, ItemRow
+from pages.aio.base_page import AsyncBasePage, by_id
+from pages.aio.cart_page import AsyncCartPage
+
+
+# Async version of ProductsPage (see pages/products_page.py).
+class AsyncProductsPage(AsyncBasePage):
+
+    # Clicks the product's "Add to cart" button and waits for it to turn into a "Remove" button.
+    async def add_to_cart(self, product_id: str) -> None:
+        await self.click(by_id(f"add-to-cart-{product_id}"))
+        await self.wait_for(by_id(f"remove-{product_id}"))
+
+    # Clicks the product's "Remove" button and waits for it to go away.
+    async def remove_from_cart(self, product_id: str) -> None:
+        await self.click(by_id(f"remove-{product_id}"))
+        await self.wait_for(by_id(f"remove-{product_id}"), absent=True)
+
+    async def get_products(self) -> list[ItemRow]:
+        await self.wait_for(".inventory_list")
+        return await self.item_rows(INVENTORY_ROW_SELECTOR)
+
+    # Clicks the shopping cart icon and waits for the cart page (its checkout button) to show up.
+    async def go_to_cart(self) -> AsyncCartPage:
+        await self.click(".shopping_cart_link")
+        await self.wait_for(by_id("checkout"))
+        return AsyncCartPage(self.session)
+
+    async def get_cart_badge_count(self) -> int:
+        return int(await self.text(".shopping_cart_badge"))
@@ -0,0 +1,19 @@
+# See comment in login_page.py if you need an explanation.
+from framework import page_timing
+from framework.waits import Waiter
+from pages.locators import ElementCache
+
+# This class is the parent class of every page object. It holds what all pages share:
+# the WebDriver instance and a Waiter, which the pages use to wait explicitly for elements
+# instead of relying on a global implicit wait, and the cache of the elements it has found (see
+# locators.py). With '--page-timing', creating a page object also
+# measures how fast the app got to that page and checks the class's BUDGET (see page_timing.py).
+class BasePage:
+
+    # See comment in login_page.py if you need an explanation.
+    def __init__(self, driver):
+        self.driver = driver
+        self.wait = Waiter(driver)
+        self.element_cache = ElementCache(self)
+        if page_timing.monitor is not None:
+            page_timing.monitor.on_page(self)
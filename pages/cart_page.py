@@ -1,44 +1,41 @@
 # See comment in login_page.py if you need an explanation.
-from selenium.webdriver.common.by import By
+from pages.locators import By, Locator
+from framework.extraction import CART_ROW_SELECTOR, ItemRow, extract_item_rows
+from pages.base_page import BasePage
 from pages.checkout_page import CheckoutPage
 
 # This class represents the Cart page of the application, following the Page Object Model.
 # It will contain locators and methods specific to interacting with the Cart page.
-class CartPage:
+class CartPage(BasePage):
 
-    # See comment in login_page.py if you need an explanation.
-    def __init__(self, driver):
-        self.driver = driver
+    # Locators of the page (see locators.py).
+    cart_list = Locator(By.CLASS_NAME, "cart_list")
+    checkout_button = Locator(By.ID, "checkout")
+
+    # Retrieves every item in the cart as an ItemRow (id, name, description, price, quantity...).
+    def get_cart_rows(self) -> list[ItemRow]:
+
+        # Wait for the cart list to be rendered. Then read all rows with a single script call
+        # (see extraction.py) instead of one WebDriver call per element. An empty cart returns
+        # an empty list right away.
+        self.cart_list.element
+        return extract_item_rows(self.driver, CART_ROW_SELECTOR)
 
     # Retrieves a list of all item names displayed on the cart page.
     def get_cart_items(self) -> list[str]:
 
-        # Find all web elements that represent item names on the page.
-        # These are identified by the class name "inventory_item_name".
-        # 'find_elements' (plural) returns a list of WebElement objects.
-        items = self.driver.find_elements(By.CLASS_NAME, "inventory_item_name")
-
-        # Use a list comprehension to iterate through the items.
-        # For each item, extract its visible text content.
+        # Use a list comprehension to iterate through the rows.
         # This creates a new list containing only the item names.
-        return [item.text for item in items]
+        return [row.name for row in self.get_cart_rows()]
 
     # Retrieves a list of prices for all items currently displayed in the cart.
-    # removes the "$" currency symbol, and converts the remaining string to a float.
+    # The "$" currency symbol has already been removed and the price converted to a float (see extraction.py).
     def get_item_prices(self) -> list[float]:
-
-        # Find all web elements on the page that display the prices of items in the cart.
-        # These are identified by the class name "inventory_item_price".
-        prices = self.driver.find_elements(By.CLASS_NAME, "inventory_item_price")
-
-        # Use a list comprehension to iterate through the prices and for each element:
-        # Get the text of the price element, remove the dollar sign character from the text
-        # Convert the string into a float. The result is a new list containing these prices.t
-        return [float(price.text.replace("$", "")) for price in prices]
+        return [row.price for row in self.get_cart_rows()]
 
     # Clicks the checkout button.
     def click_checkout(self) -> CheckoutPage:
 
         # Self explanatory based on prior comments.
-        self.driver.find_element(By.ID, "checkout").click()
+        self.checkout_button.click()
         return CheckoutPage(self.driver)
\ No newline at end of file
@@ -1,23 +1,26 @@
 # See comment in login_page.py if you need an explanation.
-from selenium.webdriver.common.by import By
+from pages.locators import By, Locator
+from pages.base_page import BasePage
 from pages.overview_page import OverviewPage
 
 # This class represents the Checkout page of the application, following the Page Object Model.
 # It will contain locators and methods specific to interacting with the Checkout page.
-class CheckoutPage:
+class CheckoutPage(BasePage):
 
-    # See comment in login_page.py if you need an explanation.
-    def __init__(self, driver):
-        self.driver = driver
+    # Locators of the page (see locators.py).
+    first_name = Locator(By.ID, "first-name")
+    last_name = Locator(By.ID, "last-name")
+    postal_code = Locator(By.ID, "postal-code")
+    continue_button = Locator(By.ID, "continue")
 
     # Enters the customer's information (first name, last name, and postal code, which also are the arguments)
     # into the respective input fields on the checkout information page.
     def enter_customer_info(self, first: str, last: str, postal: str) -> None:
-        self.driver.find_element(By.ID, "first-name").send_keys(first)
-        self.driver.find_element(By.ID, "last-name").send_keys(last)
-        self.driver.find_element(By.ID, "postal-code").send_keys(postal)
+        self.first_name.send_keys(first)
+        self.last_name.send_keys(last)
+        self.postal_code.send_keys(postal)
 
     # Clicks the continue button and initializes and returns an instance of the overview page.
     def click_continue(self) -> OverviewPage:
-        self.driver.find_element(By.ID, "continue").click()
+        self.continue_button.click()
         return OverviewPage(self.driver)
\ No newline at end of file
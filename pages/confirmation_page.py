@@ -1,15 +1,15 @@
 # See comment in login_page.py if you need an explanation.
-from selenium.webdriver.common.by import By
+from pages.locators import By, Locator
+from pages.base_page import BasePage
 
 # This class represents the Confirmation page of the application, following the Page Object Model.
 # It will contain locators and methods specific to interacting with the Confirmation page.
-class ConfirmationPage:
+class ConfirmationPage(BasePage):
 
-    # See comment in login_page.py if you need an explanation.
-    def __init__(self, driver):
-        self.driver = driver
+    # Locators of the page (see locators.py).
+    complete_header = Locator(By.CLASS_NAME, "complete-header")
 
     # Retrieves the confirmation header text displayed on the confirmation page.
     # It locates the element using the class name "complete-header" and returns the string.
     def get_complete_header(self) -> str:
-        return self.driver.find_element(By.CLASS_NAME, "complete-header").text
\ No newline at end of file
+        return self.complete_header.text
\ No newline at end of file
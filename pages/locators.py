@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+# The locator strategies of Selenium's 'By' class, as the plain strings WebDriver expects. The page
+# objects import 'By' from here instead of from selenium.webdriver.common.by, because importing that
+# module loads all of selenium.webdriver (the driver classes of every browser, ~0.2s). This way,
+# collecting the tests ('pytest --collect-only') doesn't import Selenium's drivers at all.
+class By:
+    ID = "id"
+    XPATH = "xpath"
+    LINK_TEXT = "link text"
+    PARTIAL_LINK_TEXT = "partial link text"
+    NAME = "name"
+    TAG_NAME = "tag name"
+    CLASS_NAME = "class name"
+    CSS_SELECTOR = "css selector"
+
+
+# Hits and misses of the element caches. 'stale' counts cached elements that had gone stale when used
+# (they are found again, see ElementCache.run()).
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+
+
+# Counters of all the element caches of this process, shown with '--wait-report' (see conftest.py).
+CACHE_STATS = CacheStats()
+
+
+# The elements a page object has found, so using the same element again costs no 'findElement' round
+# trip. Every page object has one (see base_page.py). The cache is emptied when the driver navigates
+# (instrument() in instrumentation.py counts the navigations), and an element that has gone stale anyway
+# (e.g. the page re-rendered it after a click) is found again and the action retried, so callers never
+# see a StaleElementReferenceException from the cache.
+class ElementCache:
+
+    def __init__(self, page):
+        self.page = page
+        self.elements = {}
+
+        # The driver's navigation count when the cached elements were found.
+        self.navigations = getattr(page.driver, "_navigations", 0)
+        self.stats = CacheStats()
+
+    # Returns the element for the locator, waiting for it to be present (see waits.py) if it is not cached.
+    def get(self, by: str, value: str):
+        navigations = getattr(self.page.driver, "_navigations", 0)
+        if navigations != self.navigations:
+            self.elements.clear()
+            self.navigations = navigations
+
+        element = self.elements.get((by, value))
+        if element is not None:
+            self._count("hits")
+            return element
+        self._count("misses")
+        element = self.elements[(by, value)] = self.page.wait.element(by, value)
+        return element
+
+    # Calls 'action(element)' and returns its result. If the cached element has gone stale, it is found
+    # again and the action is retried once.
+    def run(self, by: str, value: str, action):
+        try:
+            return action(self.get(by, value))
+        except StaleElementReferenceException:
+            self.elements.pop((by, value), None)
+            self._count("stale")
+            return action(self.get(by, value))
+
+    def _count(self, counter: str) -> None:
+        setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+        setattr(CACHE_STATS, counter, getattr(CACHE_STATS, counter) + 1)
+
+
+# Declares a locator once, as a class attribute of a page object:
+#   class ProductsPage(BasePage):
+#       cart_link = Locator(By.CLASS_NAME, "shopping_cart_link")
+# 'self.cart_link' is then a CachedElement, e.g. 'self.cart_link.click()'. A value with "{}" in it is a
+# template, filled in by calling the attribute: 'self.add_button(product_id).click()'.
+class Locator:
+
+    def __init__(self, by: str, value: str):
+        self.by = by
+        self.value = value
+
+    def __get__(self, page, owner=None):
+        if page is None:
+            return self
+        return CachedElement(page.element_cache, self.by, self.value)
+
+
+# An element of a page object, found through the page's ElementCache when it is used. Only the element
+# methods the page objects need are here. 'element' returns the WebElement itself.
+class CachedElement:
+
+    def __init__(self, cache: ElementCache, by: str, value: str):
+        self.cache = cache
+        self.by = by
+        self.value = value
+
+    # Fills in a locator template, see Locator.
+    def __call__(self, *args) -> "CachedElement":
+        return CachedElement(self.cache, self.by, self.value.format(*args))
+
+    # The (by, value) pair, for the waits that take a locator, e.g. 'self.wait.assert_absent(*button.locator)'.
+    @property
+    def locator(self) -> tuple:
+        return self.by, self.value
+
+    @property
+    def element(self):
+        return self.cache.get(self.by, self.value)
+
+    @property
+    def text(self) -> str:
+        return self.cache.run(self.by, self.value, lambda element: element.text)
+
+    def click(self) -> None:
+        self.cache.run(self.by, self.value, lambda element: element.click())
+
+    def send_keys(self, *value) -> None:
+        self.cache.run(self.by, self.value, lambda element: element.send_keys(*value))
+
+    def clear(self) -> None:
+        self.cache.run(self.by, self.value, lambda element: element.clear())
+
+    def get_attribute(self, name: str):
+        return self.cache.run(self.by, self.value, lambda element: element.get_attribute(name))
+
+    def is_displayed(self) -> bool:
+        return self.cache.run(self.by, self.value, lambda element: element.is_displayed())
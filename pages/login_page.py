@@ -1,44 +1,64 @@
-# Import the 'By' class from Selenium's common utilities.
+# Import the 'By' class, which has the same constants as Selenium's (see locators.py).
 # The 'By' class is used to specify the strategy for locating elements on a web page
 # (e.g. by ID, by NAME, by XPATH, by CSS_SELECTOR).
-from selenium.webdriver.common.by import By
+from pages.locators import By, Locator
+from pages.base_page import BasePage
 
 # This class represents the login page of the application, following the Page Object Model.
 # It will contain locators and methods specific to interacting with the login page.
-class LoginPage:
+class LoginPage(BasePage):
     URL = "https://www.saucedemo.com/"
 
+    # Locators of the login form (see locators.py). The elements are cached by the page object, so each
+    # is only looked up once (see ElementCache). The login result is checked without the cache, because
+    # those elements may not be there (see _wait_for_login_result()).
+    username_field = Locator(By.ID, "user-name")
+    password_field = Locator(By.ID, "password")
+    login_button = Locator(By.ID, "login-button")
+
     # Constructor for the class.
     # This method is automatically called when a new LoginPage object is created.
     # The driver that is passed to it is the Selenium WebDriver instance that 
     # will be used to interact with the browser and the elements on the login page.
     def __init__(self, driver):
 
-        # Store the provided WebDriver instance as an instance variable 'self.driver'.
-        # This makes the driver accessible to all other methods within this LoginPage object.
-        self.driver = driver
+        # Navigate the browser to the login page's URL. This is done first, so that the page
+        # timing taken by BasePage (with '--page-timing') is the login page's.
+        driver.get(self.URL)
 
-        # Navigate the browser to the login page's URL.
-        self.driver.get(self.URL)
+        # Store the provided WebDriver instance as an instance variable 'self.driver' (see base_page.py).
+        # This makes the driver accessible to all other methods within this LoginPage object.
+        super().__init__(driver)
 
     # Enters credentials and clicks the login button.
     # Args are the username to be entered into the username field, and the password to be entered 
     # into the password field.
     def login(self, username: str, password: str) -> None:
-        self.driver.find_element(By.ID, "user-name").send_keys(username)
-        self.driver.find_element(By.ID, "password").send_keys(password)
-        self.driver.find_element(By.ID, "login-button").click()
+        self.username_field.send_keys(username)
+        self.password_field.send_keys(password)
+        self.login_button.click()
+
+    # Waits until the login attempt has a visible outcome: either the "Products" page header
+    # or the error message is present. Checking for an element that is not there is then
+    # instant, instead of waiting for it to (never) appear.
+    def _wait_for_login_result(self) -> None:
+        self.wait.until(
+            lambda d: d.find_elements(By.CLASS_NAME, "title") or d.find_elements(By.CSS_SELECTOR, "h3[data-test='error']"),
+            "login result (products header or error message)",
+        )
 
     # Checks if the user is successfully logged in by verifying the presence and
     # text of the "Products" page header after a login attempt.
     # Returns True if the header is displayed and its text is "Products", False otherwise.
     def is_logged_in(self) -> bool:
-        header = self.driver.find_element(By.CLASS_NAME, "title")
-        return header.is_displayed() and header.text == "Products"
+        self._wait_for_login_result()
+        headers = self.driver.find_elements(By.CLASS_NAME, "title")
+        return bool(headers) and headers[0].is_displayed() and headers[0].text == "Products"
 
     # Checks if an error message is displayed on the page, typically after a failed
     # login attempt. It locates the error message element using a CSS selector "h3[data-test='error']".
     # Returns True if the error message element is found and visible, False otherwise.
     def error_message_displayed(self) -> bool:
-        error = self.driver.find_element(By.CSS_SELECTOR, "h3[data-test='error']")
-        return error.is_displayed()
\ No newline at end of file
+        self._wait_for_login_result()
+        errors = self.driver.find_elements(By.CSS_SELECTOR, "h3[data-test='error']")
+        return bool(errors) and errors[0].is_displayed()
\ No newline at end of file
@@ -1,40 +1,41 @@
 # See comment in login_page.py if you need an explanation.
-from selenium.webdriver.common.by import By
+from pages.locators import By, Locator
+from framework.extraction import CART_ROW_SELECTOR, ItemRow, extract_item_rows
+from pages.base_page import BasePage
 from pages.confirmation_page import ConfirmationPage
 
 # This class represents the Overview page (this is a page to review your order before submitting) of the application,
 # following the Page Object Model. It will contain locators and methods specific to interacting with the Overview page.
-class OverviewPage:
+class OverviewPage(BasePage):
 
-    # See comment in login_page.py if you need an explanation.
-    def __init__(self, driver):
-        self.driver = driver
+    # Locators of the page (see locators.py).
+    finish_button = Locator(By.ID, "finish")
+    cart_list = Locator(By.CLASS_NAME, "cart_list")
+    item_total = Locator(By.CLASS_NAME, "summary_subtotal_label")
 
     # Clicks the finish button, and initializes and returns the confirmation page object.
     def finish_checkout(self) -> ConfirmationPage:
-        self.driver.find_element(By.ID, "finish").click()
+        self.finish_button.click()
         return ConfirmationPage(self.driver)
 
-    # Retrieves a list of all item names displayed on the checkout overview page.
-    def get_item_list(self) -> list[str]:
+    # Retrieves every item on the checkout overview page as an ItemRow. The overview page uses
+    # the same item markup as the cart page, so it is read the same way (see cart_page.py).
+    def get_item_rows(self) -> list[ItemRow]:
 
-        # Find all web elements that represent item names on the page.
-        # These are identified by the class name "inventory_item_name".
-        # 'find_elements' (plural) returns a list of WebElement objects.
-        items = self.driver.find_elements(By.CLASS_NAME, "inventory_item_name")
+        # Wait for the item list to be rendered.
+        self.cart_list.element
+        return extract_item_rows(self.driver, CART_ROW_SELECTOR)
 
-        # Use a list comprehension to iterate through the items.
-        # For each item, extract its visible text content.
-        # This creates a new list containing only the item names.
-        return [item.text for item in items]
+    # Retrieves a list of all item names displayed on the checkout overview page.
+    def get_item_list(self) -> list[str]:
+        return [row.name for row in self.get_item_rows()]
     
     # Retrieves the "Item total" amount (subtotal before tax).
     def get_item_total(self) -> float:
 
-        # Find the element displaying the item total using its class name.
+        # Get the text of the element displaying the item total.
         # The text is expected to be in the format "Item total: $XX.YY"
-        item_total_element = self.driver.find_element(By.CLASS_NAME, "summary_subtotal_label")
-        item_total_text = item_total_element.text
+        item_total_text = self.item_total.text
 
         # Extract the numerical value by splitting the string at "$" and taking the second part.
         # Strip any leading/trailing whitespace just in case.
@@ -1,38 +1,56 @@
 # See comment in login_page.py if you need an explanation.
-from selenium.webdriver.common.by import By
+from pages.locators import By, Locator
+from framework.extraction import INVENTORY_ROW_SELECTOR, ItemRow, extract_item_rows
+from framework.page_timing import PerformanceBudget
+from pages.base_page import BasePage
 from pages.cart_page import CartPage
 
 # This class represents the Products page of the application, following the Page Object Model.
 # It will contain locators and methods specific to interacting with the Products page.
-class ProductsPage:
+class ProductsPage(BasePage):
 
-    # See comment in login_page.py if you need an explanation.
-    def __init__(self, driver):
-        self.driver = driver
+    # Performance budget of this page, checked with '--page-timing' (see page_timing.py): the largest
+    # contentful paint must come within 1.5 seconds and the JavaScript heap must stay under 30 MB.
+    BUDGET = PerformanceBudget(lcp=1.5, js_heap_mb=30)
+
+    # Locators of the page (see locators.py). The buttons of a product are templates, filled in with its id.
+    add_button = Locator(By.ID, "add-to-cart-{}")
+    remove_button = Locator(By.ID, "remove-{}")
+    inventory_list = Locator(By.CLASS_NAME, "inventory_list")
+    cart_link = Locator(By.CLASS_NAME, "shopping_cart_link")
+    cart_badge = Locator(By.CLASS_NAME, "shopping_cart_badge")
 
     # Adds a specific product (based on the product_id provided) to the shopping cart by clicking its "Add to cart" button.
     def add_to_cart(self, product_id: str) -> None:
-        button_id = f"add-to-cart-{product_id}"
-        self.driver.find_element(By.ID, button_id).click()
+        self.add_button(product_id).click()
 
     # Removes a specific product (based on the product_id provided) from the shopping cart by clicking its "Remove" button.
     # There is actually a Remove button in both the products page and the cart page. 
+    # After the click, wait for the Remove button to go away so the cart has been updated when this returns.
     def remove_from_cart(self, product_id: str) -> None:
-        button_id = f"remove-{product_id}"
-        self.driver.find_element(By.ID, button_id).click()
+        button = self.remove_button(product_id)
+        button.click()
+        self.wait.assert_absent(*button.locator)
+
+    # Retrieves every product listed on the products page as an ItemRow, in a single script call
+    # (see extraction.py). 'in_cart' tells whether the product currently shows a "Remove" button.
+    def get_products(self) -> list[ItemRow]:
+
+        # Wait for the inventory list to be rendered (see cart_page.py).
+        self.inventory_list.element
+        return extract_item_rows(self.driver, INVENTORY_ROW_SELECTOR)
 
     # Navigates to the shopping cart page by clicking the shopping cart icon, 
     # and initialize and return an instance of the CartPage.
     def go_to_cart(self) -> CartPage:
-        self.driver.find_element(By.CLASS_NAME, "shopping_cart_link").click()
+        self.cart_link.click()
         return CartPage(self.driver)
 
     # Retrieves the current count displayed on the shopping cart badge (the number of items in the cart).
     def get_cart_badge_count(self) -> int:
 
-        # Find the shopping cart badge element by its class name.
-        # Then, get the text content of this element.
-        badge = self.driver.find_element(By.CLASS_NAME, "shopping_cart_badge").text
+        # Get the text content of the shopping cart badge element.
+        badge = self.cart_badge.text
 
         # Return the text as an int.
         return int(badge)
\ No newline at end of file
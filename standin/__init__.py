@@ -0,0 +1 @@
+# Initializes the 'standin' package.
\ No newline at end of file
@@ -0,0 +1,11 @@
+import argparse
+
+from standin.server import serve
+
+# Allows the stand-in site to be started on its own, e.g. to look at it in a browser:
+#   python -m standin --port 8000
+parser = argparse.ArgumentParser(description="Serve the local Swag Labs stand-in site")
+parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+parser.add_argument("--port", type=int, default=8000, help="Port to listen on (0 picks a free port)")
+args = parser.parse_args()
+serve(args.host, args.port)
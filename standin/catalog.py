@@ -0,0 +1,81 @@
+# The products sold by the stand-in Swag Labs site. Item ids, product ids (used in the
+# "add-to-cart-<product id>" / "remove-<product id>" button ids), names and prices are the
+# same as on https://www.saucedemo.com so the page objects and tests work against both.
+PRODUCTS = [
+    {
+        "item_id": 4,
+        "product_id": "sauce-labs-backpack",
+        "name": "Sauce Labs Backpack",
+        "description": "carry.allTheThings() with the sleek, streamlined Sly Pack that melds uncompromising style with unequaled laptop and tablet protection.",
+        "price": 29.99,
+    },
+    {
+        "item_id": 0,
+        "product_id": "sauce-labs-bike-light",
+        "name": "Sauce Labs Bike Light",
+        "description": "A red light isn't the desired state in testing but it sure helps when riding your bike at night. Water-resistant with 3 lighting modes, 1 AAA battery included.",
+        "price": 9.99,
+    },
+    {
+        "item_id": 1,
+        "product_id": "sauce-labs-bolt-t-shirt",
+        "name": "Sauce Labs Bolt T-Shirt",
+        "description": "Get your testing superhero on with the Sauce Labs bolt T-shirt. From American Apparel, 100% ringspun combed cotton, heather gray with red bolt.",
+        "price": 15.99,
+    },
+    {
+        "item_id": 5,
+        "product_id": "sauce-labs-fleece-jacket",
+        "name": "Sauce Labs Fleece Jacket",
+        "description": "It's not every day that you come across a midweight quarter-zip fleece jacket capable of handling everything from a relaxing day outdoors to a busy day at the office.",
+        "price": 49.99,
+    },
+    {
+        "item_id": 2,
+        "product_id": "sauce-labs-onesie",
+        "name": "Sauce Labs Onesie",
+        "description": "Rib snap infant onesie for the junior automation engineer in development. Reinforced 3-snap bottom closure, two-needle hemmed sleeved and bottom won't unravel.",
+        "price": 7.99,
+    },
+    {
+        "item_id": 3,
+        "product_id": "test.allthethings()-t-shirt-(red)",
+        "name": "Test.allTheThings() T-Shirt (Red)",
+        "description": "This classic Sauce Labs t-shirt is perfect to wear when cozying up to your keyboard to automate a few tests. Super-soft and comfy ringspun combed cotton.",
+        "price": 15.99,
+    },
+]
+
+# Every user accepted by the login page. They all use the same password.
+USERNAMES = [
+    "standard_user",
+    "locked_out_user",
+    "problem_user",
+    "performance_glitch_user",
+    "error_user",
+    "visual_user",
+]
+PASSWORD = "secret_sauce"
+
+# Item ids of the products that problem_user and error_user cannot add to (or remove from) the cart.
+BROKEN_ITEM_IDS = [1, 5, 3]
+
+# How long (in milliseconds) the login takes for performance_glitch_user.
+GLITCH_DELAY_MS = 5000
+
+# Sales tax rate applied on the checkout overview page.
+TAX_RATE = 0.08
+
+# Name of the cookie holding the logged in user, and of the localStorage key holding the cart
+# (a JSON list of item ids). These are the names the real site uses.
+SESSION_COOKIE = "session-username"
+CART_STORAGE_KEY = "cart-contents"
+
+
+# Returns the product with the given product id (e.g. "sauce-labs-backpack").
+# Raises a KeyError if there is no such product.
+def product_by_id(product_id: str) -> dict:
+    for product in PRODUCTS:
+        if product["product_id"] == product_id:
+            return product
+    raise KeyError(f"Unknown product id '{product_id}'")
@@ -0,0 +1,328 @@
+import json
+from html import escape
+
+from framework.fake_driver import FakeSite, find
+from standin.catalog import (
+    BROKEN_ITEM_IDS,
+    CART_STORAGE_KEY,
+    GLITCH_DELAY_MS,
+    PASSWORD,
+    PRODUCTS,
+    SESSION_COOKIE,
+    TAX_RATE,
+    USERNAMES,
+)
+
+# The stand-in Swag Labs site for the fake driver (see framework/fake_driver.py): a Python version of
+# static/app.js. It renders the same markup (ids, classes and data-test attributes) from the same state,
+# the "session-username" cookie and the "cart-contents" localStorage key, and handles the same clicks,
+# including the special users. Keep the two in sync when one of them changes.
+
+
+def _product_by_item_id(item_id: int):
+    return next((product for product in PRODUCTS if product["item_id"] == item_id), None)
+
+
+def _product_by_product_id(product_id: str):
+    return next((product for product in PRODUCTS if product["product_id"] == product_id), None)
+
+
+def _price(value: float) -> str:
+    return f"${value:.2f}"
+
+
+class SwagLabsSite(FakeSite):
+
+    def __init__(self):
+
+        # Error message to show on the next render of the login or checkout page, like the message the
+        # stand-in keeps in sessionStorage when it redirects to the login page.
+        self.page_error = None
+
+    # --------------------------------------------------------------- state
+
+    @staticmethod
+    def user(driver):
+        cookie = driver.cookies.get(SESSION_COOKIE)
+        return cookie["value"] if cookie else None
+
+    @staticmethod
+    def cart(driver) -> list:
+        try:
+            return json.loads(driver.local_storage.get(CART_STORAGE_KEY) or "[]")
+        except ValueError:
+            return []
+
+    @staticmethod
+    def set_cart(driver, item_ids: list) -> None:
+        if item_ids:
+            driver.local_storage[CART_STORAGE_KEY] = json.dumps(item_ids)
+        else:
+            driver.local_storage.pop(CART_STORAGE_KEY, None)
+
+    def is_broken_for(self, user: str, product: dict) -> bool:
+        return user in ("problem_user", "error_user") and product["item_id"] in BROKEN_ITEM_IDS
+
+    # --------------------------------------------------------------- rendering
+
+    def render(self, driver, path: str):
+        page = path.rsplit("/", 1)[-1] or "index.html"
+        pages = {
+            "inventory.html": self.inventory,
+            "cart.html": self.cart_page,
+            "checkout-step-one.html": self.checkout_step_one,
+            "checkout-step-two.html": self.checkout_step_two,
+            "checkout-complete.html": self.checkout_complete,
+        }
+        error, self.page_error = self.page_error, None
+        if page not in pages:
+            return self._document(self.login(error))
+
+        # Like the real site, pages other than the login page need a logged in user.
+        if not self.user(driver):
+            self.page_error = f"Epic sadface: You can only access '/{page}' when you are logged in."
+            driver.open("./")
+            return None
+        return self._document(pages[page](driver, error))
+
+    @staticmethod
+    def _document(body: str) -> str:
+        return f'<html><head><title>Swag Labs</title></head><body><div id="root">{body}</div></body></html>'
+
+    def header(self, driver, title: str) -> str:
+        count = len(self.cart(driver))
+        badge = f'<span class="shopping_cart_badge" data-test="shopping-cart-badge">{count}</span>' if count else ""
+        cart_class = "shopping_cart_container"
+        if self.user(driver) == "visual_user":
+            cart_class += " visual_failure"
+        return (
+            '<div class="primary_header" data-test="primary-header"><div class="app_logo">Swag Labs</div>'
+            f'<div id="shopping_cart_container" class="{cart_class}">'
+            f'<a class="shopping_cart_link" data-test="shopping-cart-link">{badge}</a></div></div>'
+            '<div class="header_secondary_container" data-test="secondary-header">'
+            f'<span class="title" data-test="title">{escape(title)}</span></div>'
+        )
+
+    @staticmethod
+    def cart_item(product: dict, with_button: bool) -> str:
+        button = ""
+        if with_button:
+            button_id = f"remove-{product['product_id']}"
+            button = (
+                f'<button class="btn btn_secondary btn_small cart_button" data-test="{button_id}" '
+                f'id="{button_id}" name="{button_id}">Remove</button>'
+            )
+        return (
+            '<div class="cart_item" data-test="inventory-item">'
+            '<div class="cart_quantity" data-test="item-quantity">1</div><div class="cart_item_label">'
+            f'<a href="#" id="item_{product["item_id"]}_title_link" data-test="item-{product["item_id"]}-title-link">'
+            f'<div class="inventory_item_name" data-test="inventory-item-name">{escape(product["name"])}</div></a>'
+            f'<div class="inventory_item_desc" data-test="inventory-item-desc">{escape(product["description"])}</div>'
+            '<div class="item_pricebar"><div class="inventory_item_price" data-test="inventory-item-price">'
+            f'{_price(product["price"])}</div>{button}</div></div></div>'
+        )
+
+    def cart_list(self, driver, with_buttons: bool) -> str:
+        items = "".join(
+            self.cart_item(product, with_buttons)
+            for product in map(_product_by_item_id, self.cart(driver))
+            if product
+        )
+        return (
+            '<div class="cart_list" data-test="cart-list">'
+            '<div class="cart_quantity_label" data-test="cart-quantity-label">QTY</div>'
+            f'<div class="cart_desc_label" data-test="cart-desc-label">Description</div>{items}</div>'
+        )
+
+    @staticmethod
+    def error_box(message) -> str:
+        if not message:
+            return '<div class="error-message-container"></div>'
+        return (
+            f'<div class="error-message-container error"><h3 data-test="error">{escape(message)}'
+            '<button class="error-button" data-test="error-button">x</button></h3></div>'
+        )
+
+    def login(self, error) -> str:
+        return (
+            '<div class="login_logo">Swag Labs</div><div class="login_wrapper"><form id="login-form">'
+            '<input class="input_error form_input" placeholder="Username" type="text" data-test="username" id="user-name" name="user-name">'
+            '<input class="input_error form_input" placeholder="Password" type="password" data-test="password" id="password" name="password">'
+            f"{self.error_box(error)}"
+            '<input type="submit" class="submit-button btn_action" data-test="login-button" id="login-button" name="login-button" value="Login">'
+            "</form></div>"
+        )
+
+    def inventory(self, driver, error) -> str:
+        user = self.user(driver)
+        cart = self.cart(driver)
+        items = ""
+        for product in PRODUCTS:
+            in_cart = product["item_id"] in cart
+            button_id = ("remove-" if in_cart else "add-to-cart-") + product["product_id"]
+            image = "static/img/dog.svg" if user == "problem_user" else "static/img/item.svg"
+            items += (
+                '<div class="inventory_item" data-test="inventory-item"><div class="inventory_item_img">'
+                f'<a href="#" id="item_{product["item_id"]}_img_link" data-test="item-{product["item_id"]}-img-link">'
+                f'<img alt="{escape(product["name"])}" class="inventory_item_img" src="{image}"></a></div>'
+                '<div class="inventory_item_description" data-test="inventory-item-description"><div class="inventory_item_label">'
+                f'<a href="#" id="item_{product["item_id"]}_title_link" data-test="item-{product["item_id"]}-title-link">'
+                f'<div class="inventory_item_name" data-test="inventory-item-name">{escape(product["name"])}</div></a>'
+                f'<div class="inventory_item_desc" data-test="inventory-item-desc">{escape(product["description"])}</div></div>'
+                '<div class="pricebar"><div class="inventory_item_price" data-test="inventory-item-price">'
+                f'{_price(product["price"])}</div>'
+                f'<button class="btn {"btn_secondary" if in_cart else "btn_primary"} btn_small btn_inventory" '
+                f'data-test="{escape(button_id)}" id="{escape(button_id)}" name="{escape(button_id)}">'
+                f'{"Remove" if in_cart else "Add to cart"}</button></div></div></div>'
+            )
+        return f'{self.header(driver, "Products")}<div class="inventory_list" data-test="inventory-list">{items}</div>'
+
+    def cart_page(self, driver, error) -> str:
+        return (
+            f'{self.header(driver, "Your Cart")}{self.cart_list(driver, True)}<div class="cart_footer">'
+            '<button class="btn btn_secondary back btn_medium" data-test="continue-shopping" id="continue-shopping" name="continue-shopping">Continue Shopping</button>'
+            '<button class="btn btn_action btn_medium checkout_button" data-test="checkout" id="checkout" name="checkout">Checkout</button>'
+            "</div>"
+        )
+
+    def checkout_step_one(self, driver, error) -> str:
+        return (
+            f'{self.header(driver, "Checkout: Your Information")}'
+            '<div class="checkout_info_container"><form id="checkout-form"><div class="checkout_info">'
+            '<input class="input_error form_input" placeholder="First Name" type="text" data-test="firstName" id="first-name" name="firstName">'
+            '<input class="input_error form_input" placeholder="Last Name" type="text" data-test="lastName" id="last-name" name="lastName">'
+            '<input class="input_error form_input" placeholder="Zip/Postal Code" type="text" data-test="postalCode" id="postal-code" name="postalCode">'
+            f'{self.error_box(error)}</div><div class="checkout_buttons">'
+            '<button class="btn btn_secondary back btn_medium cart_cancel_link" data-test="cancel" id="cancel" name="cancel" type="button">Cancel</button>'
+            '<input type="submit" class="submit-button btn btn_primary cart_button btn_action" data-test="continue" id="continue" name="continue" value="Continue">'
+            "</div></form></div>"
+        )
+
+    def checkout_step_two(self, driver, error) -> str:
+        subtotal = sum(product["price"] for product in map(_product_by_item_id, self.cart(driver)) if product)
+        tax = round(subtotal * TAX_RATE, 2)
+        return (
+            f'{self.header(driver, "Checkout: Overview")}<div class="checkout_summary_container">'
+            f'{self.cart_list(driver, False)}<div class="summary_info">'
+            '<div class="summary_info_label" data-test="payment-info-label">Payment Information:</div>'
+            '<div class="summary_value_label" data-test="payment-info-value">SauceCard #31337</div>'
+            '<div class="summary_info_label" data-test="shipping-info-label">Shipping Information:</div>'
+            '<div class="summary_value_label" data-test="shipping-info-value">Free Pony Express Delivery!</div>'
+            '<div class="summary_info_label" data-test="total-info-label">Price Total</div>'
+            f'<div class="summary_subtotal_label" data-test="subtotal-label">Item total: {_price(subtotal)}</div>'
+            f'<div class="summary_tax_label" data-test="tax-label">Tax: {_price(tax)}</div>'
+            f'<div class="summary_info_label summary_total_label" data-test="total-label">Total: {_price(subtotal + tax)}</div>'
+            '<div class="cart_footer">'
+            '<button class="btn btn_secondary back btn_medium cart_cancel_link" data-test="cancel" id="cancel" name="cancel">Cancel</button>'
+            '<button class="btn btn_action btn_medium cart_button" data-test="finish" id="finish" name="finish">Finish</button>'
+            "</div></div></div>"
+        )
+
+    def checkout_complete(self, driver, error) -> str:
+        return (
+            f'{self.header(driver, "Checkout: Complete!")}'
+            '<div id="checkout_complete_container" class="checkout_complete_container" data-test="checkout-complete-container">'
+            '<img alt="Pony Express" class="pony_express" data-test="pony-express" src="static/img/item.svg">'
+            '<h2 class="complete-header" data-test="complete-header">Thank you for your order!</h2>'
+            '<div class="complete-text" data-test="complete-text">Your order has been dispatched, and will arrive just as fast as the pony can get there!</div>'
+            '<button class="btn btn_primary btn_small" data-test="back-to-products" id="back-to-products" name="back-to-products">Back Home</button>'
+            "</div>"
+        )
+
+    # --------------------------------------------------------------- events
+
+    # Renders the page again with an error message, keeping what was typed into the form fields.
+    def _show_error(self, driver, message) -> None:
+        values = {node.attrs["id"]: node.value for node in find(driver.document, "tag name", "input") if "id" in node.attrs}
+        self.page_error = message
+        driver.render()
+        for node in find(driver.document, "tag name", "input"):
+            if node.attrs.get("id") in values and node.attrs.get("type") != "submit":
+                node.value = values[node.attrs["id"]]
+
+    def _field(self, driver, field_id: str) -> str:
+        nodes = find(driver.document, "id", field_id)
+        return nodes[0].value if nodes else ""
+
+    def click(self, driver, node) -> None:
+        user = self.user(driver)
+        page = driver.path.rsplit("/", 1)[-1]
+
+        if node.closest(".shopping_cart_link") is not None:
+            driver.open("cart.html")
+            return
+        if "error-button" in node.classes:
+            self._show_error(driver, None)
+            return
+
+        element_id = node.attrs.get("id", "")
+        if element_id == "login-button":
+            self.submit_login(driver)
+        elif element_id == "continue":
+            self.submit_checkout(driver, user)
+        elif element_id.startswith("add-to-cart-"):
+            product = _product_by_product_id(element_id[len("add-to-cart-"):])
+            if not self.is_broken_for(user, product):
+                self.set_cart(driver, self.cart(driver) + [product["item_id"]])
+                driver.render()
+        elif element_id.startswith("remove-"):
+            product = _product_by_product_id(element_id[len("remove-"):])
+            if not (page == "inventory.html" and self.is_broken_for(user, product)):
+                self.set_cart(driver, [item_id for item_id in self.cart(driver) if item_id != product["item_id"]])
+                driver.render()
+        elif element_id == "checkout":
+            driver.open("checkout-step-one.html")
+        elif element_id in ("continue-shopping", "back-to-products"):
+            driver.open("inventory.html")
+        elif element_id == "cancel":
+            driver.open("inventory.html" if page == "checkout-step-two.html" else "cart.html")
+        elif element_id == "finish" and user != "error_user":
+            self.set_cart(driver, [])
+            driver.open("checkout-complete.html")
+
+    def submit_login(self, driver) -> None:
+        username = self._field(driver, "user-name")
+        password = self._field(driver, "password")
+        message = None
+        if not username:
+            message = "Epic sadface: Username is required"
+        elif not password:
+            message = "Epic sadface: Password is required"
+        elif username not in USERNAMES or password != PASSWORD:
+            message = "Epic sadface: Username and password do not match any user in this service"
+        elif username == "locked_out_user":
+            message = "Epic sadface: Sorry, this user has been locked out."
+        if message:
+            self._show_error(driver, message)
+            return
+
+        driver.cookies[SESSION_COOKIE] = {"name": SESSION_COOKIE, "value": username, "path": "/"}
+        if username == "performance_glitch_user":
+            driver.schedule(GLITCH_DELAY_MS / 1000, lambda: driver.open("inventory.html"))
+        else:
+            driver.open("inventory.html")
+
+    def submit_checkout(self, driver, user) -> None:
+        fields = [
+            ("first-name", "Error: First Name is required"),
+            ("last-name", "Error: Last Name is required"),
+            ("postal-code", "Error: Postal Code is required"),
+        ]
+        for field_id, message in fields:
+            if not self._field(driver, field_id) and user != "error_user":
+                self._show_error(driver, message)
+                return
+        driver.open("checkout-step-two.html")
+
+    # problem_user: typing into the last name field changes the first name instead.
+    # error_user: the last name field does not accept any input.
+    def input(self, driver, node) -> None:
+        if node.attrs.get("id") != "last-name" or not node.value:
+            return
+        user = self.user(driver)
+        if user == "problem_user":
+            for first_name in find(driver.document, "id", "first-name"):
+                first_name.value = node.value[-1]
+            node.value = ""
+        elif user == "error_user":
+            node.value = ""
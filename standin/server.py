@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from standin import catalog
+
+# Folder holding index.html, app.js, style.css and the images.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+# The pages of the site. Every one of them is served the same index.html, and app.js renders
+# the right page based on the path, so the URLs are the same as on the real site.
+PAGES = {
+    "/",
+    "/index.html",
+    "/inventory.html",
+    "/cart.html",
+    "/checkout-step-one.html",
+    "/checkout-step-two.html",
+    "/checkout-complete.html",
+}
+
+
+# Builds the JavaScript that hands the product catalog and the user rules to app.js.
+# It is generated from catalog.py, so catalog.py is the only place the data is defined.
+def catalog_script() -> bytes:
+    data = {
+        "products": catalog.PRODUCTS,
+        "usernames": catalog.USERNAMES,
+        "password": catalog.PASSWORD,
+        "brokenItemIds": catalog.BROKEN_ITEM_IDS,
+        "glitchDelayMs": catalog.GLITCH_DELAY_MS,
+        "taxRate": catalog.TAX_RATE,
+        "sessionCookie": catalog.SESSION_COOKIE,
+        "cartStorageKey": catalog.CART_STORAGE_KEY,
+    }
+    return f"window.SWAG = {json.dumps(data)};\n".encode("utf-8")
+
+
+# Handles the HTTP requests of the stand-in site. Files are served from STATIC_DIR.
+class StandInHandler(SimpleHTTPRequestHandler):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=STATIC_DIR, **kwargs)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+
+        if path in PAGES:
+            self.path = "/index.html"
+        elif path == "/static/catalog.js":
+            self._send(catalog_script(), "application/javascript")
+            return
+        elif path.startswith("/static/"):
+            self.path = path[len("/static"):]
+
+        super().do_GET()
+
+    # Sends 'body' as a 200 response with the given content type.
+    def _send(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Keep the test output clean: don't print a line for every request.
+    def log_message(self, format, *args):
+        pass
+
+
+# Starts serving the site on host:port (port 0 picks a free port) and blocks until interrupted.
+# The URL is printed first, so whoever started this process can read it from stdout.
+def serve(host: str = "127.0.0.1", port: int = 0) -> None:
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    print(f"Swag Labs stand-in serving on http://{host}:{server.server_address[1]}/", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# Starts the site in a separate Python process on a free port and returns the process and the site's
+# base URL (e.g. "http://127.0.0.1:53124/"). The caller must call terminate() on the process when done.
+def start_server_process(host: str = "127.0.0.1"):
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "standin", "--host", host, "--port", "0"],
+        cwd=project_root,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+    # The first line printed by serve() contains the URL.
+    line = process.stdout.readline()
+    if "serving on " not in line:
+        process.terminate()
+        raise RuntimeError(f"Swag Labs stand-in failed to start (output: {line!r})")
+    return process, line.split("serving on ", 1)[1].strip()
@@ -0,0 +1,348 @@
+// Client side of the stand-in Swag Labs site. Every route serves the same index.html, and this script
+// renders the page for the current path. Like the real site, the logged in user is kept in the
+// "session-username" cookie and the cart in the "cart-contents" localStorage key (a JSON list of item ids).
+(function () {
+    "use strict";
+
+    var SWAG = window.SWAG;
+    var root = document.getElementById("root");
+    var page = window.location.pathname.replace(/^.*\//, "") || "index.html";
+
+    // ---------------------------------------------------------------- state
+
+    function getUser() {
+        var match = document.cookie.match(new RegExp("(?:^|; )" + SWAG.sessionCookie + "=([^;]*)"));
+        return match ? decodeURIComponent(match[1]) : null;
+    }
+
+    function setUser(username) {
+        document.cookie = SWAG.sessionCookie + "=" + encodeURIComponent(username) + "; path=/";
+    }
+
+    function getCart() {
+        try {
+            return JSON.parse(window.localStorage.getItem(SWAG.cartStorageKey)) || [];
+        } catch (e) {
+            return [];
+        }
+    }
+
+    function setCart(ids) {
+        if (ids.length) {
+            window.localStorage.setItem(SWAG.cartStorageKey, JSON.stringify(ids));
+        } else {
+            window.localStorage.removeItem(SWAG.cartStorageKey);
+        }
+    }
+
+    function productByItemId(itemId) {
+        for (var i = 0; i < SWAG.products.length; i++) {
+            if (SWAG.products[i].item_id === itemId) {
+                return SWAG.products[i];
+            }
+        }
+        return null;
+    }
+
+    function productByProductId(productId) {
+        for (var i = 0; i < SWAG.products.length; i++) {
+            if (SWAG.products[i].product_id === productId) {
+                return SWAG.products[i];
+            }
+        }
+        return null;
+    }
+
+    // problem_user and error_user cannot add or remove some of the products.
+    function isBrokenFor(user, product) {
+        return (user === "problem_user" || user === "error_user") &&
+            SWAG.brokenItemIds.indexOf(product.item_id) !== -1;
+    }
+
+    function go(path) {
+        window.location.href = path;
+    }
+
+    // ---------------------------------------------------------------- markup helpers
+
+    function escapeHtml(text) {
+        return String(text).replace(/[&<>"']/g, function (c) {
+            return {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}[c];
+        });
+    }
+
+    function price(value) {
+        return "$" + value.toFixed(2);
+    }
+
+    function header(title) {
+        var count = getCart().length;
+        var badge = count ? '<span class="shopping_cart_badge" data-test="shopping-cart-badge">' + count + "</span>" : "";
+        var cartClass = getUser() === "visual_user" ? "shopping_cart_container visual_failure" : "shopping_cart_container";
+        return '<div class="primary_header" data-test="primary-header">' +
+            '<div class="app_logo">Swag Labs</div>' +
+            '<div id="shopping_cart_container" class="' + cartClass + '">' +
+            '<a class="shopping_cart_link" data-test="shopping-cart-link">' + badge + "</a></div></div>" +
+            '<div class="header_secondary_container" data-test="secondary-header">' +
+            '<span class="title" data-test="title">' + escapeHtml(title) + "</span></div>";
+    }
+
+    function cartItem(product, withButton) {
+        var button = withButton
+            ? '<button class="btn btn_secondary btn_small cart_button" data-test="remove-' + product.product_id +
+              '" id="remove-' + product.product_id + '" name="remove-' + product.product_id + '">Remove</button>'
+            : "";
+        return '<div class="cart_item" data-test="inventory-item">' +
+            '<div class="cart_quantity" data-test="item-quantity">1</div>' +
+            '<div class="cart_item_label">' +
+            '<a href="#" id="item_' + product.item_id + '_title_link" data-test="item-' + product.item_id + '-title-link">' +
+            '<div class="inventory_item_name" data-test="inventory-item-name">' + escapeHtml(product.name) + "</div></a>" +
+            '<div class="inventory_item_desc" data-test="inventory-item-desc">' + escapeHtml(product.description) + "</div>" +
+            '<div class="item_pricebar"><div class="inventory_item_price" data-test="inventory-item-price">' +
+            price(product.price) + "</div>" + button + "</div></div></div>";
+    }
+
+    function cartList(withButtons) {
+        return '<div class="cart_list" data-test="cart-list">' +
+            '<div class="cart_quantity_label" data-test="cart-quantity-label">QTY</div>' +
+            '<div class="cart_desc_label" data-test="cart-desc-label">Description</div>' +
+            getCart().map(function (itemId) {
+                var product = productByItemId(itemId);
+                return product ? cartItem(product, withButtons) : "";
+            }).join("") + "</div>";
+    }
+
+    function errorBox(message) {
+        if (!message) {
+            return '<div class="error-message-container"></div>';
+        }
+        return '<div class="error-message-container error"><h3 data-test="error">' + escapeHtml(message) +
+            '<button class="error-button" data-test="error-button">x</button></h3></div>';
+    }
+
+    // ---------------------------------------------------------------- pages
+
+    function renderLogin(error) {
+        root.innerHTML = '<div class="login_logo">Swag Labs</div>' +
+            '<div class="login_wrapper"><form id="login-form">' +
+            '<input class="input_error form_input" placeholder="Username" type="text" data-test="username" id="user-name" name="user-name" autocorrect="off" autocapitalize="none">' +
+            '<input class="input_error form_input" placeholder="Password" type="password" data-test="password" id="password" name="password" autocorrect="off" autocapitalize="none">' +
+            errorBox(error) +
+            '<input type="submit" class="submit-button btn_action" data-test="login-button" id="login-button" name="login-button" value="Login">' +
+            "</form></div>";
+
+        document.getElementById("login-form").addEventListener("submit", function (event) {
+            event.preventDefault();
+            var username = document.getElementById("user-name").value;
+            var password = document.getElementById("password").value;
+
+            var message = null;
+            if (!username) {
+                message = "Epic sadface: Username is required";
+            } else if (!password) {
+                message = "Epic sadface: Password is required";
+            } else if (SWAG.usernames.indexOf(username) === -1 || password !== SWAG.password) {
+                message = "Epic sadface: Username and password do not match any user in this service";
+            } else if (username === "locked_out_user") {
+                message = "Epic sadface: Sorry, this user has been locked out.";
+            }
+
+            if (message) {
+                var values = [username, password];
+                renderLogin(message);
+                document.getElementById("user-name").value = values[0];
+                document.getElementById("password").value = values[1];
+                return;
+            }
+
+            setUser(username);
+            var delay = username === "performance_glitch_user" ? SWAG.glitchDelayMs : 0;
+            window.setTimeout(function () { go("inventory.html"); }, delay);
+        });
+    }
+
+    function renderInventory() {
+        var user = getUser();
+        var cart = getCart();
+        root.innerHTML = header("Products") + '<div class="inventory_list" data-test="inventory-list">' +
+            SWAG.products.map(function (product) {
+                var inCart = cart.indexOf(product.item_id) !== -1;
+                var buttonId = (inCart ? "remove-" : "add-to-cart-") + product.product_id;
+                var image = user === "problem_user" ? "static/img/dog.svg" : "static/img/item.svg";
+                return '<div class="inventory_item" data-test="inventory-item">' +
+                    '<div class="inventory_item_img"><a href="#" id="item_' + product.item_id + '_img_link" data-test="item-' + product.item_id + '-img-link">' +
+                    '<img alt="' + escapeHtml(product.name) + '" class="inventory_item_img" src="' + image + '"></a></div>' +
+                    '<div class="inventory_item_description" data-test="inventory-item-description">' +
+                    '<div class="inventory_item_label">' +
+                    '<a href="#" id="item_' + product.item_id + '_title_link" data-test="item-' + product.item_id + '-title-link">' +
+                    '<div class="inventory_item_name" data-test="inventory-item-name">' + escapeHtml(product.name) + "</div></a>" +
+                    '<div class="inventory_item_desc" data-test="inventory-item-desc">' + escapeHtml(product.description) + "</div></div>" +
+                    '<div class="pricebar"><div class="inventory_item_price" data-test="inventory-item-price">' + price(product.price) + "</div>" +
+                    '<button class="btn ' + (inCart ? "btn_secondary" : "btn_primary") + ' btn_small btn_inventory" data-test="' + buttonId +
+                    '" id="' + buttonId + '" name="' + buttonId + '">' + (inCart ? "Remove" : "Add to cart") + "</button></div></div></div>";
+            }).join("") + "</div>";
+    }
+
+    function renderCart() {
+        root.innerHTML = header("Your Cart") + cartList(true) +
+            '<div class="cart_footer">' +
+            '<button class="btn btn_secondary back btn_medium" data-test="continue-shopping" id="continue-shopping" name="continue-shopping">Continue Shopping</button>' +
+            '<button class="btn btn_action btn_medium checkout_button" data-test="checkout" id="checkout" name="checkout">Checkout</button>' +
+            "</div>";
+    }
+
+    function renderCheckoutStepOne(error) {
+        root.innerHTML = header("Checkout: Your Information") +
+            '<div class="checkout_info_container"><form id="checkout-form"><div class="checkout_info">' +
+            '<input class="input_error form_input" placeholder="First Name" type="text" data-test="firstName" id="first-name" name="firstName">' +
+            '<input class="input_error form_input" placeholder="Last Name" type="text" data-test="lastName" id="last-name" name="lastName">' +
+            '<input class="input_error form_input" placeholder="Zip/Postal Code" type="text" data-test="postalCode" id="postal-code" name="postalCode">' +
+            errorBox(error) + "</div>" +
+            '<div class="checkout_buttons">' +
+            '<button class="btn btn_secondary back btn_medium cart_cancel_link" data-test="cancel" id="cancel" name="cancel" type="button">Cancel</button>' +
+            '<input type="submit" class="submit-button btn btn_primary cart_button btn_action" data-test="continue" id="continue" name="continue" value="Continue">' +
+            "</div></form></div>";
+
+        var user = getUser();
+        var lastName = document.getElementById("last-name");
+
+        // problem_user: typing into the last name field changes the first name instead.
+        // error_user: the last name field does not accept any input.
+        lastName.addEventListener("input", function () {
+            if (user === "problem_user") {
+                document.getElementById("first-name").value = lastName.value.slice(-1);
+                lastName.value = "";
+            } else if (user === "error_user") {
+                lastName.value = "";
+            }
+        });
+
+        document.getElementById("checkout-form").addEventListener("submit", function (event) {
+            event.preventDefault();
+            var fields = [
+                ["first-name", "Error: First Name is required"],
+                ["last-name", "Error: Last Name is required"],
+                ["postal-code", "Error: Postal Code is required"]
+            ];
+            for (var i = 0; i < fields.length; i++) {
+                if (!document.getElementById(fields[i][0]).value && user !== "error_user") {
+                    renderCheckoutStepOne(fields[i][1]);
+                    return;
+                }
+            }
+            go("checkout-step-two.html");
+        });
+    }
+
+    function renderCheckoutStepTwo() {
+        var subtotal = getCart().reduce(function (sum, itemId) {
+            var product = productByItemId(itemId);
+            return sum + (product ? product.price : 0);
+        }, 0);
+        var tax = Math.round(subtotal * SWAG.taxRate * 100) / 100;
+
+        root.innerHTML = header("Checkout: Overview") + '<div class="checkout_summary_container">' + cartList(false) +
+            '<div class="summary_info">' +
+            '<div class="summary_info_label" data-test="payment-info-label">Payment Information:</div>' +
+            '<div class="summary_value_label" data-test="payment-info-value">SauceCard #31337</div>' +
+            '<div class="summary_info_label" data-test="shipping-info-label">Shipping Information:</div>' +
+            '<div class="summary_value_label" data-test="shipping-info-value">Free Pony Express Delivery!</div>' +
+            '<div class="summary_info_label" data-test="total-info-label">Price Total</div>' +
+            '<div class="summary_subtotal_label" data-test="subtotal-label">Item total: ' + price(subtotal) + "</div>" +
+            '<div class="summary_tax_label" data-test="tax-label">Tax: ' + price(tax) + "</div>" +
+            '<div class="summary_info_label summary_total_label" data-test="total-label">Total: ' + price(subtotal + tax) + "</div>" +
+            '<div class="cart_footer">' +
+            '<button class="btn btn_secondary back btn_medium cart_cancel_link" data-test="cancel" id="cancel" name="cancel">Cancel</button>' +
+            '<button class="btn btn_action btn_medium cart_button" data-test="finish" id="finish" name="finish">Finish</button>' +
+            "</div></div></div>";
+    }
+
+    function renderCheckoutComplete() {
+        root.innerHTML = header("Checkout: Complete!") + '<div id="checkout_complete_container" class="checkout_complete_container" data-test="checkout-complete-container">' +
+            '<img alt="Pony Express" class="pony_express" data-test="pony-express" src="static/img/item.svg">' +
+            '<h2 class="complete-header" data-test="complete-header">Thank you for your order!</h2>' +
+            '<div class="complete-text" data-test="complete-text">Your order has been dispatched, and will arrive just as fast as the pony can get there!</div>' +
+            '<button class="btn btn_primary btn_small" data-test="back-to-products" id="back-to-products" name="back-to-products">Back Home</button>' +
+            "</div>";
+    }
+
+    // ---------------------------------------------------------------- clicks
+
+    document.addEventListener("click", function (event) {
+        var target = event.target;
+        var user = getUser();
+
+        if (target.closest(".shopping_cart_link")) {
+            go("cart.html");
+            return;
+        }
+        if (target.classList.contains("error-button")) {
+            target.closest(".error-message-container").innerHTML = "";
+            return;
+        }
+
+        var id = target.id || "";
+        var product;
+        if (id.indexOf("add-to-cart-") === 0) {
+            product = productByProductId(id.slice("add-to-cart-".length));
+            if (isBrokenFor(user, product)) {
+                console.error("Failed to add item to the cart.");
+                return;
+            }
+            setCart(getCart().concat([product.item_id]));
+            render();
+        } else if (id.indexOf("remove-") === 0) {
+            product = productByProductId(id.slice("remove-".length));
+            if (page === "inventory.html" && isBrokenFor(user, product)) {
+                console.error("Failed to remove item from the cart.");
+                return;
+            }
+            setCart(getCart().filter(function (itemId) { return itemId !== product.item_id; }));
+            render();
+        } else if (id === "checkout") {
+            go("checkout-step-one.html");
+        } else if (id === "continue-shopping" || id === "back-to-products") {
+            go("inventory.html");
+        } else if (id === "cancel") {
+            go(page === "checkout-step-two.html" ? "inventory.html" : "cart.html");
+        } else if (id === "finish") {
+            if (user === "error_user") {
+                console.error("Failed to finish the order.");
+                return;
+            }
+            setCart([]);
+            go("checkout-complete.html");
+        }
+    });
+
+    // ---------------------------------------------------------------- routing
+
+    var pages = {
+        "inventory.html": renderInventory,
+        "cart.html": renderCart,
+        "checkout-step-one.html": renderCheckoutStepOne,
+        "checkout-step-two.html": renderCheckoutStepTwo,
+        "checkout-complete.html": renderCheckoutComplete
+    };
+
+    function render() {
+        var renderPage = pages[page];
+        if (!renderPage) {
+            var error = window.sessionStorage.getItem("login-error");
+            window.sessionStorage.removeItem("login-error");
+            renderLogin(error);
+            return;
+        }
+
+        // Like the real site, pages other than the login page need a logged in user.
+        if (!getUser()) {
+            window.sessionStorage.setItem("login-error",
+                "Epic sadface: You can only access '/" + page + "' when you are logged in.");
+            go("./");
+            return;
+        }
+        renderPage();
+    }
+
+    render();
+})();
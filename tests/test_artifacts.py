@@ -0,0 +1,31 @@
+# Checks where the failure artifacts (see framework/artifacts.py) are written and what is deleted before
+# the next run. No browser is started.
+import base64
+import os
+
+from framework import artifacts
+
+
+# Gives what a browser gives for a failed test.
+class FailedBrowser:
+    current_url = "https://fake.example/cart.html"
+    page_source = "<html></html>"
+
+    def get_screenshot_as_base64(self):
+        return base64.b64encode(b"not really a png").decode()
+
+    def get_log(self, kind):
+        return []
+
+
+# Tests that the next run deletes the artifacts of the last one, but not the other files of the folder.
+def test_clear_only_deletes_the_artifacts(tmp_path):
+    (tmp_path / "keep.txt").write_text("not an artifact")
+    (tmp_path / "notes").mkdir()
+    saver = artifacts.FailureArtifacts(str(tmp_path), 1024 * 1024, artifacts.CommandHistory())
+    folder, files = saver.capture(FailedBrowser(), "tests/test_cart.py::test_checkout")
+    assert saver.close() == []
+    assert sorted(os.listdir(folder)) == sorted([artifacts.MARKER, *files])
+
+    artifacts.clear(str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ["keep.txt", "notes"]
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from framework import driver_cache
+from framework.async_browser import AsyncBrowser
+from pages.aio.login_page import AsyncLoginPage
+
+# Product ids of the items each concurrent session buys.
+PRODUCTS = ["sauce-labs-backpack", "sauce-labs-bike-light", "sauce-labs-bolt-t-shirt", "sauce-labs-onesie"]
+
+
+# One complete purchase in one session, with the async page objects (see pages/aio).
+async def checkout_journey(browser: AsyncBrowser, product_id: str) -> tuple[list[str], str]:
+    session = await browser.new_session()
+    try:
+        login = await AsyncLoginPage.open(session)
+        products = await login.login("standard_user", "secret_sauce")
+        await products.add_to_cart(product_id)
+        cart = await products.go_to_cart()
+        items = await cart.get_cart_items()
+        checkout = await cart.click_checkout()
+        await checkout.enter_customer_info("John", "Doe", "12345")
+        overview = await checkout.click_continue()
+        confirmation = await overview.finish_checkout()
+        return items, await confirmation.get_complete_header()
+    finally:
+        await browser.close_session(session)
+
+
+# Tests that several sessions of one browser can run complete purchases at the same time from one
+# process, without seeing each other's carts. 'base_url' points LoginPage.URL at the site under test.
+def test_concurrent_checkouts(request, base_url):
+    if request.config.getoption("--backend") == "fake" or request.config.getoption("--browser") != "chrome":
+        pytest.skip("The async page objects need a real Chrome")
+    if not driver_cache.browser_executables("chrome"):
+        pytest.skip("Chrome was not found")
+
+    async def run():
+        async with await AsyncBrowser.launch() as browser:
+            return await asyncio.gather(*(checkout_journey(browser, product_id) for product_id in PRODUCTS))
+
+    results = asyncio.run(run())
+
+    for product_id, (items, header) in zip(PRODUCTS, results):
+        assert len(items) == 1, f"Session buying {product_id} saw other sessions' items: {items}"
+        assert header == "Thank you for your order!"
@@ -0,0 +1,54 @@
+# Checks how the benchmark suite (see framework/benchmark.py) compares results with a baseline. Nothing is
+# benchmarked here.
+import pytest
+
+from framework import benchmark
+
+
+def results(**samples) -> dict:
+    return {"benchmarks": {name: {"samples": values, "median": sorted(values)[len(values) // 2]} for name, values in samples.items()}}
+
+
+# Tests that the p-value is small when one sample is clearly larger, and not when the samples are alike.
+def test_mann_whitney_greater():
+    slow, fast = [float(value) for value in range(10, 20)], [float(value) for value in range(10)]
+    assert benchmark.mann_whitney_greater(slow, fast) < 0.001
+    assert benchmark.mann_whitney_greater(fast, slow) > 0.999
+    assert 0.4 < benchmark.mann_whitney_greater(slow, slow) < 0.6
+
+    # All values tied: there is no evidence either way.
+    assert benchmark.mann_whitney_greater([1.0] * 5, [1.0] * 5) == 1.0
+
+
+# A regression needs both a median change above the threshold and a significant difference.
+@pytest.mark.parametrize(
+    "current, verdict",
+    [
+        ([value * 1.5 for value in range(10, 20)], "REGRESSION"),
+        ([value * 1.05 for value in range(10, 20)], "same"),
+        ([value * 0.5 for value in range(10, 20)], "faster"),
+        ([30.0, 10, 11, 12, 13, 14, 15, 16, 17, 18], "same"),
+    ],
+)
+def test_compare_verdicts(current, verdict):
+    baseline = results(login=[float(value) for value in range(10, 20)])
+    comparisons = benchmark.compare(baseline, results(login=current, new=[1.0, 2.0]), threshold=0.1, alpha=0.01)
+    assert [(comparison.name, comparison.verdict) for comparison in comparisons] == [("login", verdict)]
+
+
+# A baseline that can't be read stops the run with 2, which is not the exit code of a regression.
+def test_unreadable_baseline_exits_with_2(tmp_path):
+    assert benchmark.main(["--baseline", str(tmp_path / "missing.json")]) == 2
+    (tmp_path / "old.json").write_text('{"version": 0}')
+    with pytest.raises(ValueError):
+        benchmark.load_results(str(tmp_path / "old.json"))
+    assert benchmark.main(["--baseline", str(tmp_path / "old.json")]) == 2
+
+
+# Tests that too few runs to ever reach '--alpha' are refused when comparing with a baseline.
+def test_too_few_runs_for_alpha_are_refused(tmp_path):
+    assert benchmark.smallest_p_value(3, 3) > 0.01 > benchmark.smallest_p_value(5, 5)
+    (tmp_path / "baseline.json").write_text('{"version": 1, "settings": {"repeat": 3}, "benchmarks": {}}')
+    with pytest.raises(SystemExit) as exit_info:
+        benchmark.main(["--repeat", "3", "--baseline", str(tmp_path / "baseline.json")])
+    assert exit_info.value.code == 2
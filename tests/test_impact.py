@@ -0,0 +1,142 @@
+# Checks how test impact selection (see framework/impact.py) ties changed lines to tests, on a small git
+# repository made for each test. No browser is started.
+import subprocess
+
+import pytest
+
+from framework import impact
+
+PAGE = """\
+class CartPage:
+    URL = "cart.html"
+
+    def get_items(self):
+        return []
+
+    def checkout(self):
+        return None
+
+
+def helper():
+    return 1
+"""
+
+
+def git(root, *args):
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args], cwd=root, check=True, capture_output=True)
+
+
+# A repository with one page module and one test module, committed as its first commit.
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "pages").mkdir()
+    (tmp_path / "pages" / "cart_page.py").write_text(PAGE)
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_cart.py").write_text("def test_a(): pass\n")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "base")
+    return tmp_path
+
+
+# A map of the repository in which test_items calls CartPage.get_items and test_checkout calls CartPage.checkout.
+def record(root, shared=()):
+    tests = {
+        "tests/test_cart.py::test_items": {"pages/cart_page.py": ["CartPage.get_items"]},
+        "tests/test_cart.py::test_checkout": {"pages/cart_page.py": ["CartPage.checkout"]},
+        "tests/test_other.py::test_helper": {"pages/cart_page.py": ["helper"]},
+    }
+    return impact.ImpactMap(tests, list(shared), impact.working_blobs(str(root), ["pages/cart_page.py"]), "")
+
+
+def edit(root, old, new):
+    path = root / "pages" / "cart_page.py"
+    path.write_text(path.read_text().replace(old, new))
+
+
+NODEIDS = ["tests/test_cart.py::test_items", "tests/test_cart.py::test_checkout", "tests/test_other.py::test_helper"]
+
+
+# Tests that every line is tied to the innermost function or class around it, decorators included.
+def test_scopes_names_the_innermost_function_or_class():
+    lines = impact.scopes("import os\n\nclass A:\n    x = 1\n\n    @staticmethod\n    def f():\n        def g():\n            pass\n")
+    assert 1 not in lines
+    assert lines[4] == ("class", "A")
+    assert lines[6] == lines[7] == ("function", "A.f")
+    assert lines[9] == ("function", "A.f.<locals>.g")
+
+
+# Tests that changed, deleted and untracked lines are reported per file.
+def test_changed_lines_reports_changes_since_the_base(repo):
+    edit(repo, "return []", "return [1]")
+    edit(repo, "\ndef helper():\n    return 1\n", "")
+    (repo / "pages" / "new_page.py").write_text("x = 1\n")
+    changes = impact.changed_lines(str(repo), "HEAD")
+    assert changes["pages/cart_page.py"] == {5, 9}
+    assert changes["pages/new_page.py"] == {0}
+
+
+def test_select_runs_the_tests_that_call_a_changed_function(repo):
+    impact_map = record(repo)
+    edit(repo, "return None", "return 1")
+    selection = impact.select(str(repo), impact_map, "HEAD", NODEIDS)
+    assert selection.nodeids == {"tests/test_cart.py::test_checkout"}
+
+
+# A changed class attribute (e.g. a locator) affects every test that uses the class.
+def test_select_runs_the_users_of_a_changed_class(repo):
+    impact_map = record(repo)
+    edit(repo, '"cart.html"', '"cart-2.html"')
+    selection = impact.select(str(repo), impact_map, "HEAD", NODEIDS)
+    assert selection.nodeids == {"tests/test_cart.py::test_items", "tests/test_cart.py::test_checkout"}
+
+
+# Tests the map doesn't know and tests in changed test files always run.
+def test_select_runs_new_tests_and_changed_test_files(repo):
+    impact_map = record(repo)
+    (repo / "tests" / "test_cart.py").write_text("def test_a(): assert True\n")
+    selection = impact.select(str(repo), impact_map, "HEAD", NODEIDS + ["tests/test_new.py::test_new"])
+    assert selection.nodeids == {"tests/test_cart.py::test_items", "tests/test_cart.py::test_checkout", "tests/test_new.py::test_new"}
+
+
+@pytest.mark.parametrize(
+    "change, reason",
+    [
+        ("conftest.py", "conftest.py changed"),
+        ("framework/browser_factory.py", "framework/browser_factory.py changed"),
+        ("pages/data.json", "pages/data.json changed and is not Python code"),
+    ],
+)
+def test_select_falls_back_to_the_full_suite(repo, change, reason):
+    impact_map = record(repo)
+    (repo / change).parent.mkdir(exist_ok=True)
+    (repo / change).write_text("{}\n")
+    selection = impact.select(str(repo), impact_map, "HEAD", NODEIDS)
+    assert (selection.nodeids, selection.reason) == (None, reason)
+
+
+# A function shared by every test (called by a session fixture or a browser launch) selects the full suite.
+def test_select_falls_back_when_a_shared_function_changed(repo):
+    impact_map = record(repo, shared=[("pages/cart_page.py", "helper")])
+    edit(repo, "return 1", "return 2")
+    assert impact.select(str(repo), impact_map, "HEAD", NODEIDS).nodeids is None
+
+
+# A map recorded on other code than the base can't be trusted.
+def test_select_falls_back_when_the_map_is_stale(repo):
+    impact_map = record(repo)
+    edit(repo, "return None", "return 1")
+    git(repo, "commit", "-q", "-am", "change")
+    selection = impact.select(str(repo), impact_map, "HEAD", NODEIDS)
+    assert selection.nodeids is None and "stale" in selection.reason
+
+
+# Tests that the tracer names functions the same way without code.co_qualname (Python before 3.11).
+def test_tracer_names_functions_without_co_qualname(repo):
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("cart_page_under_test", repo / "pages" / "cart_page.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    tracer = impact.ImpactTracer(str(repo))
+    code = module.CartPage.get_items.__code__
+    assert tracer._qualname(code.co_filename, "pages/cart_page.py", code.co_firstlineno) == "CartPage.get_items"
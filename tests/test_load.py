@@ -0,0 +1,113 @@
+# Checks the statistics and the user scheduling of the load generator (see framework/load.py), with
+# sessions that are plain objects instead of browser sessions. No browser is started.
+import asyncio
+import csv
+import json
+import time
+
+import pytest
+
+from framework import load
+
+
+# Hands out numbered sessions and remembers when each was opened and whether it was closed.
+class Sessions:
+
+    def __init__(self):
+        self.opened = []
+        self.closed = []
+
+    async def new_session(self):
+        self.opened.append(time.perf_counter())
+        return len(self.opened)
+
+    async def close_session(self, session) -> None:
+        self.closed.append(session)
+
+
+@pytest.mark.parametrize(
+    "values, p, expected",
+    [
+        ([], 50, 0.0),
+        ([7.0], 0, 7.0),
+        ([7.0], 50, 7.0),
+        ([7.0], 100, 7.0),
+        ([1.0, 2.0, 3.0, 4.0], 0, 1.0),
+        ([1.0, 2.0, 3.0, 4.0], 50, 2.0),
+        ([1.0, 2.0, 3.0, 4.0], 51, 3.0),
+        ([1.0, 2.0, 3.0, 4.0], 100, 4.0),
+        ([float(value) for value in range(1, 101)], 95, 95.0),
+    ],
+)
+def test_percentile_nearest_rank(values, p, expected):
+    assert load.percentile(values, p) == expected
+
+
+# Tests that failed steps count as errors and are left out of the timings, and that the summary is
+# written the same way to CSV and JSON.
+def test_recorder_summary_and_reports(tmp_path):
+    recorder = load.LoadRecorder()
+    for duration in (0.010, 0.030, 0.020):
+        recorder.record("CartPage.click_checkout", duration)
+    recorder.record("CartPage.click_checkout", 5.0, failed=True)
+    recorder.record(load.JOURNEY, 0.100)
+    recorder.started, recorder.finished = 0.0, 2.0
+
+    rows = recorder.summary()
+    assert [row["step"] for row in rows] == ["CartPage.click_checkout", load.JOURNEY]
+    assert rows[0] == {
+        "step": "CartPage.click_checkout", "count": 3, "errors": 1, "throughput": 1.5,
+        "mean": 20.0, "p50": 20.0, "p95": 30.0, "p99": 30.0, "max": 30.0,
+    }
+
+    recorder.write_csv(str(tmp_path / "reports" / "load.csv"))
+    with open(tmp_path / "reports" / "load.csv") as file:
+        assert [row["step"] for row in csv.DictReader(file)] == ["CartPage.click_checkout", load.JOURNEY]
+    recorder.write_json(str(tmp_path / "load.json"), {"users": 2})
+    with open(tmp_path / "load.json") as file:
+        assert json.load(file) == {"settings": {"users": 2}, "elapsed": 2.0, "steps": rows}
+
+
+# Tests that the users run exactly 'iterations' journeys between them, each in its own session that is
+# closed afterwards, and that a failed journey is counted as an error.
+def test_users_share_the_iterations():
+    sessions = Sessions()
+
+    async def journey(session, recorder):
+        await asyncio.sleep(0)
+        if session == 3:
+            raise AssertionError("checkout failed")
+
+    recorder = asyncio.run(load.run_users(sessions, users=3, iterations=7, journey=journey))
+    journeys = next(row for row in recorder.summary() if row["step"] == load.JOURNEY)
+    assert (journeys["count"], journeys["errors"]) == (6, 1)
+    assert sorted(sessions.closed) == list(range(1, 8))
+
+
+# Tests that the users' starts are spread evenly over the ramp-up.
+def test_users_start_spread_over_the_ramp_up():
+    delays = []
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    async def journey(session, recorder):
+        pass
+
+    asyncio.run(load.run_users(Sessions(), users=3, iterations=3, ramp_up=0.3, journey=journey, sleep=sleep))
+    assert sorted(delays) == pytest.approx([0.0, 0.1, 0.2])
+
+
+# Tests that no journey starts once the duration is over, but the running ones finish. Each journey takes
+# 0.03s on a clock that only moves when a journey runs.
+def test_users_stop_starting_journeys_after_the_duration():
+    sessions = Sessions()
+    now = [0.0]
+
+    async def journey(session, recorder):
+        now[0] += 0.03
+
+    recorder = asyncio.run(load.run_users(sessions, users=1, duration=0.1, journey=journey, clock=lambda: now[0]))
+    journeys = next(row for row in recorder.summary() if row["step"] == load.JOURNEY)
+    assert journeys["count"] == len(sessions.opened) == len(sessions.closed) == 4
+    assert now[0] == pytest.approx(0.12)
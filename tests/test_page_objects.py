@@ -0,0 +1,94 @@
+# Checks page-object logic against small HTML fixtures with the in-memory fake driver (see
+# framework/fake_driver.py). No browser is started, so these tests run in milliseconds with any '--backend'.
+import pytest
+
+from pages.cart_page import CartPage
+from pages.checkout_page import CheckoutPage
+from pages.overview_page import OverviewPage
+
+BASE_URL = "https://fake.example/"
+
+CART_HTML = """
+<div class="cart_list">
+  <div class="cart_item">
+    <div class="cart_quantity">2</div>
+    <a id="item_4_title_link"><div class="inventory_item_name">Sauce Labs Backpack</div></a>
+    <div class="inventory_item_desc">A backpack</div>
+    <div class="inventory_item_price">$29.99</div>
+    <button id="remove-sauce-labs-backpack">Remove</button>
+  </div>
+</div>
+<button id="checkout">Checkout</button>
+"""
+
+STEP_ONE_HTML = '<input id="first-name"><input id="last-name"><input id="postal-code"><input id="continue" type="submit">'
+
+
+# Opens 'path' of a StaticSite made of the given pages in a new fake driver. The fake driver is imported
+# here, because it imports Selenium's command names, which collecting the tests shouldn't pay for.
+def open_page(pages: dict, path: str, transitions: dict = None):
+    from framework.fake_driver import FakeDriver, StaticSite
+    driver = FakeDriver(StaticSite(pages, transitions), BASE_URL)
+    driver.get(BASE_URL + path)
+    return driver
+
+
+# Tests that the overview page reads the "Item total" amount out of its label.
+@pytest.mark.parametrize(
+    "label, expected",
+    [
+        ("Item total: $29.99", 29.99),
+        ("Item total: $1049.50", 1049.50),
+        ("Item total:   $0.00  ", 0.0),
+    ],
+)
+def test_overview_item_total_parsing(label, expected):
+    driver = open_page({"overview.html": f'<div class="summary_subtotal_label">{label}</div>'}, "overview.html")
+    assert OverviewPage(driver).get_item_total() == expected
+
+
+# Tests that the cart rows are read with all their fields (see extraction.py).
+def test_cart_rows_are_read_from_the_markup():
+    rows = CartPage(open_page({"cart.html": CART_HTML}, "cart.html")).get_cart_rows()
+    assert [(row.item_id, row.product_id, row.name, row.price, row.quantity) for row in rows] == [
+        (4, "sauce-labs-backpack", "Sauce Labs Backpack", 29.99, 2)
+    ]
+
+
+# Tests that clicking checkout opens the checkout page, and that the customer info is typed into it.
+def test_checkout_click_follows_the_transition():
+    driver = open_page(
+        {"cart.html": CART_HTML, "checkout-step-one.html": STEP_ONE_HTML},
+        "cart.html",
+        transitions={"#checkout": "checkout-step-one.html"},
+    )
+    checkout_page = CartPage(driver).click_checkout()
+    checkout_page.enter_customer_info("Test", "User", "12345")
+    assert driver.current_url == BASE_URL + "checkout-step-one.html"
+    assert driver.find_element("id", "last-name").get_attribute("value") == "User"
+
+
+# Tests that a page object finds an element once, finds it again when the page re-rendered it (the
+# continue button re-renders the form here, without a navigation) and forgets its elements when the
+# browser navigates.
+def test_element_cache_reuses_and_refreshes_elements():
+    from framework.instrumentation import instrument
+    driver = instrument(open_page(
+        {"checkout-step-one.html": STEP_ONE_HTML},
+        "checkout-step-one.html",
+        transitions={"#continue": "checkout-step-one.html"},
+    ))
+    page = CheckoutPage(driver)
+    stats = page.element_cache.stats
+    page.first_name.send_keys("Te")
+    page.first_name.send_keys("st")
+    assert (stats.hits, stats.misses, stats.stale) == (1, 1, 0)
+    assert page.first_name.get_attribute("value") == "Test"
+
+    page.continue_button.click()
+    assert page.first_name.get_attribute("value") == ""
+    assert (stats.hits, stats.misses, stats.stale) == (3, 3, 1)
+
+    driver.get(BASE_URL + "checkout-step-one.html")
+    page.first_name.send_keys("User")
+    assert (stats.hits, stats.misses, stats.stale) == (3, 4, 1)
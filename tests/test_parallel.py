@@ -0,0 +1,16 @@
+# Checks how the parallel runner (see framework/parallel.py) splits the tests over its workers.
+from framework.parallel import lpt_schedule
+
+
+# Tests that the longest units are spread first, and that units stay together on one worker.
+def test_lpt_schedule_balances_the_known_durations():
+    durations = {"a": 4.0, "b": 3.0, "c": 2.0, "d": 1.0, "e": 1.0}
+    groups = lpt_schedule([["a"], ["b"], ["c", "d"], ["e"]], durations, 2)
+    assert groups == [["a", "e"], ["b", "c", "d"]]
+
+
+# Tests that tests whose durations are all 0 (e.g. after a run in which no test ran) are still spread
+# over every worker.
+def test_lpt_schedule_spreads_tests_of_equal_duration():
+    groups = lpt_schedule([[str(number)] for number in range(6)], {str(number): 0.0 for number in range(6)}, 3)
+    assert [len(group) for group in groups] == [2, 2, 2]
@@ -6,10 +6,20 @@ import pytest
 from pages.login_page import LoginPage
 from pages.products_page import ProductsPage
 from pages.cart_page import CartPage
-from pages.checkout_page import CheckoutPage
 from pages.overview_page import OverviewPage
 from pages.confirmation_page import ConfirmationPage
 
+# Journey prefix (see framework/journeys.py) shared by the tests marked with
+# '@pytest.mark.journey(steps=logged_in_through_ui)': logging in through the login page. It runs once
+# per test process; the other tests of the journey start from a snapshot of the browser it left.
+def logged_in_through_ui(driver):
+    login = LoginPage(driver)
+    login.login("standard_user", "secret_sauce")
+
+    # Assert that the user is now logged in.
+    # If not, fail the test with the given message.
+    assert login.is_logged_in(), "Login failed"
+
 # Use pytest's parametrize feature to run the following test function multiple times,
 # each time with a different set of 'product_id' and 'expected_name' values.
 # This allows testing the same logic (e.g., adding a product to cart and verifying its name)
@@ -72,15 +82,9 @@ def test_invalid_login_shows_error(driver):
 )
 
 # Test the addition and removal of an item from the cart.
+# The 'journey' marker (see conftest.py) logs in through the login page (see logged_in_through_ui above).
+@pytest.mark.journey(steps=logged_in_through_ui)
 def test_add_and_remove_item(driver, product_id, product_name):
-    login = LoginPage(driver)
-
-    # Login with valid credentials.
-    login.login("standard_user", "secret_sauce")
-
-    # Assert that the user is now logged in.
-    # If not, fail the test with the given message.
-    assert login.is_logged_in(), "Login failed"
 
     # Create an instance of the Products page. Add the product with product_id to the cart. 
     # Remove the product with the product_id. Then, go to the cart page.
@@ -98,12 +102,9 @@ def test_add_and_remove_item(driver, product_id, product_name):
     assert product_name not in items, f"Expected '{product_name}' to be removed, but found {items}"
 
 # Self explanatory function name. Also see prior comments for identical lines of code.
-def test_empty_cart_shows_no_items(driver):
-    login = LoginPage(driver)
-    login.login("standard_user", "secret_sauce")
-    assert login.is_logged_in(), "Login failed"
-
-    products = ProductsPage(driver)
+# 'logged_in_products' (see conftest.py) logs in without going through the login page and returns the products page.
+def test_empty_cart_shows_no_items(logged_in_products):
+    products = logged_in_products
 
     cart_page = products.go_to_cart()
     items = cart_page.get_cart_items()
@@ -113,12 +114,10 @@ def test_empty_cart_shows_no_items(driver):
 
 # Test that the badge on the cart icon that indicates the number of items in the
 # cart updates correctly when a product is added to the cart
+@pytest.mark.journey(steps=logged_in_through_ui)
 def test_cart_badge_updates(driver):
 
     # See prior comments
-    login = LoginPage(driver)
-    login.login("standard_user", "secret_sauce")
-    assert login.is_logged_in(), "Login failed"
     products = ProductsPage(driver)
     products.add_to_cart("sauce-labs-bike-light")
 
@@ -129,18 +128,11 @@ def test_cart_badge_updates(driver):
     assert badge == 1, f"Expected cart badge count 1, got {badge}"
 
 # Test that the subtotal on the overview page is correct.
-def test_overview_subtotal_matches_items(driver):
-
-    # See prior comments
-    login = LoginPage(driver)
-    login.login("standard_user", "secret_sauce")
-    assert login.is_logged_in(), "Login failed"
-    products = ProductsPage(driver)
+def test_overview_subtotal_matches_items(cart_with):
 
-    # Add products to the cart with Prices of $29.99 and $9.99
-    products.add_to_cart("sauce-labs-backpack")
-    products.add_to_cart("sauce-labs-bike-light")
-    cart_page = products.go_to_cart()
+    # Log in and open the cart with products with Prices of $29.99 and $9.99 in it.
+    # 'cart_with' (see conftest.py) sets this up without going through the login and products pages.
+    cart_page = cart_with("sauce-labs-backpack", "sauce-labs-bike-light")
     
     # Retrieves a list of prices for all items currently in the cart.
     item_prices = cart_page.get_item_prices()
@@ -161,21 +153,13 @@ def test_overview_subtotal_matches_items(driver):
     assert round(subtotal, 2) == expected_subtotal, f"Subtotal mismatch: expected {expected_subtotal}, got {subtotal}"
 
 # Self explanatory
-def test_complete_checkout_flow(driver):
+def test_complete_checkout_flow(cart_with):
 
     # See prior comments.
-    login = LoginPage(driver)
-    login.login("standard_user", "secret_sauce")
-    assert login.is_logged_in(), "Login failed"
+    cart_page = cart_with("sauce-labs-backpack")
 
     # See prior comments.
-    products = ProductsPage(driver)
-    products.add_to_cart("sauce-labs-backpack")
-    cart_page = products.go_to_cart()
-    cart_page.click_checkout()
-
-    # See prior comments.
-    checkout_page = CheckoutPage(driver)
+    checkout_page = cart_page.click_checkout()
     checkout_page.enter_customer_info("Test", "User", "12345")
     overview_page = checkout_page.click_continue()
 